@@ -4,4 +4,10 @@ from django.apps import AppConfig
 class CyberUserConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.cyberUser'
-    verbose_name = 'Cyber User Management'
\ No newline at end of file
+    verbose_name = 'Cyber User Management'
+
+    def ready(self):
+        from cyberkids.catalog_cache import track_catalog
+        from .models import Country, RiskLevel
+        track_catalog('countries', Country)
+        track_catalog('risk_levels', RiskLevel)
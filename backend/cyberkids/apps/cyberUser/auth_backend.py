@@ -3,6 +3,8 @@ from rest_framework import exceptions
 from django.conf import settings
 import jwt
 
+from cyberkids.metrics import AUTH_FAILURES
+
 
 class JWTCustomAuthentication(BaseAuthentication):
     """Custom DRF authentication that accepts the project's PyJWT tokens.
@@ -29,10 +31,13 @@ class JWTCustomAuthentication(BaseAuthentication):
         try:
             payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
         except jwt.ExpiredSignatureError:
+            AUTH_FAILURES.inc(reason='token_expired')
             raise exceptions.AuthenticationFailed('Token has expired')
         except jwt.InvalidTokenError:
+            AUTH_FAILURES.inc(reason='token_invalid')
             raise exceptions.AuthenticationFailed('Invalid token')
         except Exception as e:
+            AUTH_FAILURES.inc(reason='token_decode_error')
             raise exceptions.AuthenticationFailed('Token decode error')
 
         # Determine claim name for user id (support common variants)
@@ -43,6 +48,7 @@ class JWTCustomAuthentication(BaseAuthentication):
 
         user_id = payload.get(user_claim) or payload.get('userId') or payload.get('sub') or payload.get('id')
         if not user_id:
+            AUTH_FAILURES.inc(reason='token_missing_user')
             raise exceptions.AuthenticationFailed('Token missing user identifier')
 
         # Importar CyberUser directamente para evitar usar get_user_model
@@ -51,8 +57,10 @@ class JWTCustomAuthentication(BaseAuthentication):
         try:
             user = CyberUser.objects.get(user_id=int(user_id))
         except CyberUser.DoesNotExist:
+            AUTH_FAILURES.inc(reason='user_not_found')
             raise exceptions.AuthenticationFailed('User not found')
         except Exception:
+            AUTH_FAILURES.inc(reason='user_lookup_error')
             raise exceptions.AuthenticationFailed('Error retrieving user')
 
         # Asegurar que el usuario tiene la propiedad is_authenticated
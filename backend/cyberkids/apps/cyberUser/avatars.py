@@ -0,0 +1,116 @@
+"""
+Subida de avatares en segundo plano.
+
+``UpdateProfileView`` ya no procesa ni sube el fichero dentro de la petición:
+``validate_avatar`` comprueba tamaño, formato y dimensiones leyendo solo la
+cabecera (un fichero pequeño con millones de píxeles no llega a decodificarse),
+``stage_avatar`` guarda los bytes tal cual en un ``StagedAvatar`` y marca
+``CyberUser.pending_avatar``; mientras tanto el perfil muestra
+``AVATAR_PENDING_URL``. La tarea ``users.publish_avatar`` lo gira según EXIF,
+lo reduce con Pillow, lo sube con el backend de ``IMAGE_STORAGE``, genera las
+variantes y solo entonces cambia ``avatar``, con un UPDATE condicionado a que
+``pending_avatar`` siga siendo el mismo (si el usuario subió otro entretanto,
+gana el último).
+
+Los bytes van a la base de datos y no a disco porque la web y el worker corren
+en máquinas distintas. Si la tarea no encuentra el ``StagedAvatar`` de la
+subida vigente lanza la excepción y la cola la reintenta.
+"""
+
+import uuid
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+from rest_framework import serializers
+
+from apps.tasks.runner import enqueue
+from cyberkids.image_storage import get_image_storage
+from cyberkids.images import image_url
+
+from .models import CyberUser, StagedAvatar
+
+DEFAULT_AVATAR_URL = "https://res.cloudinary.com/dsvynqyq5/image/upload/v1768140305/3dcd4af5bc9e06d36305984730ab7888_o3eeob.jpg"
+
+ALLOWED_FORMATS = ('JPEG', 'PNG', 'WEBP', 'GIF')
+
+
+def avatar_url(user, default=None):
+    """URL que se muestra como avatar: la provisional si hay una subida pendiente."""
+    if user.pending_avatar:
+        return getattr(settings, 'AVATAR_PENDING_URL', DEFAULT_AVATAR_URL)
+    if user.avatar:
+        return image_url(user.avatar)
+    return default
+
+
+def validate_avatar(file):
+    """Comprueba tamaño, formato y píxeles sin decodificar; lanza ``ValidationError`` si no vale."""
+    max_bytes = settings.AVATAR_MAX_UPLOAD_MB * 1024 * 1024
+    if file.size > max_bytes:
+        raise serializers.ValidationError(f'La imagen no puede superar {settings.AVATAR_MAX_UPLOAD_MB} MB')
+    try:
+        file.seek(0)
+        with Image.open(file) as image:
+            image_format = image.format
+            width, height = image.size
+            # Antes de verify(): las dimensiones salen de la cabecera
+            if width * height > settings.AVATAR_MAX_PIXELS:
+                raise serializers.ValidationError('La imagen tiene demasiados píxeles')
+            image.verify()
+    except (UnidentifiedImageError, OSError, SyntaxError, Image.DecompressionBombError):
+        raise serializers.ValidationError('El fichero no es una imagen válida')
+    finally:
+        file.seek(0)
+    if image_format not in ALLOWED_FORMATS:
+        raise serializers.ValidationError(f'Formato no permitido: {image_format}')
+    return file
+
+
+def stage_avatar(user, file):
+    """Guarda en staging los bytes ya validados por ``validate_avatar`` y encola su publicación."""
+    name = uuid.uuid4().hex
+    file.seek(0)
+    StagedAvatar.objects.create(name=name, user_id=user.user_id, content=file.read())
+    CyberUser.objects.filter(user_id=user.user_id).update(pending_avatar=name)
+    user.pending_avatar = name
+    enqueue('users.publish_avatar', {'user_id': user.user_id, 'name': name}, idempotency_key=f'avatar:{name}')
+    return name
+
+
+def _shrink(content):
+    """Gira según EXIF y reduce a ``AVATAR_MAX_DIMENSION``. Devuelve ``(bytes, extensión)``."""
+    size = settings.AVATAR_MAX_DIMENSION
+    buffer = BytesIO()
+    with Image.open(BytesIO(content)) as image:
+        image = ImageOps.exif_transpose(image)
+        has_alpha = image.mode in ('RGBA', 'LA', 'P')
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+        image.thumbnail((size, size))
+        if has_alpha:
+            image.save(buffer, format='PNG', optimize=True)
+        else:
+            image.save(buffer, format='JPEG', quality=85, optimize=True)
+    return buffer.getvalue(), 'png' if has_alpha else 'jpg'
+
+
+def publish_avatar(user_id, name):
+    """Reduce y sube el avatar en staging y lo asigna al usuario. Devuelve True si se asignó.
+
+    Lanza ``StagedAvatar.DoesNotExist`` si falta el de la subida vigente, para que se reintente.
+    """
+    pending = CyberUser.objects.filter(user_id=user_id, pending_avatar=name)
+    if not pending.exists():
+        # Sustituido por una subida más reciente
+        StagedAvatar.objects.filter(name=name).delete()
+        return False
+
+    staged = StagedAvatar.objects.get(name=name)
+    storage = get_image_storage()
+    content, extension = _shrink(bytes(staged.content))
+    value = storage.upload(ContentFile(content, name=f'{name}.{extension}'), 'avatars/')
+    storage.generate_variants(value)
+    updated = pending.update(avatar=value, pending_avatar=None)
+    staged.delete()
+    return bool(updated)
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from cyberkids.benchmark import DEFAULT_SCALE, ENDPOINTS, explain_hot_queries, run_endpoints, seed_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Crea una base de datos de pruebas, la llena con un dataset realista y mide "
+        "consultas SQL y tiempo de cada endpoint público. Falla si se supera algún "
+        "presupuesto. Usa la base configurada (SQLite por defecto, PostgreSQL con DATABASE_URL)."
+    )
+
+    def add_arguments(self, parser):
+        for key, value in DEFAULT_SCALE.items():
+            parser.add_argument(f"--{key.replace('_', '-')}", type=int, default=value, dest=key)
+        parser.add_argument("--repeat", type=int, default=3, help="Llamadas por endpoint (se reporta la mediana)")
+        parser.add_argument("--only", default="", help="Prefijo de nombre de endpoint a medir (p.ej. 'simulation.')")
+        parser.add_argument("--time-scale", type=float, default=1.0,
+                            help="Multiplica los presupuestos de tiempo (máquinas lentas / CI)")
+        parser.add_argument("--no-time-budget", action="store_true", help="Solo falla por número de consultas")
+        parser.add_argument("--keepdb", action="store_true", help="Conservar la base de pruebas al terminar")
+        parser.add_argument("--explain", action="store_true",
+                            help="Mostrar el plan de los filtros calientes con y sin sus índices")
+
+    def handle(self, *args, **options):
+        scale = {key: options[key] for key in DEFAULT_SCALE}
+        endpoints = [e for e in ENDPOINTS if e[0].startswith(options["only"])]
+        if not endpoints:
+            raise CommandError(f"Ningún endpoint empieza por '{options['only']}'")
+
+        verbosity = options["verbosity"]
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, keepdb=options["keepdb"])
+        try:
+            self.stdout.write(f"Sembrando dataset en {connection.vendor}: {scale}")
+            context = seed_dataset(scale)
+            results = run_endpoints(context, repeat=options["repeat"], endpoints=endpoints)
+            plans = explain_hot_queries(context) if options["explain"] else []
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=verbosity, keepdb=options["keepdb"])
+
+        for name, plan_after, plan_before in plans:
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write("  sin índice:")
+            self.stdout.write("    " + plan_before.replace("\n", "\n    "))
+            self.stdout.write("  con índice:")
+            self.stdout.write("    " + plan_after.replace("\n", "\n    "))
+
+        failures = 0
+        self.stdout.write(f"{'endpoint':<40} {'status':>6} {'queries':>9} {'ms':>14}")
+        for row in results:
+            max_ms = row["max_ms"] * options["time_scale"]
+            time_ok = options["no_time_budget"] or row["ms"] <= max_ms
+            ok = row["queries_ok"] and time_ok and row["status_ok"]
+            failures += not ok
+            line = (f"{row['name']:<40} {row['status']:>6} {row['queries']:>4}/{row['max_queries']:<4} "
+                    f"{row['ms']:>6.1f}/{max_ms:<7.0f}")
+            self.stdout.write(self.style.SUCCESS(line) if ok else self.style.ERROR(line))
+
+        if failures:
+            raise CommandError(f"{failures} endpoint(s) fuera de presupuesto")
+        self.stdout.write(self.style.SUCCESS(f"{len(results)} endpoints dentro de presupuesto"))
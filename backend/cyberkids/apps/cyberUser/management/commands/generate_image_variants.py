@@ -0,0 +1,62 @@
+from cloudinary.models import CloudinaryField
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from cyberkids.image_storage import get_image_storage
+from cyberkids.images import PRESETS, is_raster_field
+
+
+def image_fields(only=None):
+    """``(modelo, nombre_campo)`` de cada CloudinaryField rasterizado del proyecto."""
+    for model in apps.get_models():
+        if only and model._meta.label not in only:
+            continue
+        for field in model._meta.get_fields():
+            if isinstance(field, CloudinaryField) and is_raster_field(field):
+                yield model, field.name
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera por adelantado las variantes (thumbnail, card, full) de todas las imágenes "
+        "de CloudinaryField: mascotas, cosméticos, insignias y avatares (no los SVG ni las "
+        "animaciones de los estados). Usa el backend de IMAGE_STORAGE."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model", action="append", default=[],
+                            help="Solo este modelo (p.ej. pets.Pet); se puede repetir")
+        parser.add_argument("--preset", action="append", default=[], choices=sorted(PRESETS),
+                            help="Solo este preset; se puede repetir")
+        parser.add_argument("--dry-run", action="store_true", help="Solo contar imágenes")
+
+    def handle(self, *args, **options):
+        presets = {name: PRESETS[name] for name in options["preset"]} or PRESETS
+        fields = list(image_fields(set(options["model"])))
+        if not fields:
+            raise CommandError("Ningún modelo con CloudinaryField coincide")
+
+        storage = get_image_storage()
+        images = generated = failed = 0
+        for model, name in fields:
+            values = (
+                model.objects.exclude(**{f"{name}__isnull": True}).exclude(**{name: ""})
+                .values_list(name, flat=True).distinct().iterator()
+            )
+            for value in values:
+                images += 1
+                if options["dry_run"]:
+                    continue
+                try:
+                    generated += len(storage.generate_variants(value, presets))
+                except Exception as exc:
+                    # Una imagen rota no debe parar el resto
+                    failed += 1
+                    self.stderr.write(f"{model._meta.label}.{name} {value}: {exc}")
+
+        if options["dry_run"]:
+            self.stdout.write(f"{images} imágenes en {len(fields)} campos")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{generated} variantes generadas para {images} imágenes"))
+            if failed:
+                self.stdout.write(self.style.WARNING(f"{failed} imágenes con error"))
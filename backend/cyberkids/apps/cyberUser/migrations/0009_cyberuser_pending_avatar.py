@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 22:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cyberUser", "0008_alter_cyberuser_avatar"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cyberuser",
+            name="pending_avatar",
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.0.1 on 2026-10-19 22:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cyberUser", "0009_cyberuser_pending_avatar"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StagedAvatar",
+            fields=[
+                ("name", models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ("content", models.BinaryField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("user", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="staged_avatars", to="cyberUser.cyberuser")),
+            ],
+            options={
+                "db_table": "staged_avatar",
+            },
+        ),
+    ]
@@ -90,6 +90,8 @@ class CyberUser(models.Model):
     last_login = models.DateTimeField(null=True, blank=True)
     is_active = models.BooleanField(default=True)
     avatar = CloudinaryField('avatar', folder='avatars/')
+    # Avatar subido y pendiente de publicar (nombre de su StagedAvatar); ver avatars.py
+    pending_avatar = models.CharField(max_length=100, null=True, blank=True)
     preferences = models.OneToOneField(Preferences, on_delete=models.CASCADE, null=True, blank=True)
     country = models.ForeignKey(Country, on_delete=models.CASCADE, null=True, blank=True, related_name='users')
     risk_level = models.ForeignKey(RiskLevel, on_delete=models.CASCADE, null=True, blank=True, related_name='users')
@@ -121,4 +123,21 @@ class CyberUser(models.Model):
         self.password = make_password(raw_password)
 
     def check_password(self, raw_password):
-        return check_password(raw_password, self.password)
\ No newline at end of file
+        return check_password(raw_password, self.password)
+
+
+class StagedAvatar(models.Model):
+    """Avatar subido y validado que espera a que el worker lo reduzca y publique (ver avatars.py).
+
+    Se guarda en la base de datos porque la web y el worker no comparten disco.
+    """
+    name = models.CharField(max_length=100, primary_key=True)
+    user = models.ForeignKey(CyberUser, on_delete=models.CASCADE, related_name='staged_avatars')
+    content = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'staged_avatar'
+
+    def __str__(self):
+        return self.name
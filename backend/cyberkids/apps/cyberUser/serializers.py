@@ -1,6 +1,9 @@
 from rest_framework import serializers
 from .models import CyberUser
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from cyberkids.images import image_variants
+
+from .avatars import DEFAULT_AVATAR_URL, avatar_url, stage_avatar, validate_avatar
 
 from .models import Preferences
 from .models import Country
@@ -14,20 +17,28 @@ class PreferencesSerializer(serializers.ModelSerializer):
 
 class UserSerializer(serializers.ModelSerializer):
     avatar = serializers.SerializerMethodField()
+    avatar_variants = serializers.SerializerMethodField()
+    avatar_pending = serializers.SerializerMethodField()
 
     class Meta:
         model = CyberUser
         fields = [
             'user_id', 'username', 'email', 'country',
             'risk_level', 'pet_id', 'cybercreds', 'created_at',
-            'last_login', 'is_active', 'avatar', 'preferences'
+            'last_login', 'is_active', 'avatar', 'avatar_variants', 'avatar_pending', 'preferences'
         ]
         read_only_fields = ['user_id', 'created_at', 'last_login']
     
     def get_avatar(self, obj):
-        if obj.avatar:
-            return obj.avatar.url
-        return "https://res.cloudinary.com/dsvynqyq5/image/upload/v1768140305/3dcd4af5bc9e06d36305984730ab7888_o3eeob.jpg"
+        return avatar_url(obj, default=DEFAULT_AVATAR_URL)
+
+    def get_avatar_variants(self, obj):
+        if obj.pending_avatar:
+            return None
+        return image_variants(obj.avatar)
+
+    def get_avatar_pending(self, obj):
+        return bool(obj.pending_avatar)
 
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -78,6 +89,17 @@ class UpdateUserSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError('Este email ya está registrado por otro usuario')
         return value.lower() if value else value
 
+    def validate_avatar(self, value):
+        return validate_avatar(value) if value else value
+
+    def update(self, instance, validated_data):
+        # El fichero se publica en segundo plano (avatars.py); no se sube dentro de la petición
+        avatar = validated_data.pop('avatar') if validated_data.get('avatar') else None
+        instance = super().update(instance, validated_data)
+        if avatar:
+            stage_avatar(instance, avatar)
+        return instance
+
 
 class UpdatePreferencesSerializer(serializers.ModelSerializer):
     """Serializer para actualizar preferencias del usuario"""
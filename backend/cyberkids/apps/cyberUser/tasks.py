@@ -0,0 +1,9 @@
+from apps.tasks.runner import task
+
+from .avatars import publish_avatar
+
+
+@task('users.publish_avatar', max_attempts=5)
+def publish_staged_avatar(user_id, name):
+    """Sube a IMAGE_STORAGE un avatar que quedó en staging (ver ``avatars.py``)."""
+    publish_avatar(user_id, name)
@@ -0,0 +1,103 @@
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from apps.cyberUser.models import CyberUser, StagedAvatar
+from apps.tasks.models import BackgroundTask
+from apps.tasks.runner import run_pending
+from cyberkids.image_storage import LocalImageStorage
+
+
+def _image(name='yo.png', size=(1024, 768), mode='RGBA', image_format='PNG'):
+    buffer = BytesIO()
+    Image.new(mode, size, 'blue').save(buffer, format=image_format)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type=f'image/{image_format.lower()}')
+
+
+@override_settings(TASKS_ALWAYS_EAGER=False)
+class AvatarUploadTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        overrides = override_settings(
+            IMAGE_STORAGE='cyberkids.image_storage.LocalImageStorage',
+            IMAGE_LOCAL_ROOT=f'{self.tmp.name}/images',
+            AVATAR_PENDING_URL='https://example.com/pending.png',
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.user = CyberUser.objects.create(username='avatar', email='a@example.com', password='x', avatar='viejo.jpg')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _patch(self, **data):
+        return self.client.patch('/api/users/auth/me/update/', data, format='multipart')
+
+    def test_upload_is_published_in_background(self):
+        response = self._patch(avatar=_image())
+        self.assertEqual(response.status_code, 200)
+        user = response.json()['user']
+        self.assertTrue(user['avatar_pending'])
+        self.assertEqual(user['avatar'], 'https://example.com/pending.png')
+
+        self.user.refresh_from_db()
+        staged = self.user.pending_avatar
+        self.assertEqual(str(self.user.avatar), 'viejo')
+        # En la petición solo se valida: se guardan los bytes subidos, sin reducir
+        with Image.open(BytesIO(StagedAvatar.objects.get(name=staged).content)) as image:
+            self.assertEqual(image.size, (1024, 768))
+
+        self.assertEqual(run_pending(), (1, 0))
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.pending_avatar)
+        self.assertFalse(StagedAvatar.objects.exists())
+        value = self.user.avatar.get_prep_value()
+        self.assertRegex(value, r'^image/upload/v\d+/avatars/\w+\.png$')
+        storage = LocalImageStorage(f'{self.tmp.name}/images')
+        self.assertTrue(storage.path(value).exists())
+        self.assertTrue(storage.path(value, 'thumbnail').exists())
+        with Image.open(storage.path(value)) as image:
+            self.assertEqual(image.size, (512, 384))
+
+        data = self.client.get('/api/users/auth/me/').json()
+        self.assertFalse(data['avatar_pending'])
+        self.assertEqual(set(data['avatar_variants']), {'thumbnail', 'card', 'full'})
+
+    def test_latest_upload_wins(self):
+        self._patch(avatar=_image('a.png'))
+        self._patch(avatar=_image('b.jpg', mode='RGB', image_format='JPEG'))
+        self.assertEqual(BackgroundTask.objects.count(), 2)
+
+        self.assertEqual(run_pending(), (2, 0))
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.pending_avatar)
+        self.assertTrue(self.user.avatar.get_prep_value().endswith('.jpg'))
+        self.assertFalse(StagedAvatar.objects.exists())
+
+    def test_missing_staged_avatar_is_retried(self):
+        self._patch(avatar=_image())
+        StagedAvatar.objects.all().delete()
+
+        self.assertEqual(run_pending(), (0, 1))
+        bg_task = BackgroundTask.objects.get()
+        self.assertEqual(bg_task.status, BackgroundTask.STATUS_PENDING)
+        self.assertIn('DoesNotExist', bg_task.last_error)
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.pending_avatar)
+
+    def test_invalid_file_is_rejected(self):
+        fake = SimpleUploadedFile('x.png', b'no es una imagen', content_type='image/png')
+        self.assertEqual(self._patch(avatar=fake).status_code, 400)
+        with override_settings(AVATAR_MAX_UPLOAD_MB=0):
+            self.assertEqual(self._patch(avatar=_image()).status_code, 400)
+        # Límite de píxeles comprobado con la cabecera, sin decodificar la imagen
+        large = _image()
+        with override_settings(AVATAR_MAX_PIXELS=1024 * 768 - 1), \
+                mock.patch.object(Image.Image, 'load', side_effect=AssertionError('decodificada')):
+            self.assertEqual(self._patch(avatar=large).status_code, 400)
+        self.assertFalse(BackgroundTask.objects.exists())
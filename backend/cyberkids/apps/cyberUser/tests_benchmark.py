@@ -0,0 +1,30 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from cyberkids.benchmark import ENDPOINTS, SMALL_SCALE, run_endpoints, seed_dataset
+
+
+class EndpointQueryBudgetTests(TestCase):
+    """Presupuesto de consultas SQL de cada endpoint sobre un dataset pequeño.
+
+    Los tiempos solo se comprueban con ``manage.py benchmark_api``.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.context = seed_dataset(SMALL_SCALE)
+
+    def test_endpoints_within_query_budget(self):
+        for row in run_endpoints(self.context, repeat=1, endpoints=ENDPOINTS):
+            with self.subTest(endpoint=row['name']):
+                self.assertLess(row['status'], 400, row['url'])
+                self.assertLessEqual(row['queries'], row['max_queries'], row['url'])
+
+    def test_worst_status_across_repeats(self):
+        responses = [mock.Mock(status_code=code) for code in (200, 500, 200)]
+        endpoint = ('flaky', 'GET', '/api/health/', None, 10)
+        with mock.patch('cyberkids.benchmark.Client.get', side_effect=responses):
+            row, = run_endpoints(self.context, repeat=3, endpoints=[endpoint])
+        self.assertEqual(row['status'], 500)
+        self.assertFalse(row['status_ok'])
@@ -0,0 +1,128 @@
+import tempfile
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from apps.pets.models import Pet, PetState
+from apps.pets.serializers import PetSerializer, PetStateSerializer
+from cyberkids import images
+from cyberkids.catalog_cache import clear_catalog_cache
+from cyberkids.image_storage import LocalImageStorage
+from cyberkids.images import PRESETS, clear_image_url_cache, image_url
+
+
+class ImageUrlCacheTests(TestCase):
+    def setUp(self):
+        clear_image_url_cache()
+        clear_catalog_cache()
+
+    def test_url_is_built_once_per_resource_and_transformation(self):
+        with mock.patch.object(images.CloudinaryResource, 'build_url', autospec=True, return_value='u') as build:
+            self.assertEqual(image_url('image/upload/v1/pets/gato.png'), 'u')
+            self.assertEqual(image_url('image/upload/v1/pets/gato.png'), 'u')
+            image_url('image/upload/v1/pets/gato.png', width=64)
+        self.assertEqual(build.call_count, 2)
+
+    def test_urls_and_empty_values(self):
+        self.assertIsNone(image_url(None))
+        self.assertEqual(image_url('https://example.com/a.png'), 'https://example.com/a.png')
+        url = image_url('image/upload/v1/pets/gato.png')
+        self.assertTrue(url.startswith('https://'))
+        self.assertIn('/image/upload/v1/pets/gato.png', url)
+
+    @mock.patch.object(images.cloudinary, 'config', return_value=mock.Mock(cloud_name='cyberkids'))
+    def test_absolute_urls_are_parsed_or_rejected_on_write(self, _config):
+        def validate(value):
+            serializer = PetSerializer(data={'name': 'Gato', 'base_sprite': value})
+            return serializer.validated_data['base_sprite'] if serializer.is_valid() else serializer.errors
+
+        self.assertEqual(
+            validate('https://res.cloudinary.com/cyberkids/image/upload/v3/pets/sprites/gato.png'),
+            'image/upload/v3/pets/sprites/gato.png',
+        )
+        self.assertEqual(validate('image/upload/v3/pets/sprites/gato.png'), 'image/upload/v3/pets/sprites/gato.png')
+        for value in (
+            'https://example.com/gato.png',
+            'https://res.cloudinary.com/cyberkids/image/upload/c_fill,w_64/v3/pets/gato.png',
+            'https://res.cloudinary.com/cyberkids/image/upload/pets/gato.png',
+            'https://res.cloudinary.com/otra/image/upload/v3/pets/gato.png',
+        ):
+            self.assertIn('base_sprite', validate(value), value)
+
+    @override_settings(CLOUDINARY_URL_CACHE_MAX_ENTRIES=2)
+    def test_cache_is_bounded(self):
+        for name in ('a', 'b', 'c'):
+            image_url(f'image/upload/v1/{name}.png')
+        self.assertEqual(len(images._urls), 2)
+
+    def test_serializers_return_urls(self):
+        Pet.objects.create(name='Gato', base_sprite='image/upload/v3/pets/sprites/gato.png')
+        data = APIClient().get('/api/pets/pets/').json()
+        rows = data['results'] if isinstance(data, dict) else data
+        self.assertTrue(rows[0]['base_sprite'].endswith('/image/upload/v3/pets/sprites/gato.png'))
+        self.assertEqual(set(rows[0]['base_sprite_variants']), set(PRESETS))
+        self.assertIn('c_fill,f_auto,h_128,q_auto,w_128', rows[0]['base_sprite_variants']['thumbnail'])
+
+
+class LocalImageStorageTests(TestCase):
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.root.cleanup)
+        self.storage = LocalImageStorage(self.root.name)
+
+    def _png(self, size=(600, 300)):
+        buffer = BytesIO()
+        Image.new('RGB', size, 'red').save(buffer, format='PNG')
+        return SimpleUploadedFile('gato.png', buffer.getvalue(), content_type='image/png')
+
+    def test_upload_and_generate_variants(self):
+        value = self.storage.upload(self._png(), 'pets/sprites/')
+        self.assertRegex(value, r'^image/upload/v\d+/pets/sprites/\w+\.png$')
+        self.assertTrue(self.storage.path(value).exists())
+
+        self.assertEqual(self.storage.generate_variants(value), list(PRESETS))
+        with Image.open(self.storage.path(value, 'thumbnail')) as thumbnail:
+            self.assertEqual(thumbnail.size, (128, 128))
+        with Image.open(self.storage.path(value, 'card')) as card:
+            self.assertEqual(card.size, (480, 240))
+        # 'limit' no amplía el original
+        with Image.open(self.storage.path(value, 'full')) as full:
+            self.assertEqual(full.size, (600, 300))
+
+    def test_command_generates_variants_for_every_image_field(self):
+        value = self.storage.upload(self._png(), 'pets/sprites/')
+        Pet.objects.create(name='Gato', base_sprite=value)
+        Pet.objects.create(name='Sin imagen')
+
+        out = StringIO()
+        with override_settings(IMAGE_STORAGE='cyberkids.image_storage.LocalImageStorage', IMAGE_LOCAL_ROOT=self.root.name):
+            call_command('generate_image_variants', '--model', 'pets.Pet', '--preset', 'thumbnail', stdout=out)
+        self.assertIn('1 variantes generadas para 1 imágenes', out.getvalue())
+        self.assertTrue(Path(self.storage.path(value, 'thumbnail')).exists())
+        self.assertFalse(Path(self.storage.path(value, 'card')).exists())
+
+    def test_svg_and_animations_are_skipped(self):
+        svg = SimpleUploadedFile('gato.svg', b'<svg xmlns="http://www.w3.org/2000/svg"/>', content_type='image/svg+xml')
+        vector = self.storage.upload(svg, 'pets/sprites/')
+        self.assertEqual(self.storage.generate_variants(vector), [])
+
+        pet = Pet.objects.create(name='Gato', base_sprite=vector)
+        Pet.objects.create(name='Perro', base_sprite=self.storage.upload(self._png(), 'pets/sprites/'))
+        state = PetState.objects.create(pet=pet, state_name='Idle', svg=vector, animation_url=vector)
+
+        out = StringIO()
+        with override_settings(IMAGE_STORAGE='cyberkids.image_storage.LocalImageStorage', IMAGE_LOCAL_ROOT=self.root.name):
+            call_command('generate_image_variants', '--preset', 'thumbnail', stdout=out)
+        # Los estados no cuentan: solo los dos base_sprite, y el SVG no genera nada
+        self.assertIn('1 variantes generadas para 2 imágenes', out.getvalue())
+
+        data = PetStateSerializer(state).data
+        self.assertTrue(data['svg'].endswith('.svg'))
+        self.assertNotIn('svg_variants', data)
+        self.assertNotIn('animation_url_variants', data)
@@ -0,0 +1,88 @@
+import json
+import os
+import tempfile
+import time
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from cyberkids.metrics import AUTH_FAILURES, REGISTRY, _read_values
+
+
+def _sample(text, series):
+    for line in text.splitlines():
+        if line.startswith(series + ' '):
+            return float(line.rsplit(' ', 1)[1])
+    return 0.0
+
+
+@override_settings(DEBUG=True)
+class MetricsEndpointTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_failure_is_counted(self):
+        series = 'cyberkids_auth_failures_total{reason="token_invalid"}'
+        before = _sample(self.client.get('/metrics').content.decode(), series)
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer no-es-un-jwt')
+        self.client.get('/api/users/me/')
+        self.client.credentials()
+
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('# TYPE cyberkids_llm_request_seconds histogram', response.content.decode())
+        self.assertEqual(_sample(response.content.decode(), series), before + 1)
+
+    def test_multiprocess_files_are_summed(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_MULTIPROC_DIR=directory):
+            AUTH_FAILURES.inc(reason='login_bad_password')
+            REGISTRY.flush()
+            # Fichero de otro worker
+            key = ['cyberkids_auth_failures_total', [['reason', 'login_bad_password']]]
+            with open(os.path.join(directory, 'metrics_999999_0.json'), 'w') as fh:
+                json.dump([[key, 4]], fh)
+
+            text = self.client.get('/metrics').content.decode()
+            own = REGISTRY._values[('cyberkids_auth_failures_total', (('reason', 'login_bad_password'),))]
+        self.assertEqual(_sample(text, 'cyberkids_auth_failures_total{reason="login_bad_password"}'), own + 4)
+
+    def test_idle_process_flushes_after_interval(self):
+        key = ('cyberkids_auth_failures_total', (('reason', 'login_bad_password'),))
+        with tempfile.TemporaryDirectory() as directory, \
+                override_settings(METRICS_MULTIPROC_DIR=directory, METRICS_FLUSH_INTERVAL=0.05):
+            REGISTRY.flush()
+            AUTH_FAILURES.inc(reason='login_bad_password')
+            # Sin más incrementos ni scrape: lo vuelca el temporizador
+            deadline = time.monotonic() + 5
+            path = os.path.join(directory, f'metrics_{REGISTRY._file_id}.json')
+            while _read_values(path).get(key) != REGISTRY._values[key] and time.monotonic() < deadline:
+                time.sleep(0.02)
+            entries = _read_values(path)
+        self.assertEqual(entries.get(key), REGISTRY._values[key])
+
+    def test_dead_process_files_are_compacted(self):
+        series = 'cyberkids_auth_failures_total{reason="login_bad_password"}'
+        key = ['cyberkids_auth_failures_total', [['reason', 'login_bad_password']]]
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_MULTIPROC_DIR=directory):
+            # Dos workers ya terminados (pid que no existe) y el propio proceso
+            for name, value in (('metrics_999999_0.json', 4), ('metrics_999998_0.json', 1)):
+                with open(os.path.join(directory, name), 'w') as fh:
+                    json.dump([[key, value]], fh)
+            first = _sample(self.client.get('/metrics').content.decode(), series)
+            second = _sample(self.client.get('/metrics').content.decode(), series)
+            files = sorted(os.listdir(directory))
+            own = REGISTRY._values.get(('cyberkids_auth_failures_total', (('reason', 'login_bad_password'),)), 0)
+        self.assertEqual(first, own + 5)
+        self.assertEqual(second, first)
+        self.assertNotIn('metrics_999999_0.json', files)
+        self.assertIn('dead_processes.json', files)
+
+    @override_settings(METRICS_TOKEN='secreto')
+    def test_token_is_required_when_configured(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secreto')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(DEBUG=False, METRICS_TOKEN=None)
+    def test_closed_in_production_without_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
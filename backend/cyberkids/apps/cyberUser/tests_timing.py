@@ -0,0 +1,37 @@
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.cyberUser.models import Country, CyberUser
+from apps.pets.models import Pet, UserPet
+from cyberkids.catalog_cache import clear_catalog_cache
+
+
+class ServerTimingMiddlewareTests(TestCase):
+    def setUp(self):
+        clear_catalog_cache()
+        Country.objects.create(name='Perú', iso_code='PE', language='es')
+        self.client = APIClient()
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=1.0)
+    def test_sampled_request_reports_buckets(self):
+        with self.assertLogs('cyberkids.timing', level='INFO') as logs:
+            response = self.client.get('/api/users/countries/')
+        header = response['Server-Timing']
+        self.assertIn('db;dur=', header)
+        self.assertIn('serialization;dur=', header)
+        self.assertIn('total;dur=', header)
+        self.assertEqual(logs.records[0].fields['path'], '/api/users/countries/')
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=1.0)
+    def test_serializer_data_counts_as_serialization(self):
+        user = CyberUser.objects.create(username='t', email='t@example.com', password='x', avatar='t.jpg')
+        UserPet.objects.create(user=user, pet=Pet.objects.create(name='Gato'))
+        with self.assertLogs('cyberkids.timing', level='INFO') as logs:
+            self.client.get('/api/pets/user-pets/')
+        # ListSerializer.data + render JSON
+        self.assertEqual(logs.records[0].fields['serialization_count'], 2)
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=0)
+    def test_unsampled_request_has_no_header(self):
+        response = self.client.get('/api/users/countries/')
+        self.assertFalse(response.has_header('Server-Timing'))
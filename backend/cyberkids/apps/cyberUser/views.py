@@ -1,5 +1,6 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny, IsAuthenticated
@@ -8,12 +9,15 @@ from django.utils import timezone
 from datetime import timedelta
 from django.conf import settings
 import jwt
+from . import avatars
 from .models import CyberUser, Country
 from .serializers import (
     UserSerializer, RegisterSerializer, LoginSerializer, PreferencesSerializer,
     UpdateUserSerializer, UpdatePreferencesSerializer, ChangePasswordSerializer
     , CountrySerializer
 ) 
+from cyberkids.catalog_cache import catalog_response
+from cyberkids.metrics import ADJUSTMENT_TRANSACTION_TYPE, AUTH_FAILURES
 
 
 def generate_tokens_for_cyberuser(user):
@@ -27,12 +31,7 @@ def generate_tokens_for_cyberuser(user):
     else:
         preferences = user.preferences
 
-    avatar_url = None
-    if user.avatar:
-        if hasattr(user.avatar, 'url'):
-            avatar_url = user.avatar.url
-        else:
-            avatar_url = str(user.avatar)
+    avatar_url = avatars.avatar_url(user)
 
     access_payload = {
         'user_id': user.user_id,
@@ -96,12 +95,14 @@ class LoginView(APIView):
         try:
             user = CyberUser.objects.get(email=email, is_active=True)
         except CyberUser.DoesNotExist:
+            AUTH_FAILURES.inc(reason='login_unknown_email')
             return Response(
                 {'error': 'Credenciales inválidas'},
                 status=status.HTTP_401_UNAUTHORIZED
             )
         
         if not user.check_password(password):
+            AUTH_FAILURES.inc(reason='login_bad_password')
             return Response(
                 {'error': 'Credenciales inválidas'},
                 status=status.HTTP_401_UNAUTHORIZED
@@ -137,8 +138,10 @@ class RefreshTokenView(APIView):
             
             return Response({'tokens': tokens})
         except jwt.ExpiredSignatureError:
+            AUTH_FAILURES.inc(reason='refresh_expired')
             return Response({'error': 'Token expirado'}, status=status.HTTP_401_UNAUTHORIZED)
         except (jwt.InvalidTokenError, CyberUser.DoesNotExist):
+            AUTH_FAILURES.inc(reason='refresh_invalid')
             return Response({'error': 'Token inválido'}, status=status.HTTP_401_UNAUTHORIZED)
 
 
@@ -272,10 +275,21 @@ class UserViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['post'])
     def add_cybercreds(self, request, user_id=None):
+        from django.db import transaction
+        from django.db.models import F
+        from apps.progression.models import CreditTransaction
+
         user = self.get_object()
-        amount = request.data.get('amount', 0)
-        user.cybercreds += int(amount)
-        user.save(update_fields=['cybercreds'])
+        amount = int(request.data.get('amount', 0))
+        # Todo cambio de cybercreds queda en el ledger (ver reconcile_ledger)
+        with transaction.atomic():
+            CyberUser.objects.filter(user_id=user.user_id).update(cybercreds=F('cybercreds') + amount)
+            if amount:
+                CreditTransaction.objects.create(
+                    user=user, amount=amount, transaction_type=ADJUSTMENT_TRANSACTION_TYPE,
+                    description='Ajuste manual de cybercreds', reference_type='admin',
+                )
+        user.refresh_from_db(fields=['cybercreds'])
         return Response(UserSerializer(user).data)
 
     @action(detail=True, methods=['post'])
@@ -292,6 +306,32 @@ class CountryViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = CountrySerializer
     lookup_field = 'country_id'
 
+    def list(self, request, *args, **kwargs):
+        """Lista paginada de países servida desde la caché de catálogos.
+
+        La variante es solo el número de página validado: ni el Host ni otros
+        parámetros crean entradas nuevas. Por eso ``next``/``previous`` son
+        rutas relativas, iguales para cualquier host.
+        """
+        paginator = self.paginator
+        page = request.query_params.get(paginator.page_query_param, '1')
+        if page not in paginator.last_page_strings:
+            if not page.isdigit() or int(page) < 1:
+                raise NotFound('Página no válida.')
+            page = int(page)
+
+        def build():
+            data = super(CountryViewSet, self).list(request, *args, **kwargs).data
+            current = paginator.page
+            data['next'] = _page_link(request.path, current.next_page_number()) if current.has_next() else None
+            data['previous'] = _page_link(request.path, current.previous_page_number()) if current.has_previous() else None
+            return data
+        return catalog_response(request, 'countries', build, variant=f'page:{page}')
+
+
+def _page_link(path, number):
+    return path if number == 1 else f'{path}?page={number}'
+
 
 class DashboardView(APIView):
     """
@@ -5,3 +5,8 @@ class MinigamesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.minigames'
     verbose_name = 'Minigames'
+
+    def ready(self):
+        from cyberkids.catalog_cache import track_catalog
+        from .models import Minigame, SwipeQuestion
+        track_catalog('minigames', Minigame, SwipeQuestion)
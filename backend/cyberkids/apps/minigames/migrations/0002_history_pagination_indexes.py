@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 17:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cyberUser", "0008_alter_cyberuser_avatar"),
+        ("minigames", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="minigamesession",
+            index=models.Index(fields=["user", "-played_at", "-minigame_session_id"], name="minigame_session_user_hist_idx"),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 22:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("minigames", "0002_history_pagination_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="minigamesession",
+            name="rolled_up_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -43,13 +43,24 @@ class MinigameSession(models.Model):
     correct_answers = models.IntegerField(default=0)
     incorrect_answers = models.IntegerField(default=0)
     time_spent_sec = models.IntegerField(null=True, blank=True)
+    # Cuándo se sumó a minigame_accuracy (tarea de rollup o rebuild_statistics); evita contarla dos veces
+    rolled_up_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         db_table = 'minigame_session'
+        indexes = [
+            # Historial paginado por cursor (my_sessions)
+            models.Index(fields=['user', '-played_at', '-minigame_session_id'], name='minigame_session_user_hist_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.minigame.name}"
 
+    @property
+    def session_id(self):
+        """Alias de la clave primaria, igual que GameSession.session_id."""
+        return self.minigame_session_id
+
 
 class SwipeResponse(models.Model):
     response_id = models.AutoField(primary_key=True)
@@ -15,6 +15,11 @@ class MinigameSerializer(serializers.ModelSerializer):
         model = Minigame
         fields = '__all__'
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Precarga las preguntas para evitar una consulta por minijuego."""
+        return queryset.prefetch_related('questions')
+
 
 class SwipeResponseSerializer(serializers.ModelSerializer):
     class Meta:
@@ -27,4 +32,22 @@ class MinigameSessionSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = MinigameSession
-        fields = '__all__'
+        # rolled_up_at es interno de las estadísticas (apps/onboarding/rollups.py)
+        exclude = ['rolled_up_at']
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Precarga las respuestas para evitar una consulta por sesión."""
+        return queryset.prefetch_related('responses')
+
+
+class MinigameSessionSummarySerializer(serializers.ModelSerializer):
+    """Ronda de minijuego sin respuestas, para el historial."""
+    minigame_name = serializers.CharField(source='minigame.name', read_only=True)
+
+    class Meta:
+        model = MinigameSession
+        fields = [
+            'minigame_session_id', 'minigame', 'minigame_name', 'played_at', 'points_earned',
+            'correct_answers', 'incorrect_answers', 'time_spent_sec',
+        ]
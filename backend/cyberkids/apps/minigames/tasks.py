@@ -0,0 +1,29 @@
+from django.db.models import F
+
+from apps.cyberUser.models import CyberUser
+from apps.progression.models import CreditTransaction
+from apps.tasks.runner import task
+
+from .models import MinigameSession
+
+
+@task('minigames.award_session_points')
+def award_session_points(minigame_session_id):
+    """Acredita los puntos de una ronda terminada y registra su CreditTransaction."""
+    session = MinigameSession.objects.select_related('minigame').get(minigame_session_id=minigame_session_id)
+    if not session.points_earned:
+        return
+    if CreditTransaction.objects.filter(
+        reference_type='minigame_session', reference_id=minigame_session_id
+    ).exists():
+        return
+
+    CyberUser.objects.filter(user_id=session.user_id).update(cybercreds=F('cybercreds') + session.points_earned)
+    CreditTransaction.objects.create(
+        user_id=session.user_id,
+        amount=session.points_earned,
+        transaction_type='minigame',
+        description=f'Minijuego: {session.minigame.name}',
+        reference_id=minigame_session_id,
+        reference_type='minigame_session'
+    )
@@ -0,0 +1,68 @@
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.cyberUser.models import CyberUser
+from apps.minigames.models import Minigame, MinigameSession, SwipeQuestion, SwipeResponse
+from apps.minigames.tasks import award_session_points
+from apps.progression.models import CreditTransaction
+from apps.tasks.runner import run_pending
+
+
+@override_settings(TASKS_ALWAYS_EAGER=False)
+class MinigameSessionTests(TestCase):
+    def setUp(self):
+        self.user = CyberUser.objects.create(username='jugador', email='j@example.com', password='x', avatar='j.jpg')
+        self.minigame = Minigame.objects.create(name='Swipe', type='swipe', base_points=10)
+        self.question = SwipeQuestion.objects.create(
+            minigame=self.minigame, notification_content='¿Link raro?', correct_answer='Dangerous',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_finish_references_the_minigame_session(self):
+        session = MinigameSession.objects.create(user=self.user, minigame=self.minigame)
+        SwipeResponse.objects.create(minigame_session=session, question=self.question, user_answer='Dangerous', is_correct=True)
+
+        response = self.client.post(f'/api/minigames/sessions/{session.session_id}/finish/', {}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['points_earned'], 10)
+        self.assertEqual(response.json()['new_cybercreds_balance'], 10)
+        # Terminar dos veces no premia dos veces
+        self.client.post(f'/api/minigames/sessions/{session.session_id}/finish/', {}, format='json')
+
+        # Créditos y estadísticas por país
+        self.assertEqual(run_pending(), (2, 0))
+        tx = CreditTransaction.objects.get(user=self.user, transaction_type='minigame')
+        self.assertEqual(tx.reference_id, session.minigame_session_id)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.cybercreds, 10)
+
+    def test_repeat_finish_does_not_count_an_award_twice(self):
+        session = MinigameSession.objects.create(user=self.user, minigame=self.minigame)
+        SwipeResponse.objects.create(minigame_session=session, question=self.question, user_answer='Dangerous', is_correct=True)
+        url = f'/api/minigames/sessions/{session.session_id}/finish/'
+        first = self.client.post(url, {}, format='json').json()
+        self.assertEqual((first['new_cybercreds_balance'], first['pending_award']), (10, True))
+
+        # El worker acreditó la ronda pero murió antes de marcar la tarea como hecha
+        award_session_points(session.minigame_session_id)
+        again = self.client.post(url, {}, format='json').json()
+        self.assertEqual((again['new_cybercreds_balance'], again['pending_award']), (10, False))
+
+    def test_history_returns_last_rounds_newest_first(self):
+        sessions = [MinigameSession.objects.create(user=self.user, minigame=self.minigame) for _ in range(3)]
+
+        data = self.client.get('/api/minigames/sessions/history/', {'limit': 2}).json()
+        ids = [row['minigame_session_id'] for row in data['results']]
+        self.assertEqual(ids, [sessions[2].session_id, sessions[1].session_id])
+        self.assertEqual(data['results'][0]['minigame_name'], 'Swipe')
+
+        rest = self.client.get('/api/minigames/sessions/history/', {'cursor': data['next_cursor']}).json()
+        self.assertEqual([row['minigame_session_id'] for row in rest['results']], [sessions[0].session_id])
+        self.assertIsNone(rest['next_cursor'])
+
+    def test_session_list_is_ordered_by_played_at(self):
+        MinigameSession.objects.create(user=self.user, minigame=self.minigame)
+        response = self.client.get('/api/minigames/sessions/', {'user_id': self.user.user_id})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 1)
@@ -2,24 +2,37 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from django.db.models import Count, Q, Sum
 from django.shortcuts import get_object_or_404
 
 from .models import Minigame, SwipeQuestion, MinigameSession, SwipeResponse
-from .serializers import MinigameSerializer, SwipeQuestionSerializer, MinigameSessionSerializer, SwipeResponseSerializer
+from .serializers import (
+    MinigameSerializer, SwipeQuestionSerializer, MinigameSessionSerializer, SwipeResponseSerializer,
+    MinigameSessionSummarySerializer,
+)
 from apps.cyberUser.models import CyberUser
 from apps.progression.models import CreditTransaction
+from apps.tasks.models import BackgroundTask
+from apps.tasks.runner import enqueue
+from cyberkids import pagination
+from cyberkids.catalog_cache import catalog_response
+
+# Orden de paginación por cursor; coincide con el índice (user, played_at) del modelo
+SESSION_ORDERING = ('-played_at', '-minigame_session_id')
 
 
 class MinigameViewSet(viewsets.ModelViewSet):
-    queryset = Minigame.objects.all()
+    queryset = MinigameSerializer.setup_eager_loading(Minigame.objects.all())
     serializer_class = MinigameSerializer
     permission_classes = [AllowAny]
 
     @action(detail=False, methods=['get'])
     def active(self, request):
         """Lista minijuegos activos."""
-        minigames = Minigame.objects.filter(is_active=True)
-        return Response(MinigameSerializer(minigames, many=True).data)
+        def build():
+            minigames = MinigameSerializer.setup_eager_loading(Minigame.objects.filter(is_active=True))
+            return MinigameSerializer(minigames, many=True).data
+        return catalog_response(request, 'minigames', build)
 
     @action(detail=True, methods=['get'])
     def questions(self, request, pk=None):
@@ -58,7 +71,9 @@ class MinigameSessionViewSet(viewsets.ModelViewSet):
     serializer_class = MinigameSessionSerializer
 
     def get_queryset(self):
-        queryset = MinigameSession.objects.all().order_by('-started_at')
+        queryset = MinigameSessionSerializer.setup_eager_loading(
+            MinigameSession.objects.order_by(*SESSION_ORDERING)
+        )
         user_id = self.request.query_params.get('user_id')
         if user_id:
             queryset = queryset.filter(user_id=user_id)
@@ -92,54 +107,108 @@ class MinigameSessionViewSet(viewsets.ModelViewSet):
         if time_spent_sec:
             session.time_spent_sec = time_spent_sec
 
-        # Calcular respuestas correctas e incorrectas
-        responses = session.responses.all()
-        correct = responses.filter(is_correct=True).count()
-        incorrect = responses.filter(is_correct=False).count()
+        # Calcular respuestas correctas e incorrectas en una sola consulta
+        counts = session.responses.aggregate(
+            correct=Count('response_id', filter=Q(is_correct=True)),
+            incorrect=Count('response_id', filter=Q(is_correct=False)),
+        )
+        correct = counts['correct']
+        incorrect = counts['incorrect']
 
         session.correct_answers = correct
         session.incorrect_answers = incorrect
         session.points_earned = correct * session.minigame.base_points
         session.save()
 
-        # Añadir cybercreds al usuario
+        # Los cybercreds y su CreditTransaction se escriben en segundo plano;
+        # la clave de idempotencia evita premiar dos veces la misma ronda
+        task = enqueue(
+            'minigames.award_session_points',
+            {'minigame_session_id': session.minigame_session_id},
+            idempotency_key=f'minigame_session:{session.minigame_session_id}:award',
+        )
+        enqueue(
+            'onboarding.rollup_minigame_session',
+            {'minigame_session_id': session.minigame_session_id},
+            idempotency_key=f'minigame_session:{session.minigame_session_id}:rollup',
+        )
         user = session.user
-        user.cybercreds += session.points_earned
-        user.save(update_fields=['cybercreds'])
-
-        # Registrar transacción
-        CreditTransaction.objects.create(
-            user=user,
-            amount=session.points_earned,
-            transaction_type='minigame',
-            description=f'Minijuego: {session.minigame.name}',
-            reference_id=session.session_id,
-            reference_type='minigame_session'
+        user.refresh_from_db(fields=['cybercreds'])
+        # Al terminar dos veces la ronda puede estar ya pagada aunque la tarea no
+        # conste como hecha: lo que manda es su CreditTransaction
+        pending_award = (
+            bool(session.points_earned)
+            and task.status in (BackgroundTask.STATUS_PENDING, BackgroundTask.STATUS_RUNNING)
+            and not CreditTransaction.objects.filter(
+                reference_type='minigame_session', reference_id=session.minigame_session_id,
+            ).exists()
         )
+        new_balance = user.cybercreds
+        if pending_award:
+            # Saldo que tendrá el usuario cuando el worker procese la tarea
+            new_balance += session.points_earned
 
         return Response({
             'session': MinigameSessionSerializer(session).data,
             'points_earned': session.points_earned,
-            'new_cybercreds_balance': user.cybercreds
+            'new_cybercreds_balance': new_balance,
+            'pending_award': pending_award,
         })
 
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def my_sessions(self, request):
-        """Lista las sesiones del usuario autenticado."""
-        sessions = MinigameSession.objects.filter(user=request.user).order_by('-started_at')
+        """Lista las sesiones del usuario autenticado.
+
+        Con ``limit``/``cursor`` devuelve ``{'results': [...], 'next_cursor': ...}``.
+        """
+        sessions = MinigameSessionSerializer.setup_eager_loading(
+            MinigameSession.objects.filter(user=request.user)
+        )
+        if pagination.is_requested(request):
+            try:
+                page, next_cursor = pagination.paginate(sessions, request, SESSION_ORDERING)
+            except pagination.InvalidCursor as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            return Response({
+                'results': MinigameSessionSerializer(page, many=True).data,
+                'next_cursor': next_cursor,
+            })
+        sessions = sessions.order_by(*SESSION_ORDERING)
         return Response(MinigameSessionSerializer(sessions, many=True).data)
 
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def history(self, request):
+        """Últimas rondas del usuario, sin respuestas.
+
+        Query params: ``limit`` (10 por defecto) y ``cursor`` para la página siguiente.
+        Recorre el índice (user, played_at) sin leer sesiones más antiguas.
+        """
+        sessions = MinigameSession.objects.filter(user=request.user).select_related('minigame')
+        try:
+            page, next_cursor = pagination.paginate(sessions, request, SESSION_ORDERING, default_limit=10)
+        except pagination.InvalidCursor as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'results': MinigameSessionSummarySerializer(page, many=True).data,
+            'next_cursor': next_cursor,
+        })
+
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def my_stats(self, request):
         """Estadísticas de minijuegos del usuario autenticado."""
-        user = request.user
-        sessions = MinigameSession.objects.filter(user=user)
+        totals = MinigameSession.objects.filter(user=request.user).aggregate(
+            sessions=Count('minigame_session_id'),
+            points=Sum('points_earned'),
+            correct=Sum('correct_answers'),
+            incorrect=Sum('incorrect_answers'),
+            time=Sum('time_spent_sec'),
+        )
         
-        total_sessions = sessions.count()
-        total_points = sum(s.points_earned or 0 for s in sessions)
-        total_correct = sum(s.correct_answers or 0 for s in sessions)
-        total_incorrect = sum(s.incorrect_answers or 0 for s in sessions)
-        total_time = sum(s.time_spent_sec or 0 for s in sessions)
+        total_sessions = totals['sessions']
+        total_points = totals['points'] or 0
+        total_correct = totals['correct'] or 0
+        total_incorrect = totals['incorrect'] or 0
+        total_time = totals['time'] or 0
         
         return Response({
             'total_sessions': total_sessions,
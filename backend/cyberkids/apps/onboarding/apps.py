@@ -5,3 +5,20 @@ class OnboardingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.onboarding'
     verbose_name = 'Onboarding'
+
+    def ready(self):
+        from cyberkids.catalog_cache import track_catalog
+        from .models import OnboardingQuestion, AnswerOption
+        track_catalog('onboarding', OnboardingQuestion, AnswerOption)
+
+        # Cambiar pesos o valores de riesgo deja desfasados los risk_level guardados
+        from django.db import transaction
+        from django.db.models.signals import post_delete, post_save
+
+        def _schedule_rescore(sender, **kwargs):
+            from .tasks import schedule_rescore
+            transaction.on_commit(schedule_rescore)
+
+        for model in (OnboardingQuestion, AnswerOption):
+            post_save.connect(_schedule_rescore, sender=model, weak=False, dispatch_uid=f'rescore:{model.__name__}')
+            post_delete.connect(_schedule_rescore, sender=model, weak=False, dispatch_uid=f'rescore-delete:{model.__name__}')
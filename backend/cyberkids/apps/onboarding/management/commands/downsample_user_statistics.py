@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.onboarding.timeseries import BUCKETS, downsample
+
+
+class Command(BaseCommand):
+    help = (
+        "Resume los puntos antiguos de user_statistic en uno por usuario, métrica y periodo "
+        "(media ponderada). El último punto de cada serie se conserva siempre."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than-days", type=int, default=90, help="Antigüedad mínima de los puntos")
+        parser.add_argument("--bucket", choices=BUCKETS, default="day", help="Periodo de agrupación")
+        parser.add_argument("--batch-size", type=int, default=500, help="Grupos por transacción")
+
+    def handle(self, *args, **options):
+        older_than = timezone.now() - timedelta(days=options["older_than_days"])
+        removed = downsample(older_than, bucket=options["bucket"], batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"{removed} puntos resumidos"))
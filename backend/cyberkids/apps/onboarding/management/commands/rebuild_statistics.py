@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.onboarding.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula desde cero las estadísticas por país y globales (global_statistic): "
+        "riesgo medio, tasa de victorias por escenario, acierto en minijuegos y usuarios "
+        "activos. Entre ejecuciones se mantienen de forma incremental; programar a diario."
+    )
+
+    def handle(self, *args, **options):
+        written = rebuild()
+        self.stdout.write(self.style.SUCCESS(f"{written} estadísticas recalculadas"))
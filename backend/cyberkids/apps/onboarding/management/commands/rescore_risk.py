@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from apps.onboarding.risk import rescore_all
+from apps.tasks.runner import enqueue
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula risk_level y onboarding_risk_score de todos los usuarios con "
+        "respuestas (tras cambiar risk_weight o risk_value). Al editar preguntas u "
+        "opciones se encola automáticamente; este comando lo fuerza."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Usuarios por lote")
+        parser.add_argument("--enqueue", action="store_true", help="Encolarlo para run_tasks en lugar de ejecutarlo aquí")
+
+    def handle(self, *args, **options):
+        if options["enqueue"]:
+            enqueue("onboarding.rescore_all", {"batch_size": options["batch_size"]})
+            self.stdout.write(self.style.SUCCESS("Recálculo encolado"))
+            return
+        total = rescore_all(options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"{total} usuarios recalculados"))
@@ -0,0 +1,46 @@
+# Generated by Django 6.0.1 on 2026-10-19 21:20
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def drop_duplicate_statistics(apps, schema_editor):
+    """Deja una sola fila por (métrica, país) antes de añadir las restricciones únicas."""
+    GlobalStatistic = apps.get_model("onboarding", "GlobalStatistic")
+    keep = GlobalStatistic.objects.values("metric", "country_id").annotate(keep=Max("statistic_id")).values_list("keep", flat=True)
+    GlobalStatistic.objects.exclude(statistic_id__in=list(keep)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cyberUser", "0008_alter_cyberuser_avatar"),
+        ("onboarding", "0002_alter_answeroption_options_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="globalstatistic",
+            name="dimension",
+            field=models.CharField(blank=True, default="", max_length=50),
+        ),
+        migrations.AddField(
+            model_name="globalstatistic",
+            name="sample_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="globalstatistic",
+            name="total",
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(drop_duplicate_statistics, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="globalstatistic",
+            constraint=models.UniqueConstraint(condition=models.Q(("country__isnull", False)), fields=("metric", "dimension", "country"), name="global_stat_country_uniq"),
+        ),
+        migrations.AddConstraint(
+            model_name="globalstatistic",
+            constraint=models.UniqueConstraint(condition=models.Q(("country__isnull", True)), fields=("metric", "dimension"), name="global_stat_global_uniq"),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.0.1 on 2026-10-19 21:55
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cyberUser", "0008_alter_cyberuser_avatar"),
+        ("onboarding", "0003_global_statistic_rollups"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userstatistic",
+            name="sample_count",
+            field=models.IntegerField(default=1),
+        ),
+        migrations.AlterField(
+            model_name="userstatistic",
+            name="calculated_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name="userstatistic",
+            index=models.Index(fields=["user", "metric", "calculated_at"], name="user_statistic_series_idx"),
+        ),
+    ]
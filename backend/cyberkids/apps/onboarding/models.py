@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from apps.cyberUser.models import CyberUser, Country
 
 
@@ -48,28 +49,59 @@ class OnboardingResponse(models.Model):
 
 
 class UserStatistic(models.Model):
+    """Serie temporal de una métrica del usuario: cada cálculo añade un punto.
+
+    El valor actual es el punto más reciente. ``sample_count`` > 1 indica un
+    punto que resume varios antiguos (ver apps/onboarding/timeseries.py).
+    """
     statistic_id = models.AutoField(primary_key=True)
     user = models.ForeignKey(CyberUser, on_delete=models.CASCADE, related_name='statistics')
     metric = models.CharField(max_length=100)  
     value = models.FloatField()
-    calculated_at = models.DateTimeField(auto_now=True)
+    sample_count = models.IntegerField(default=1)
+    calculated_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         db_table = 'user_statistic'
+        indexes = [
+            # Último valor y tendencia de una métrica del usuario
+            models.Index(fields=['user', 'metric', 'calculated_at'], name='user_statistic_series_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.metric}: {self.value}"
 
 
 class GlobalStatistic(models.Model):
+    """Agregado precalculado por país (``country``) o global (``country`` nulo).
+
+    ``value`` es ``total / sample_count``; guardar ambos permite actualizarlo
+    de forma incremental (ver apps/onboarding/rollups.py).
+    """
     statistic_id = models.AutoField(primary_key=True)
     metric = models.CharField(max_length=100)
+    # Subdivisión opcional de la métrica, p. ej. el scenario_id en scenario_win_rate
+    dimension = models.CharField(max_length=50, default='', blank=True)
     value = models.FloatField()
+    total = models.FloatField(default=0)
+    sample_count = models.IntegerField(default=0)
     country = models.ForeignKey(Country, on_delete=models.SET_NULL, null=True, blank=True, related_name='statistics')
     calculated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'global_statistic'
+        # Una fila por métrica/dimensión y país; NULL no cuenta como repetido en UNIQUE,
+        # así que la fila global necesita su propia restricción parcial
+        constraints = [
+            models.UniqueConstraint(
+                fields=['metric', 'dimension', 'country'], condition=models.Q(country__isnull=False),
+                name='global_stat_country_uniq',
+            ),
+            models.UniqueConstraint(
+                fields=['metric', 'dimension'], condition=models.Q(country__isnull=True),
+                name='global_stat_global_uniq',
+            ),
+        ]
 
     def __str__(self):
         country_name = self.country.name if self.country else "Global"
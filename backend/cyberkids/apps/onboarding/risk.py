@@ -0,0 +1,168 @@
+"""
+Puntuación de riesgo del onboarding, compartida por ``calculate-my-risk``,
+el endpoint legacy ``calculate_risk`` y los recálculos masivos.
+
+La puntuación es la suma de ``risk_value`` de la opción elegida por el
+``risk_weight`` de su pregunta, sobre el máximo posible (valor máximo de una
+opción por la suma de los pesos de las preguntas respondidas).
+
+Los pesos de las preguntas se guardan en memoria del proceso con un
+``CatalogMemo`` del catálogo ``onboarding``; así las respuestas se agregan en una
+sola consulta (agrupada por usuario) sin unir la tabla de preguntas. Los
+recálculos masivos (``rescore_all``) leen los pesos de la base de datos al
+empezar, sin pasar por esa memoria.
+"""
+
+from collections import namedtuple
+
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Sum, Value, When
+
+from apps.cyberUser.models import CyberUser, RiskLevel
+from cyberkids.catalog_cache import CatalogMemo
+
+from . import timeseries
+from .models import OnboardingQuestion, OnboardingResponse
+from .rollups import AVG_RISK_SCORE, bump_many, user_countries
+
+# Valor máximo de risk_value en una opción
+MAX_OPTION_VALUE = 5
+
+RISK_SCORE_METRIC = 'onboarding_risk_score'
+
+RiskScore = namedtuple('RiskScore', [
+    'user_id', 'total_risk_score', 'max_possible_score', 'risk_percentage', 'risk_level', 'questions_answered',
+])
+
+def load_question_weights():
+    """Lee de la base de datos ``({question_id: risk_weight}, preguntas_activas)``."""
+    weights, active = {}, 0
+    for question_id, weight, is_active in OnboardingQuestion.objects.values_list('question_id', 'risk_weight', 'is_active'):
+        weights[question_id] = weight
+        active += bool(is_active)
+    return weights, active
+
+
+def _load_risk_level_ids():
+    return dict(RiskLevel.objects.values_list('name', 'risk_level_id'))
+
+
+_weights = CatalogMemo('onboarding', load_question_weights)
+_risk_levels = CatalogMemo('risk_levels', _load_risk_level_ids)
+
+
+def get_question_weights():
+    """Como ``load_question_weights``, guardado en memoria mientras no cambie el catálogo."""
+    return _weights.get()
+
+
+def get_risk_level_ids():
+    """``{nombre: risk_level_id}`` de la tabla risk_level."""
+    return _risk_levels.get()
+
+
+def risk_level_for(percentage):
+    if percentage <= 33:
+        return 'Low'
+    if percentage <= 66:
+        return 'Medium'
+    return 'High'
+
+
+def _weight_expression(weights):
+    if not weights:
+        return Value(0, output_field=IntegerField())
+    return Case(
+        *[When(question_id=question_id, then=Value(weight)) for question_id, weight in weights.items()],
+        default=Value(0), output_field=IntegerField(),
+    )
+
+
+def score_users(user_ids, weights=None):
+    """``{user_id: RiskScore}`` de los usuarios con alguna respuesta con opción.
+
+    Una sola consulta agrupada por usuario para todo el lote. ``weights`` por
+    defecto son los de ``get_question_weights``.
+    """
+    if weights is None:
+        weights, _ = get_question_weights()
+    weight = _weight_expression(weights)
+    rows = (
+        OnboardingResponse.objects.filter(user_id__in=user_ids, option__isnull=False)
+        .values('user_id')
+        .annotate(
+            total=Sum(F('option__risk_value') * weight),
+            weights=Sum(weight),
+            answered=Count('response_id'),
+        )
+        .order_by()
+    )
+    scores = {}
+    for row in rows:
+        total = row['total'] or 0
+        max_possible = (row['weights'] or 0) * MAX_OPTION_VALUE or 1
+        percentage = total / max_possible * 100
+        scores[row['user_id']] = RiskScore(
+            row['user_id'], total, max_possible, percentage, risk_level_for(percentage), row['answered'],
+        )
+    return scores
+
+
+def score_user(user_id):
+    """``RiskScore`` del usuario, o None si no tiene respuestas con opción."""
+    return score_users([user_id]).get(user_id)
+
+
+def save_scores(scores):
+    """Guarda ``risk_level`` y un punto de ``onboarding_risk_score`` por cada puntuación.
+
+    Solo se escribe la columna risk_level: un UPDATE por nivel para todo el lote.
+    """
+    levels = get_risk_level_ids()
+    by_level = {}
+    for score in scores:
+        if score.risk_level in levels:
+            by_level.setdefault(levels[score.risk_level], []).append(score.user_id)
+    for risk_level_id, user_ids in by_level.items():
+        CyberUser.objects.filter(user_id__in=user_ids).update(risk_level_id=risk_level_id)
+
+    # Un punto nuevo en la serie onboarding_risk_score (solo si cambia el valor)
+    values = {score.user_id: score.risk_percentage for score in scores}
+    written = timeseries.record(RISK_SCORE_METRIC, values)
+    # Diferencia por usuario para la media por país (global_statistic)
+    deltas = {
+        user_id: (values[user_id], 1) if previous is None else (values[user_id] - previous, 0)
+        for user_id, previous in written.items()
+    }
+
+    countries = user_countries(list(deltas))
+    by_country = {}
+    for user_id, (total, count) in deltas.items():
+        country_total, country_count = by_country.get(countries.get(user_id), (0, 0))
+        by_country[countries.get(user_id)] = (country_total + total, country_count + count)
+    bump_many(AVG_RISK_SCORE, by_country)
+
+
+def rescore_all(batch_size=1000):
+    """Recalcula y guarda la puntuación de todos los usuarios con respuestas.
+
+    Para cuando cambian ``risk_weight`` o ``risk_value``: recorre los usuarios por
+    lotes de ``user_id`` con una consulta agrupada y unas pocas escrituras
+    masivas por lote. Los pesos se leen una vez al empezar, directamente de la
+    base de datos. Devuelve el número de usuarios recalculados.
+    """
+    weights, _ = load_question_weights()
+    total = 0
+    last_id = 0
+    while True:
+        user_ids = list(
+            OnboardingResponse.objects.filter(user_id__gt=last_id, option__isnull=False)
+            .order_by('user_id').values_list('user_id', flat=True).distinct()[:batch_size]
+        )
+        if not user_ids:
+            return total
+        last_id = user_ids[-1]
+        scores = score_users(user_ids, weights)
+        with transaction.atomic():
+            save_scores(scores.values())
+        total += len(scores)
@@ -0,0 +1,171 @@
+"""
+Agregados por país y globales en ``global_statistic``.
+
+Cada fila guarda ``total`` y ``sample_count`` además de ``value`` (= total /
+sample_count), así los eventos de dominio la actualizan de forma incremental
+con un ``UPDATE ... SET total = total + x`` en la fila del país y en la global,
+sin recorrer sesiones, respuestas ni usuarios. Los eventos llegan por la cola
+de tareas (``onboarding.rollup_*``) y desde ``risk.save_scores``.
+
+``rebuild_statistics`` lo recalcula todo con consultas agrupadas para corregir
+cualquier deriva; ``active_users_30d`` solo se calcula ahí.
+
+Las sesiones de simulación y de minijuegos llevan ``rolled_up_at``: la tarea
+de rollup lo marca en la misma transacción en que suma y no hace nada si ya
+estaba marcado; ``rebuild`` marca las terminadas que aún no lo estaban y solo
+cuenta las marcadas. Así una tarea que llega (o se reintenta) después de un
+``rebuild`` no vuelve a sumar la misma sesión.
+"""
+
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, ExpressionWrapper, F, FloatField, Q, Sum, Value
+from django.db.models.functions import Coalesce, NullIf
+from django.utils import timezone
+
+from apps.cyberUser.models import CyberUser
+
+from .models import GlobalStatistic
+
+# Media de onboarding_risk_score (0-100)
+AVG_RISK_SCORE = 'avg_risk_score'
+# Proporción de sesiones ganadas (0-1); dimension = scenario_id
+SCENARIO_WIN_RATE = 'scenario_win_rate'
+# Proporción de respuestas correctas en minijuegos (0-1)
+MINIGAME_ACCURACY = 'minigame_accuracy'
+# Usuarios con login en los últimos 30 días
+ACTIVE_USERS = 'active_users_30d'
+
+METRICS = (AVG_RISK_SCORE, SCENARIO_WIN_RATE, MINIGAME_ACCURACY, ACTIVE_USERS)
+
+# Resultados de sesión que cuentan para scenario_win_rate
+WIN_RATE_OUTCOMES = ('won', 'failed')
+
+
+def _bump_row(metric, dimension, country_id, total, count):
+    rows = GlobalStatistic.objects.filter(metric=metric, dimension=dimension, country_id=country_id)
+    new_total = F('total') + total
+    new_count = F('sample_count') + count
+    changes = {
+        'total': new_total,
+        'sample_count': new_count,
+        'value': Coalesce(
+            ExpressionWrapper(new_total / NullIf(new_count, 0), output_field=FloatField()), Value(0.0),
+        ),
+        'calculated_at': timezone.now(),
+    }
+    if rows.update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            GlobalStatistic.objects.create(
+                metric=metric, dimension=dimension, country_id=country_id,
+                total=total, sample_count=count, value=total / count if count else 0,
+            )
+    except IntegrityError:
+        # Otra petición creó la fila a la vez
+        rows.update(**changes)
+
+
+def bump_many(metric, deltas, dimension=''):
+    """Suma ``{country_id: (total, count)}`` a las filas de cada país y a la global.
+
+    ``country_id`` None (usuarios sin país) solo cuenta para la global.
+    """
+    global_total = global_count = 0
+    for country_id, (total, count) in deltas.items():
+        if not total and not count:
+            continue
+        if country_id is not None:
+            _bump_row(metric, dimension, country_id, total, count)
+        global_total += total
+        global_count += count
+    if global_total or global_count:
+        _bump_row(metric, dimension, None, global_total, global_count)
+
+
+def bump(metric, country_id, total, count, dimension=''):
+    bump_many(metric, {country_id: (total, count)}, dimension)
+
+
+def user_countries(user_ids):
+    return dict(CyberUser.objects.filter(user_id__in=user_ids).values_list('user_id', 'country_id'))
+
+
+def _grouped(queryset, country_field, dimension_field=None):
+    """Filas ``(country_id, dimension, total, count)`` de un queryset anotado con total/n."""
+    for row in queryset:
+        dimension = str(row[dimension_field]) if dimension_field else ''
+        yield row[country_field], dimension, row['total'] or 0, row['n'] or 0
+
+
+def rebuild():
+    """Recalcula desde cero todas las métricas. Devuelve el número de filas escritas.
+
+    Todo ocurre en una transacción: se marcan con ``rolled_up_at`` las sesiones
+    terminadas pendientes, se agregan solo las marcadas y se sustituyen las filas.
+    """
+    from apps.minigames.models import MinigameSession
+    from apps.simulation.models import GameSession
+
+    from .models import UserStatistic
+    from .risk import RISK_SCORE_METRIC
+    from .timeseries import latest_point
+
+    with transaction.atomic():
+        now = timezone.now()
+        game_sessions = GameSession.objects.filter(outcome__in=WIN_RATE_OUTCOMES, scenario__isnull=False)
+        game_sessions.filter(rolled_up_at__isnull=True).update(rolled_up_at=now)
+        # Las rondas sin terminar tienen 0 respuestas contadas: se dejan a su tarea
+        minigame_sessions = MinigameSession.objects.annotate(answers=F('correct_answers') + F('incorrect_answers'))
+        minigame_sessions.filter(rolled_up_at__isnull=True, answers__gt=0).update(rolled_up_at=now)
+
+        sources = {
+            AVG_RISK_SCORE: _grouped(
+                UserStatistic.objects.filter(metric=RISK_SCORE_METRIC, statistic_id=latest_point(RISK_SCORE_METRIC))
+                .values('user__country_id').annotate(total=Sum('value'), n=Count('statistic_id')).order_by(),
+                'user__country_id',
+            ),
+            SCENARIO_WIN_RATE: _grouped(
+                game_sessions.filter(rolled_up_at__isnull=False)
+                .values('user__country_id', 'scenario_id')
+                .annotate(total=Count('session_id', filter=Q(outcome='won')), n=Count('session_id')).order_by(),
+                'user__country_id', 'scenario_id',
+            ),
+            MINIGAME_ACCURACY: _grouped(
+                MinigameSession.objects.filter(rolled_up_at__isnull=False).values('user__country_id')
+                .annotate(total=Sum('correct_answers'), n=Sum(F('correct_answers') + F('incorrect_answers'))).order_by(),
+                'user__country_id',
+            ),
+            ACTIVE_USERS: _grouped(
+                CyberUser.objects.filter(last_login__gte=now - timedelta(days=30))
+                .values('country_id').annotate(total=Count('user_id'), n=Value(1)).order_by(),
+                'country_id',
+            ),
+        }
+
+        rows = {}
+        for metric, grouped in sources.items():
+            for country_id, dimension, total, count in grouped:
+                if not total and not count:
+                    continue
+                keys = [(metric, dimension, None)]
+                if country_id is not None:
+                    keys.append((metric, dimension, country_id))
+                for key in keys:
+                    previous_total, previous_count = rows.get(key, (0, 0))
+                    # active_users: una fila por país con count 1; la global suma usuarios, no filas
+                    new_count = 1 if metric == ACTIVE_USERS else previous_count + count
+                    rows[key] = (previous_total + total, new_count)
+
+        statistics = [
+            GlobalStatistic(
+                metric=metric, dimension=dimension, country_id=country_id,
+                total=total, sample_count=count, value=total / count if count else 0,
+            )
+            for (metric, dimension, country_id), (total, count) in rows.items()
+        ]
+        GlobalStatistic.objects.filter(metric__in=METRICS).delete()
+        GlobalStatistic.objects.bulk_create(statistics, batch_size=1000)
+    return len(statistics)
@@ -0,0 +1,64 @@
+from django.utils import timezone
+
+from apps.tasks.models import BackgroundTask
+from apps.tasks.runner import enqueue, task
+
+from .risk import RiskScore, rescore_all, save_scores
+from .rollups import MINIGAME_ACCURACY, SCENARIO_WIN_RATE, WIN_RATE_OUTCOMES, bump
+
+# Espera antes de recalcular, para agrupar varias ediciones seguidas del cuestionario
+RESCORE_DELAY_SECONDS = 60
+
+
+@task('onboarding.record_risk')
+def record_risk(user_id, risk_level_name, risk_percentage):
+    """Guarda el nivel de riesgo calculado y la estadística onboarding_risk_score."""
+    save_scores([RiskScore(user_id, None, None, risk_percentage, risk_level_name, None)])
+
+
+@task('onboarding.rescore_all', max_attempts=3)
+def rescore_all_users(batch_size=1000):
+    """Recalcula el riesgo de todos los usuarios (ver ``rescore_all``)."""
+    rescore_all(batch_size)
+
+
+@task('onboarding.rollup_game_session')
+def rollup_game_session(session_id):
+    """Suma una sesión terminada (ganada o fallada) a scenario_win_rate, una sola vez."""
+    from apps.simulation.models import GameSession
+
+    # Sello condicionado en la misma transacción que la suma: ni los reintentos
+    # ni una sesión que rebuild_statistics ya contó vuelven a sumarse
+    claimed = GameSession.objects.filter(
+        session_id=session_id, rolled_up_at__isnull=True, outcome__in=WIN_RATE_OUTCOMES, scenario__isnull=False,
+    ).update(rolled_up_at=timezone.now())
+    if not claimed:
+        return
+    session = GameSession.objects.select_related('user').get(session_id=session_id)
+    bump(SCENARIO_WIN_RATE, session.user.country_id, int(session.outcome == 'won'), 1, dimension=str(session.scenario_id))
+
+
+@task('onboarding.rollup_minigame_session')
+def rollup_minigame_session(minigame_session_id):
+    """Suma las respuestas de una ronda terminada a minigame_accuracy, una sola vez."""
+    from apps.minigames.models import MinigameSession
+
+    claimed = MinigameSession.objects.filter(
+        minigame_session_id=minigame_session_id, rolled_up_at__isnull=True,
+    ).update(rolled_up_at=timezone.now())
+    if not claimed:
+        return
+    session = MinigameSession.objects.select_related('user').get(minigame_session_id=minigame_session_id)
+    bump(MINIGAME_ACCURACY, session.user.country_id, session.correct_answers,
+         session.correct_answers + session.incorrect_answers)
+
+
+def schedule_rescore():
+    """Encola un recálculo completo si no hay ya uno pendiente.
+
+    Va siempre con ``RESCORE_DELAY_SECONDS`` (nunca en el momento, ni con
+    ``TASKS_ALWAYS_EAGER``) para que el worker agrupe las ediciones seguidas.
+    """
+    pending = BackgroundTask.objects.filter(name='onboarding.rescore_all', status=BackgroundTask.STATUS_PENDING)
+    if not pending.exists():
+        enqueue('onboarding.rescore_all', delay=RESCORE_DELAY_SECONDS)
@@ -0,0 +1,124 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.cyberUser.models import CyberUser, RiskLevel
+from apps.onboarding.models import AnswerOption, OnboardingQuestion, OnboardingResponse, UserStatistic
+from apps.onboarding.risk import get_question_weights, rescore_all, score_users
+from apps.onboarding.timeseries import latest_values
+from apps.tasks.models import BackgroundTask
+from cyberkids.catalog_cache import clear_catalog_cache
+
+
+@override_settings(TASKS_ALWAYS_EAGER=True)
+class RiskScoringTests(TestCase):
+    def setUp(self):
+        clear_catalog_cache()
+        for name in ('Low', 'Medium', 'High'):
+            RiskLevel.objects.create(name=name, description=name, ai_difficult=1, points_multiplier=1.0)
+        self.user = CyberUser.objects.create(username='riesgo', email='r@example.com', password='x', avatar='r.jpg')
+        self.calm = CyberUser.objects.create(username='tranquilo', email='t@example.com', password='x', avatar='t.jpg')
+        heavy = OnboardingQuestion.objects.create(content='¿Compartes contraseñas?', response_type='yes_no', risk_weight=3, display_order=1)
+        light = OnboardingQuestion.objects.create(content='¿Usas redes?', response_type='yes_no', risk_weight=1, display_order=2)
+        for question, user, value in ((heavy, self.user, 5), (light, self.user, 1), (heavy, self.calm, 0), (light, self.calm, 1)):
+            option = AnswerOption.objects.create(question=question, content=str(value), risk_value=value)
+            OnboardingResponse.objects.create(user=user, question=question, option=option)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_scores_are_weighted(self):
+        scores = score_users([self.user.user_id, self.calm.user_id])
+        self.assertEqual(scores[self.user.user_id].total_risk_score, 16)
+        self.assertEqual(scores[self.user.user_id].max_possible_score, 20)
+        self.assertEqual(scores[self.user.user_id].risk_level, 'High')
+        self.assertEqual(scores[self.calm.user_id].risk_level, 'Low')
+
+    def test_calculate_my_risk_writes_only_risk_level(self):
+        data = self.client.post('/api/onboarding/responses/calculate-my-risk/', {}, format='json').json()
+        self.assertEqual(data['risk_percentage'], 80.0)
+        self.assertEqual(data['total_questions'], 2)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.risk_level.name, 'High')
+        statistic = UserStatistic.objects.get(user=self.user, metric='onboarding_risk_score')
+        self.assertEqual(statistic.value, 80.0)
+
+        # El endpoint legacy devuelve lo mismo
+        legacy = self.client.get(f'/api/onboarding/responses/calculate_risk/{self.user.user_id}/').json()
+        self.assertEqual(legacy, data)
+        self.assertEqual(UserStatistic.objects.filter(user=self.user).count(), 1)
+
+    def test_weight_change_rescores_everyone(self):
+        call_command('rescore_risk', stdout=StringIO())
+        self.calm.refresh_from_db()
+        self.assertEqual(self.calm.risk_level.name, 'Low')
+
+        # La pregunta con más riesgo pasa a pesar 0: el que respondió 5 baja de nivel
+        question = OnboardingQuestion.objects.get(display_order=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            question.risk_weight = 0
+            question.save()
+        self.assertTrue(BackgroundTask.objects.filter(name='onboarding.rescore_all').exists())
+
+        call_command('rescore_risk', '--batch-size', '1', stdout=StringIO())
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.risk_level.name, 'Low')
+        self.assertEqual(latest_values([self.user.user_id], 'onboarding_risk_score'), {self.user.user_id: 20.0})
+        # La historia se conserva: 80 -> 20
+        self.assertEqual(UserStatistic.objects.filter(user=self.user).count(), 2)
+
+    def test_question_edits_queue_a_single_rescore(self):
+        # Aunque las tareas sean eager, el recálculo se difiere y agrupa las ediciones
+        for question in OnboardingQuestion.objects.all():
+            for weight in (2, 4):
+                with self.captureOnCommitCallbacks(execute=True):
+                    question.risk_weight = weight
+                    question.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            AnswerOption.objects.first().delete()
+        rescores = BackgroundTask.objects.filter(name='onboarding.rescore_all')
+        self.assertEqual(list(rescores.values_list('status', flat=True)), [BackgroundTask.STATUS_PENDING])
+
+    def test_rescore_all_reads_current_weights(self):
+        rescore_all()
+        get_question_weights()
+        # Cambio sin señales: la memoria del proceso no se entera, el recálculo sí
+        OnboardingQuestion.objects.filter(display_order=1).update(risk_weight=0)
+        self.assertEqual(rescore_all(), 2)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.risk_level.name, 'Low')
+
+
+class SubmitBatchTests(TestCase):
+    def setUp(self):
+        clear_catalog_cache()
+        self.user = CyberUser.objects.create(username='lote', email='l@example.com', password='x', avatar='l.jpg')
+        self.questions = [
+            OnboardingQuestion.objects.create(content=f'q{i}', response_type='yes_no', risk_weight=1, display_order=i)
+            for i in range(20)
+        ]
+        self.options = [AnswerOption.objects.create(question=q, content='sí', risk_value=5) for q in self.questions]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_batch_upsert_is_constant_queries(self):
+        OnboardingResponse.objects.create(user=self.user, question=self.questions[0])
+        payload = [{'question_id': q.question_id, 'option_id': o.option_id} for q, o in zip(self.questions, self.options)]
+        payload.append({'question_id': 999999, 'option_id': self.options[0].option_id})
+
+        with self.assertNumQueries(4):
+            data = self.client.post('/api/onboarding/responses/submit-batch/', {'responses': payload}, format='json').json()
+        self.assertEqual((data['created_count'], data['updated_count'], data['total_processed']), (19, 1, 20))
+        self.assertEqual(
+            OnboardingResponse.objects.filter(user=self.user, option__isnull=False).count(), 20,
+        )
+
+    def test_batch_can_return_risk(self):
+        payload = [{'question_id': self.questions[0].question_id, 'option_id': self.options[0].option_id}]
+        data = self.client.post(
+            '/api/onboarding/responses/submit-batch/', {'responses': payload, 'calculate_risk': True}, format='json',
+        ).json()
+        self.assertEqual(data['risk']['risk_level'], 'High')
+        self.assertEqual(data['risk']['questions_answered'], 1)
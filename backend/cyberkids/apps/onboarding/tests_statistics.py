@@ -0,0 +1,84 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.cyberUser.models import Country, CyberUser, RiskLevel
+from apps.minigames.models import Minigame, MinigameSession
+from apps.onboarding.models import GlobalStatistic, UserStatistic
+from apps.onboarding.risk import RiskScore, save_scores
+from apps.onboarding.rollups import AVG_RISK_SCORE, MINIGAME_ACCURACY, SCENARIO_WIN_RATE
+from apps.simulation.models import GameSession, Scenario
+from apps.tasks.runner import enqueue
+
+
+def _value(metric, country=None, dimension=''):
+    return GlobalStatistic.objects.get(metric=metric, country=country, dimension=dimension).value
+
+
+@override_settings(TASKS_ALWAYS_EAGER=True)
+class GlobalRollupTests(TestCase):
+    def setUp(self):
+        for name in ('Low', 'Medium', 'High'):
+            RiskLevel.objects.create(name=name, description=name, ai_difficult=1, points_multiplier=1.0)
+        self.peru = Country.objects.create(name='Perú')
+        self.chile = Country.objects.create(name='Chile')
+        self.a = CyberUser.objects.create(username='a', email='a@example.com', password='x', avatar='a.jpg', country=self.peru)
+        self.b = CyberUser.objects.create(username='b', email='b@example.com', password='x', avatar='b.jpg', country=self.chile)
+        self.scenario = Scenario.objects.create(name='s', antagonist_goal='g', difficulty_level=1, is_active=True)
+
+    def test_incremental_updates_match_rebuild(self):
+        save_scores([RiskScore(self.a.user_id, 0, 1, 80.0, 'High', 1), RiskScore(self.b.user_id, 0, 1, 20.0, 'Low', 1)])
+        save_scores([RiskScore(self.a.user_id, 0, 1, 60.0, 'Medium', 1)])
+        self.assertEqual(_value(AVG_RISK_SCORE), 40.0)
+        self.assertEqual(_value(AVG_RISK_SCORE, self.peru), 60.0)
+
+        for user, outcome in ((self.a, 'won'), (self.a, 'failed'), (self.b, 'won')):
+            session = GameSession.objects.create(user=user, scenario=self.scenario, outcome=outcome, is_game_over=outcome == 'failed')
+            enqueue('onboarding.rollup_game_session', {'session_id': session.session_id})
+        dimension = str(self.scenario.scenario_id)
+        self.assertAlmostEqual(_value(SCENARIO_WIN_RATE, dimension=dimension), 2 / 3)
+        self.assertEqual(_value(SCENARIO_WIN_RATE, self.peru, dimension), 0.5)
+
+        minigame = Minigame.objects.create(name='m', type='swipe')
+        session = MinigameSession.objects.create(user=self.b, minigame=minigame, correct_answers=3, incorrect_answers=1)
+        enqueue('onboarding.rollup_minigame_session', {'minigame_session_id': session.minigame_session_id})
+        self.assertEqual(_value(MINIGAME_ACCURACY, self.chile), 0.75)
+
+        incremental = {
+            (s.metric, s.dimension, s.country_id): round(s.value, 6) for s in GlobalStatistic.objects.all()
+        }
+        call_command('rebuild_statistics', stdout=StringIO())
+        rebuilt = {
+            (s.metric, s.dimension, s.country_id): round(s.value, 6)
+            for s in GlobalStatistic.objects.exclude(metric='active_users_30d')
+        }
+        self.assertEqual(rebuilt, incremental)
+        self.assertEqual(UserStatistic.objects.count(), 3)
+
+    def test_rollup_after_rebuild_is_not_counted_twice(self):
+        session = GameSession.objects.create(user=self.a, scenario=self.scenario, outcome='won', is_game_over=False)
+        minigame = Minigame.objects.create(name='m', type='swipe')
+        round_ = MinigameSession.objects.create(user=self.a, minigame=minigame, correct_answers=1, incorrect_answers=1)
+        call_command('rebuild_statistics', stdout=StringIO())
+
+        # Las tareas llegan tarde (o se reintentan): la sesión ya estaba contada
+        for _ in range(2):
+            enqueue('onboarding.rollup_game_session', {'session_id': session.session_id})
+            enqueue('onboarding.rollup_minigame_session', {'minigame_session_id': round_.minigame_session_id})
+        dimension = str(self.scenario.scenario_id)
+        row = GlobalStatistic.objects.get(metric=SCENARIO_WIN_RATE, country=None, dimension=dimension)
+        self.assertEqual((row.total, row.sample_count), (1, 1))
+        row = GlobalStatistic.objects.get(metric=MINIGAME_ACCURACY, country=None)
+        self.assertEqual((row.total, row.sample_count), (1, 2))
+
+        # Y un rebuild posterior cuenta lo mismo
+        call_command('rebuild_statistics', stdout=StringIO())
+        self.assertEqual(GlobalStatistic.objects.get(metric=MINIGAME_ACCURACY, country=None).sample_count, 2)
+
+    def test_endpoint_filters_precomputed_rows(self):
+        save_scores([RiskScore(self.a.user_id, 0, 1, 80.0, 'High', 1)])
+        data = APIClient().get('/api/onboarding/global-stats/', {'metric': AVG_RISK_SCORE, 'scope': 'global'}).json()
+        rows = data['results'] if isinstance(data, dict) else data
+        self.assertEqual([(row['country'], row['value']) for row in rows], [(None, 80.0)])
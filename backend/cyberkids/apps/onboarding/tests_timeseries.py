@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.cyberUser.models import CyberUser
+from apps.onboarding.models import UserStatistic
+from apps.onboarding.timeseries import downsample, latest_values, record, trend
+
+METRIC = 'onboarding_risk_score'
+
+
+def _at(day, hour=12):
+    return datetime(2026, 1, day, hour, tzinfo=dt_timezone.utc)
+
+
+class UserStatisticSeriesTests(TestCase):
+    def setUp(self):
+        self.user = CyberUser.objects.create(username='serie', email='s@example.com', password='x', avatar='s.jpg')
+        self.other = CyberUser.objects.create(username='otra', email='o@example.com', password='x', avatar='o.jpg')
+
+    def test_record_appends_only_changes(self):
+        written = record(METRIC, {self.user.user_id: 50.0, self.other.user_id: 10.0}, at=_at(1))
+        self.assertEqual(written, {self.user.user_id: None, self.other.user_id: None})
+
+        written = record(METRIC, {self.user.user_id: 40.0, self.other.user_id: 10.0}, at=_at(2))
+        self.assertEqual(written, {self.user.user_id: 50.0})
+        self.assertEqual(UserStatistic.objects.count(), 3)
+        self.assertEqual(
+            latest_values([self.user.user_id, self.other.user_id], METRIC),
+            {self.user.user_id: 40.0, self.other.user_id: 10.0},
+        )
+
+    def test_trend_by_bucket(self):
+        for day, hour, value in ((1, 8, 10.0), (1, 20, 30.0), (2, 12, 50.0)):
+            record(METRIC, {self.user.user_id: value}, at=_at(day, hour))
+
+        raw = trend(self.user.user_id, METRIC)
+        self.assertEqual([point['value'] for point in raw], [10.0, 30.0, 50.0])
+        daily = trend(self.user.user_id, METRIC, since=_at(1, 0), bucket='day')
+        self.assertEqual([(point['value'], point['samples']) for point in daily], [(20.0, 2), (50.0, 1)])
+        with self.assertRaises(ValueError):
+            trend(self.user.user_id, METRIC, bucket='hour')
+
+    def test_downsample_keeps_latest_point(self):
+        for hour, value in ((1, 10.0), (2, 20.0), (3, 60.0)):
+            record(METRIC, {self.user.user_id: value}, at=_at(1, hour))
+
+        removed = downsample(_at(5))
+        # 10 y 20 se resumen en un punto; 60 es el valor actual y no se toca
+        self.assertEqual(removed, 1)
+        self.assertEqual(
+            list(UserStatistic.objects.order_by('calculated_at').values_list('value', 'sample_count')),
+            [(15.0, 2), (60.0, 1)],
+        )
+        self.assertEqual(latest_values([self.user.user_id], METRIC), {self.user.user_id: 60.0})
+
+        call_command('downsample_user_statistics', '--older-than-days', '0', stdout=StringIO())
+        self.assertEqual(UserStatistic.objects.count(), 2)
+
+    def test_my_trend_endpoint(self):
+        record(METRIC, {self.user.user_id: 25.0})
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        data = client.get('/api/onboarding/user-stats/my-trend/', {'metric': METRIC, 'bucket': 'week'}).json()
+        self.assertEqual(data['metric'], METRIC)
+        self.assertEqual([point['value'] for point in data['points']], [25.0])
+        self.assertEqual(client.get('/api/onboarding/user-stats/my-trend/').status_code, 400)
+        self.assertEqual(client.get('/api/onboarding/user-stats/my-trend/', {'metric': METRIC, 'bucket': 'x'}).status_code, 400)
+        for days in ('0', '-5', '3651', '99999999999', 'x'):
+            response = client.get('/api/onboarding/user-stats/my-trend/', {'metric': METRIC, 'days': days})
+            self.assertEqual(response.status_code, 400, days)
+        self.assertEqual(client.get('/api/onboarding/user-stats/my-trend/', {'metric': METRIC, 'days': '3650'}).status_code, 200)
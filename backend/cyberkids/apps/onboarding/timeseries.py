@@ -0,0 +1,117 @@
+"""
+Series temporales por usuario sobre ``user_statistic``.
+
+Cada cálculo de una métrica añade un punto ``(user, metric, value, calculated_at)``
+en vez de sobrescribir el anterior, así se conserva la historia para las
+gráficas de progreso. El índice ``(user, metric, calculated_at)`` sirve tanto
+el valor actual (último punto) como los rangos de tendencia.
+
+- ``record``: escritura en lote; omite los puntos que no cambian el valor actual.
+- ``latest_values``: valor actual de una métrica para un lote de usuarios.
+- ``trend``: puntos de un rango, opcionalmente agrupados por día/semana/mes.
+- ``downsample``: resume los puntos antiguos en uno por periodo
+  (media ponderada por ``sample_count``), conservando siempre el último.
+"""
+
+from django.db import transaction
+from django.db.models import Count, ExpressionWrapper, F, FloatField, Max, OuterRef, Subquery, Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from .models import UserStatistic
+
+BUCKETS = ('day', 'week', 'month')
+
+# Ventana máxima (días) que se puede pedir a una serie
+MAX_TREND_DAYS = 3650
+
+
+def latest_point(metric=None):
+    """Subconsulta con el statistic_id del último punto de (OuterRef user_id, metric)."""
+    points = UserStatistic.objects.filter(
+        user_id=OuterRef('user_id'), metric=metric if metric is not None else OuterRef('metric'),
+    )
+    return Subquery(points.order_by('-calculated_at', '-statistic_id').values('statistic_id')[:1])
+
+
+def latest_values(user_ids, metric):
+    """``{user_id: valor actual}`` de ``metric`` (solo usuarios con algún punto)."""
+    return dict(
+        UserStatistic.objects.filter(user_id__in=user_ids, metric=metric, statistic_id=latest_point(metric))
+        .values_list('user_id', 'value')
+    )
+
+
+def record(metric, values, at=None):
+    """Añade un punto por usuario a partir de ``{user_id: valor}``.
+
+    Los usuarios cuyo valor actual ya es ese no generan punto. Devuelve
+    ``{user_id: valor anterior o None}`` de los puntos escritos.
+    """
+    previous = latest_values(list(values), metric)
+    at = at or timezone.now()
+    written = {user_id: previous.get(user_id) for user_id, value in values.items() if previous.get(user_id) != value}
+    UserStatistic.objects.bulk_create([
+        UserStatistic(user_id=user_id, metric=metric, value=values[user_id], calculated_at=at)
+        for user_id in written
+    ], batch_size=1000)
+    return written
+
+
+def _weighted_value():
+    return ExpressionWrapper(Sum(F('value') * F('sample_count')) / Sum('sample_count'), output_field=FloatField())
+
+
+def trend(user_id, metric, since=None, bucket=None):
+    """Lista de ``{'at', 'value', 'samples'}`` en orden cronológico."""
+    points = UserStatistic.objects.filter(user_id=user_id, metric=metric)
+    if since is not None:
+        points = points.filter(calculated_at__gte=since)
+    if bucket is None:
+        return [
+            {'at': at, 'value': value, 'samples': samples}
+            for at, value, samples in points.order_by('calculated_at', 'statistic_id')
+            .values_list('calculated_at', 'value', 'sample_count')
+        ]
+    if bucket not in BUCKETS:
+        raise ValueError(f'bucket debe ser uno de {BUCKETS}')
+    rows = (
+        points.annotate(period=Trunc('calculated_at', bucket)).values('period')
+        .annotate(avg=_weighted_value(), samples=Sum('sample_count')).order_by('period')
+    )
+    return [{'at': row['period'], 'value': row['avg'], 'samples': row['samples']} for row in rows]
+
+
+def downsample(older_than, bucket='day', batch_size=500):
+    """Sustituye los puntos anteriores a ``older_than`` por uno por (usuario, métrica, periodo).
+
+    El último punto de cada serie no se toca, para no cambiar el valor actual.
+    Devuelve el número de filas eliminadas.
+    """
+    if bucket not in BUCKETS:
+        raise ValueError(f'bucket debe ser uno de {BUCKETS}')
+    old_points = (
+        UserStatistic.objects.filter(calculated_at__lt=older_than)
+        .exclude(statistic_id=latest_point())
+        .annotate(period=Trunc('calculated_at', bucket))
+    )
+    groups = list(
+        old_points.values('user_id', 'metric', 'period')
+        .annotate(n=Count('statistic_id'), avg=_weighted_value(), samples=Sum('sample_count'), last=Max('calculated_at'))
+        .filter(n__gt=1).order_by()
+    )
+    removed = 0
+    for start in range(0, len(groups), batch_size):
+        with transaction.atomic():
+            merged = []
+            for group in groups[start:start + batch_size]:
+                deleted, _ = old_points.filter(
+                    user_id=group['user_id'], metric=group['metric'], period=group['period'],
+                ).delete()
+                removed += deleted - 1
+                merged.append(UserStatistic(
+                    user_id=group['user_id'], metric=group['metric'], value=group['avg'],
+                    sample_count=group['samples'], calculated_at=group['last'],
+                ))
+            UserStatistic.objects.bulk_create(merged)
+    return removed
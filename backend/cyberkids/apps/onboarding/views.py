@@ -1,8 +1,11 @@
+from datetime import timedelta
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 
 from .models import OnboardingQuestion, AnswerOption, OnboardingResponse, UserStatistic, GlobalStatistic
 from .serializers import (
@@ -12,7 +15,11 @@ from .serializers import (
     UserStatisticSerializer,
     GlobalStatisticSerializer
 )
-from apps.cyberUser.models import CyberUser, RiskLevel
+from apps.cyberUser.models import CyberUser
+from apps.tasks.runner import enqueue
+from cyberkids.catalog_cache import catalog_response
+from .risk import RiskScore, get_question_weights, risk_level_for, score_user
+from . import timeseries
 
 
 class OnboardingQuestionViewSet(viewsets.ModelViewSet):
@@ -23,9 +30,10 @@ class OnboardingQuestionViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def active(self, request):
         """Lista todas las preguntas activas del onboarding."""
-        questions = self.queryset.filter(is_active=True)
-        serializer = self.get_serializer(questions, many=True)
-        return Response(serializer.data)
+        def build():
+            questions = self.queryset.filter(is_active=True)
+            return self.get_serializer(questions, many=True).data
+        return catalog_response(request, 'onboarding', build, variant='active')
 
 
 class AnswerOptionViewSet(viewsets.ModelViewSet):
@@ -79,45 +87,60 @@ class OnboardingResponseViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['post'], url_path='submit-batch', permission_classes=[IsAuthenticated])
     def submit_batch(self, request):
-        """Enviar múltiples respuestas en lote para el usuario autenticado."""
+        """Enviar múltiples respuestas en lote para el usuario autenticado.
+
+        Valida todos los IDs con dos consultas y guarda con un solo upsert
+        sobre (user, question). Con ``calculate_risk: true`` devuelve también
+        el resultado de ``calculate-my-risk`` en ``risk``.
+        """
         user = request.user
         responses_data = request.data.get('responses', [])
         
         if not responses_data:
             return Response({'error': 'Se requiere un array de responses'}, status=status.HTTP_400_BAD_REQUEST)
         
-        created_responses = []
-        updated_responses = []
-        
+        # question_id -> option_id; si una pregunta se repite, gana la última
+        answers = {}
         for item in responses_data:
-            question_id = item.get('question_id')
-            option_id = item.get('option_id')
-            
-            if not question_id:
-                continue
-                
             try:
-                question = OnboardingQuestion.objects.get(pk=question_id)
-                option = AnswerOption.objects.get(pk=option_id) if option_id else None
-                
-                response, created = OnboardingResponse.objects.update_or_create(
-                    user=user,
-                    question=question,
-                    defaults={'option': option}
-                )
-                
-                if created:
-                    created_responses.append(response)
-                else:
-                    updated_responses.append(response)
-            except (OnboardingQuestion.DoesNotExist, AnswerOption.DoesNotExist):
+                question_id = int(item.get('question_id') or 0)
+                option_id = int(item['option_id']) if item.get('option_id') else None
+            except (AttributeError, TypeError, ValueError):
                 continue
+            if question_id:
+                answers[question_id] = option_id
         
-        return Response({
-            'created_count': len(created_responses),
-            'updated_count': len(updated_responses),
-            'total_processed': len(created_responses) + len(updated_responses)
-        })
+        questions = OnboardingQuestion.objects.only('question_id').in_bulk(list(answers))
+        options = AnswerOption.objects.only('option_id').in_bulk([o for o in answers.values() if o])
+        # Las respuestas con IDs inexistentes se ignoran, como antes
+        answers = {
+            question_id: option_id for question_id, option_id in answers.items()
+            if question_id in questions and (option_id is None or option_id in options)
+        }
+        
+        existing = set(
+            OnboardingResponse.objects.filter(user=user, question_id__in=list(answers))
+            .values_list('question_id', flat=True)
+        )
+        OnboardingResponse.objects.bulk_create(
+            [
+                OnboardingResponse(user=user, question_id=question_id, option_id=option_id)
+                for question_id, option_id in answers.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['user', 'question'],
+            update_fields=['option'],
+        )
+        
+        data = {
+            'created_count': len(answers) - len(existing),
+            'updated_count': len(existing),
+            'total_processed': len(answers)
+        }
+        if request.data.get('calculate_risk'):
+            score = score_user(user.user_id)
+            data['risk'] = self._record_risk(score) if score else None
+        return Response(data)
 
     @action(detail=False, methods=['get'], url_path='my-responses', permission_classes=[IsAuthenticated])
     def my_responses(self, request):
@@ -146,107 +169,37 @@ class OnboardingResponseViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['post'], url_path='calculate-my-risk', permission_classes=[IsAuthenticated])
     def calculate_my_risk(self, request):
         """Calcular el nivel de riesgo para el usuario autenticado."""
-        user = request.user
-        
-        responses = OnboardingResponse.objects.filter(
-            user=user,
-            option__isnull=False
-        ).select_related('question', 'option')
-        
-        if not responses.exists():
+        score = score_user(request.user.user_id)
+        if score is None:
             return Response({
                 'error': 'No hay respuestas registradas'
             }, status=status.HTTP_400_BAD_REQUEST)
-        
-        total_risk_score = sum(
-            r.option.risk_value * r.question.risk_weight for r in responses
-        )
-        
-        total_questions = OnboardingQuestion.objects.filter(is_active=True).count()
-        questions_answered = responses.count()
-        
-        max_weights = sum(r.question.risk_weight for r in responses)
-        max_possible_score = max_weights * 5 if max_weights > 0 else 1
-        
-        risk_percentage = (total_risk_score / max_possible_score * 100) if max_possible_score > 0 else 0
-        
-        if risk_percentage <= 33:
-            risk_level_name = 'Low'
-        elif risk_percentage <= 66:
-            risk_level_name = 'Medium'
-        else:
-            risk_level_name = 'High'
-        
-        risk_level = RiskLevel.objects.filter(name=risk_level_name).first()
-        if risk_level:
-            user.risk_level = risk_level
-            user.save()
-        
-        UserStatistic.objects.update_or_create(
-            user=user,
-            metric='onboarding_risk_score',
-            defaults={'value': risk_percentage}
-        )
-        
-        return Response({
-            'user_id': user.user_id,
-            'total_risk_score': total_risk_score,
-            'max_possible_score': max_possible_score,
-            'risk_percentage': round(risk_percentage, 2),
-            'risk_level': risk_level_name,
-            'questions_answered': questions_answered,
-            'total_questions': total_questions
-        })
+        return Response(self._record_risk(score))
 
     @action(detail=False, methods=['get'], url_path='calculate_risk/(?P<user_id>[^/.]+)')
     def calculate_risk(self, request, user_id=None):
         """Calcular nivel de riesgo por user_id (legacy endpoint)."""
         user = get_object_or_404(CyberUser, pk=user_id)
-        
-        responses = OnboardingResponse.objects.filter(
-            user_id=user_id,
-            option__isnull=False
-        ).select_related('question', 'option')
-        
-        total_risk_score = sum(
-            r.option.risk_value * r.question.risk_weight for r in responses
-        )
-        
-        total_questions = OnboardingQuestion.objects.filter(is_active=True).count()
-        questions_answered = responses.count()
-        
-        max_weights = sum(r.question.risk_weight for r in responses)
-        max_possible_score = max_weights * 5 if max_weights > 0 else 1
-        
-        risk_percentage = (total_risk_score / max_possible_score * 100) if max_possible_score > 0 else 0
-        
-        if risk_percentage <= 33:
-            risk_level_name = 'Low'
-        elif risk_percentage <= 66:
-            risk_level_name = 'Medium'
-        else:
-            risk_level_name = 'High'
-        
-        risk_level = RiskLevel.objects.filter(name=risk_level_name).first()
-        if risk_level:
-            user.risk_level = risk_level
-            user.save()
-        
-        UserStatistic.objects.update_or_create(
-            user=user,
-            metric='onboarding_risk_score',
-            defaults={'value': risk_percentage}
-        )
-        
-        return Response({
-            'user_id': user.user_id,
-            'total_risk_score': total_risk_score,
-            'max_possible_score': max_possible_score,
-            'risk_percentage': round(risk_percentage, 2),
-            'risk_level': risk_level_name,
-            'questions_answered': questions_answered,
-            'total_questions': total_questions
+        score = score_user(user.user_id) or RiskScore(user.user_id, 0, 1, 0, risk_level_for(0), 0)
+        return Response(self._record_risk(score))
+
+    def _record_risk(self, score):
+        """Encola el guardado de risk_level y la estadística; devuelve la respuesta de la API."""
+        enqueue('onboarding.record_risk', {
+            'user_id': score.user_id,
+            'risk_level_name': score.risk_level,
+            'risk_percentage': score.risk_percentage,
         })
+        _, total_questions = get_question_weights()
+        return {
+            'user_id': score.user_id,
+            'total_risk_score': score.total_risk_score,
+            'max_possible_score': score.max_possible_score,
+            'risk_percentage': round(score.risk_percentage, 2),
+            'risk_level': score.risk_level,
+            'questions_answered': score.questions_answered,
+            'total_questions': total_questions
+        }
 
     @action(detail=False, methods=['get'], url_path='status/(?P<user_id>[^/.]+)')
     def onboarding_status(self, request, user_id=None):
@@ -274,16 +227,53 @@ class UserStatisticViewSet(viewsets.ModelViewSet):
         user_id = self.request.query_params.get('user_id')
         if user_id:
             queryset = queryset.filter(user_id=user_id)
+        metric = self.request.query_params.get('metric')
+        if metric:
+            queryset = queryset.filter(metric=metric)
         return queryset
 
+    @action(detail=False, methods=['get'], url_path='my-trend', permission_classes=[IsAuthenticated])
+    def my_trend(self, request):
+        """Serie de una métrica del usuario autenticado (params: metric, days=90 (1-3650), bucket=day|week|month)."""
+        metric = request.query_params.get('metric')
+        if not metric:
+            return Response({'error': 'metric es requerido'}, status=status.HTTP_400_BAD_REQUEST)
+        bucket = request.query_params.get('bucket') or None
+        if bucket is not None and bucket not in timeseries.BUCKETS:
+            return Response({'error': f'bucket debe ser uno de {timeseries.BUCKETS}'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            days = int(request.query_params.get('days', 90))
+        except ValueError:
+            days = None
+        if days is None or not 1 <= days <= timeseries.MAX_TREND_DAYS:
+            return Response(
+                {'error': f'days debe ser un entero entre 1 y {timeseries.MAX_TREND_DAYS}'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        since = timezone.now() - timedelta(days=days)
+        return Response({
+            'metric': metric,
+            'bucket': bucket,
+            'points': timeseries.trend(request.user.user_id, metric, since=since, bucket=bucket),
+        })
+
 
 class GlobalStatisticViewSet(viewsets.ModelViewSet):
     queryset = GlobalStatistic.objects.all()
     serializer_class = GlobalStatisticSerializer
 
     def get_queryset(self):
-        queryset = GlobalStatistic.objects.all()
-        country_id = self.request.query_params.get('country_id')
+        """Filas precalculadas (rollups.py); filtros: country_id, metric, dimension, scope=global."""
+        queryset = GlobalStatistic.objects.select_related('country').order_by('metric', 'dimension', 'country_id')
+        params = self.request.query_params
+        country_id = params.get('country_id')
         if country_id:
             queryset = queryset.filter(country_id=country_id)
+        if params.get('scope') == 'global':
+            queryset = queryset.filter(country__isnull=True)
+        if params.get('metric'):
+            queryset = queryset.filter(metric=params['metric'])
+        if 'dimension' in params:
+            queryset = queryset.filter(dimension=params['dimension'])
         return queryset
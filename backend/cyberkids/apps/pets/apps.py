@@ -5,3 +5,8 @@ class PetsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.pets'
     verbose_name = 'Emotional Feedback - PETS'
+
+    def ready(self):
+        from cyberkids.catalog_cache import track_catalog
+        from .models import Pet, PetState
+        track_catalog('pets', Pet, PetState)
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 17:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cyberUser", "0008_alter_cyberuser_avatar"),
+        ("pets", "0002_remove_pet_base_sprite_url_remove_petstate_svg_url_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="userpet",
+            index=models.Index(condition=models.Q(("is_equipped", True)), fields=["user"], name="user_pet_equipped_idx"),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 6.0.1 on 2026-10-19 22:15
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def unequip_duplicates(apps, schema_editor):
+    """Deja una mascota equipada por usuario: la de CyberUser.pet_id o, si no, la más reciente."""
+    UserPet = apps.get_model("pets", "UserPet")
+    CyberUser = apps.get_model("cyberUser", "CyberUser")
+
+    duplicated = (
+        UserPet.objects.filter(is_equipped=True).values("user_id")
+        .annotate(n=Count("user_pet_id")).filter(n__gt=1).values_list("user_id", flat=True)
+    )
+    for user_id in list(duplicated):
+        equipped = UserPet.objects.filter(user_id=user_id, is_equipped=True)
+        pet_id = CyberUser.objects.filter(user_id=user_id).values_list("pet_id", flat=True).first()
+        keep = equipped.filter(pet_id=pet_id).first() or equipped.order_by("-user_pet_id").first()
+        equipped.exclude(user_pet_id=keep.user_pet_id).update(is_equipped=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cyberUser", "0009_cyberuser_pending_avatar"),
+        ("pets", "0003_hot_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(unequip_duplicates, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name="userpet",
+            name="user_pet_equipped_idx",
+        ),
+        migrations.AddConstraint(
+            model_name="userpet",
+            constraint=models.UniqueConstraint(condition=models.Q(("is_equipped", True)), fields=("user",), name="user_pet_one_equipped"),
+        ),
+    ]
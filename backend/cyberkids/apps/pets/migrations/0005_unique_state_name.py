@@ -0,0 +1,35 @@
+# Generated by Django 6.0.1 on 2026-10-19 22:40
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def rename_duplicates(apps, schema_editor):
+    """Conserva el nombre en el estado más reciente (el que mostraba el bundle) y numera los demás."""
+    PetState = apps.get_model("pets", "PetState")
+
+    duplicated = (
+        PetState.objects.values("pet_id", "state_name")
+        .annotate(n=Count("state_id")).filter(n__gt=1)
+    )
+    for row in list(duplicated):
+        states = PetState.objects.filter(pet_id=row["pet_id"], state_name=row["state_name"]).order_by("-state_id")
+        for state in states[1:]:
+            suffix = f" ({state.state_id})"
+            state.state_name = state.state_name[:50 - len(suffix)] + suffix
+            state.save(update_fields=["state_name"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pets", "0004_one_equipped_pet"),
+    ]
+
+    operations = [
+        migrations.RunPython(rename_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="petstate",
+            constraint=models.UniqueConstraint(fields=("pet", "state_name"), name="pet_state_unique_name"),
+        ),
+    ]
@@ -27,6 +27,10 @@ class PetState(models.Model):
 
     class Meta:
         db_table = 'pet_state'
+        constraints = [
+            # El bundle indexa los estados por nombre: dos iguales se pisarían
+            models.UniqueConstraint(fields=['pet', 'state_name'], name='pet_state_unique_name'),
+        ]
 
     def __str__(self):
         return f"{self.pet.name} - {self.state_name}"
@@ -42,6 +46,10 @@ class UserPet(models.Model):
     class Meta:
         db_table = 'user_pet'
         unique_together = ['user', 'pet']
+        constraints = [
+            # Una sola mascota equipada por usuario (también sirve de índice para buscarla)
+            models.UniqueConstraint(fields=['user'], condition=models.Q(is_equipped=True), name='user_pet_one_equipped'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.pet.name}"
@@ -1,20 +1,27 @@
 from rest_framework import serializers
+from cyberkids.images import CloudinaryURLMixin
+
 from .models import Pet, PetState, UserPet
 
 
-class PetStateSerializer(serializers.ModelSerializer):
+class PetStateSerializer(CloudinaryURLMixin, serializers.ModelSerializer):
     class Meta:
         model = PetState
         fields = '__all__'
 
 
-class PetSerializer(serializers.ModelSerializer):
+class PetSerializer(CloudinaryURLMixin, serializers.ModelSerializer):
     states = PetStateSerializer(many=True, read_only=True)
 
     class Meta:
         model = Pet
         fields = '__all__'
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Precarga los estados para evitar una consulta por mascota."""
+        return queryset.prefetch_related('states')
+
 
 class UserPetSerializer(serializers.ModelSerializer):
     pet_name = serializers.CharField(source='pet.name', read_only=True)
@@ -22,3 +29,5 @@ class UserPetSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserPet
         fields = '__all__'
+        # Se equipa solo con shop/equip-pet/ (apps/progression/equipment.py)
+        read_only_fields = ['is_equipped']
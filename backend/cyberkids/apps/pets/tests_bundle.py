@@ -0,0 +1,62 @@
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.cyberUser.models import CyberUser
+from apps.pets.models import Pet, PetState, UserPet
+from apps.pets.serializers import PetStateSerializer
+from cyberkids.catalog_cache import clear_catalog_cache
+
+
+class PetBundleTests(TestCase):
+    def setUp(self):
+        clear_catalog_cache()
+        self.pet = Pet.objects.create(name='Gato', base_sprite='image/upload/v1/pets/sprites/gato.png')
+        for name, duration in (('Idle', 500), ('Thinking', 800), ('Success', 600), ('Error', 400)):
+            PetState.objects.create(
+                pet=self.pet, state_name=name, duration_ms=duration,
+                svg=f'image/upload/v1/pets/states/{name.lower()}.svg',
+            )
+        self.user = CyberUser.objects.create(username='dueño', email='d@example.com', password='x', avatar='d.jpg')
+        UserPet.objects.create(user=self.user, pet=self.pet, is_equipped=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_bundle_has_every_state_and_asset(self):
+        response = self.client.get('/api/pets/user-pets/my-bundle/')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['pet']['name'], 'Gato')
+        self.assertEqual(data['states']['Thinking']['duration_ms'], 800)
+        self.assertEqual(set(data['states']), {'Idle', 'Thinking', 'Success', 'Error'})
+        self.assertEqual(len(data['assets']), 5)
+        self.assertEqual(len(data['hash']), 64)
+
+        public = APIClient().get(f'/api/pets/user-pets/equipped/{self.user.user_id}/bundle/')
+        self.assertEqual(public.json(), data)
+
+    def test_cached_until_the_pet_changes(self):
+        first = self.client.get('/api/pets/user-pets/my-bundle/')
+        with self.assertNumQueries(2):
+            # mascota equipada + sellos de versión
+            cached = self.client.get('/api/pets/user-pets/my-bundle/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(cached.status_code, 304)
+
+        PetState.objects.filter(state_name='Error').update(duration_ms=900)
+        self.pet.save()
+        changed = self.client.get('/api/pets/user-pets/my-bundle/').json()
+        self.assertEqual(changed['states']['Error']['duration_ms'], 900)
+        self.assertNotEqual(changed['hash'], first.json()['hash'])
+
+    def test_no_equipped_pet(self):
+        UserPet.objects.update(is_equipped=False)
+        self.assertEqual(self.client.get('/api/pets/user-pets/my-bundle/').status_code, 404)
+
+    def test_state_names_are_unique_per_pet(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            PetState.objects.create(pet=self.pet, state_name='Idle', duration_ms=100)
+        serializer = PetStateSerializer(data={'pet': self.pet.pet_id, 'state_name': 'Idle', 'duration_ms': 100})
+        self.assertFalse(serializer.is_valid())
+        # Otra mascota sí puede tener su propio Idle
+        other = Pet.objects.create(name='Perro')
+        PetState.objects.create(pet=other, state_name='Idle')
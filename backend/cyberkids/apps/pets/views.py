@@ -1,5 +1,9 @@
+import hashlib
+import json
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django.shortcuts import get_object_or_404
@@ -7,17 +11,42 @@ from django.shortcuts import get_object_or_404
 from .models import Pet, PetState, UserPet
 from .serializers import PetSerializer, PetStateSerializer, UserPetSerializer
 from apps.cyberUser.models import CyberUser
+from cyberkids.catalog_cache import catalog_response
+
+
+def build_pet_bundle(pet_id):
+    """Mascota con todos sus estados (por nombre), la lista de assets y un hash del contenido.
+
+    Los nombres de estado son únicos por mascota (``pet_state_unique_name``),
+    así que ningún estado pisa a otro en el diccionario.
+
+    El hash cambia solo si cambia algún dato o asset de la mascota, así el
+    frontend puede conservar los assets descargados entre sesiones.
+    """
+    pet = PetSerializer.setup_eager_loading(Pet.objects.all()).get(pet_id=pet_id)
+    data = PetSerializer(pet).data
+    states = {state['state_name']: state for state in data.pop('states')}
+    assets = sorted({
+        item[field]
+        for item in (data, *states.values())
+        for field in ('base_sprite', 'svg', 'animation_url')
+        if item.get(field)
+    })
+    bundle = {'pet': data, 'states': states, 'assets': assets}
+    content = json.dumps(bundle, sort_keys=True, default=str).encode()
+    bundle['hash'] = hashlib.sha256(content).hexdigest()
+    return bundle
 
 
 class PetViewSet(viewsets.ModelViewSet):
-    queryset = Pet.objects.prefetch_related('states').all()
+    queryset = PetSerializer.setup_eager_loading(Pet.objects.all())
     serializer_class = PetSerializer
     parser_classes = [MultiPartParser, FormParser, JSONParser]
 
     @action(detail=False, methods=['get'])
     def default(self, request):
         """Obtiene la mascota por defecto."""
-        pet = Pet.objects.filter(is_default=True).first()
+        pet = PetSerializer.setup_eager_loading(Pet.objects.filter(is_default=True)).first()
         if pet:
             return Response(PetSerializer(pet).data)
         return Response({'error': 'No hay mascota por defecto'}, status=status.HTTP_404_NOT_FOUND)
@@ -27,8 +56,10 @@ class PetViewSet(viewsets.ModelViewSet):
         """Lista mascotas disponibles para comprar.
         NOTA: Para comprar mascotas, usa el endpoint /api/progression/shop/buy-pet/
         """
-        pets = Pet.objects.filter(is_default=False)
-        return Response(PetSerializer(pets, many=True).data)
+        def build():
+            pets = PetSerializer.setup_eager_loading(Pet.objects.filter(is_default=False))
+            return PetSerializer(pets, many=True).data
+        return catalog_response(request, 'pets', build, variant='shop')
 
 
 class PetStateViewSet(viewsets.ModelViewSet):
@@ -62,7 +93,24 @@ class UserPetViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], url_path='equipped/(?P<user_id>[^/.]+)')
     def equipped(self, request, user_id=None):
         """Obtiene la mascota equipada de un usuario."""
-        user_pet = UserPet.objects.filter(user_id=user_id, is_equipped=True).first()
+        user_pet = UserPet.objects.filter(user_id=user_id, is_equipped=True).select_related('pet').first()
         if user_pet:
             return Response(UserPetSerializer(user_pet).data)
         return Response({'error': 'No hay mascota equipada'}, status=status.HTTP_404_NOT_FOUND)
+
+    @action(detail=False, methods=['get'], url_path='equipped/(?P<user_id>[^/.]+)/bundle')
+    def equipped_bundle(self, request, user_id=None):
+        """Mascota equipada con todos sus estados y duraciones en una sola respuesta cacheable."""
+        return self._bundle_response(request, user_id)
+
+    @action(detail=False, methods=['get'], url_path='my-bundle', permission_classes=[IsAuthenticated])
+    def my_bundle(self, request):
+        """``equipped/<user_id>/bundle`` del usuario autenticado."""
+        return self._bundle_response(request, request.user.user_id)
+
+    def _bundle_response(self, request, user_id):
+        pet_id = UserPet.objects.filter(user_id=user_id, is_equipped=True).values_list('pet_id', flat=True).first()
+        if pet_id is None:
+            return Response({'error': 'No hay mascota equipada'}, status=status.HTTP_404_NOT_FOUND)
+        # El cuerpo solo depende de la mascota: se comparte entre usuarios y responde 304 con If-None-Match
+        return catalog_response(request, 'pets', lambda: build_pet_bundle(pet_id), variant=f'bundle:{pet_id}')
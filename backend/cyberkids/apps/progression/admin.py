@@ -1,8 +1,10 @@
 from django.contrib import admin
-from .models import ProgressionLevel, CosmeticItem, UserInventory, CreditTransaction, UserProgress
+from .models import ProgressionLevel, CosmeticItem, UserInventory, CreditTransaction, UserProgress, CreditTransactionArchive, CreditBalanceSnapshot
 
 admin.site.register(ProgressionLevel)
 admin.site.register(CosmeticItem)
 admin.site.register(UserInventory)
 admin.site.register(CreditTransaction)
 admin.site.register(UserProgress)
+admin.site.register(CreditTransactionArchive)
+admin.site.register(CreditBalanceSnapshot)
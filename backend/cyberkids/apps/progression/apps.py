@@ -5,3 +5,20 @@ class ProgressionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.progression'
     verbose_name = 'Progression and Economy'
+
+    def ready(self):
+        from cyberkids.catalog_cache import track_catalog
+        from .models import CosmeticItem
+        track_catalog('cosmetics', CosmeticItem)
+
+        from django.db import transaction
+        from django.db.models.signals import post_save
+        from cyberkids.metrics import record_cybercreds
+        from .models import CreditTransaction
+
+        def _count_cybercreds(sender, instance, created, **kwargs):
+            if created:
+                transaction.on_commit(lambda: record_cybercreds(instance.amount, instance.transaction_type))
+
+        post_save.connect(_count_cybercreds, sender=CreditTransaction, weak=False,
+                          dispatch_uid='metrics:credit_transaction')
@@ -0,0 +1,77 @@
+"""
+Equipar mascotas y cosméticos.
+
+Cada usuario tiene un hueco de mascota y un hueco por tipo de cosmético
+(``UserInventory.slot`` = ``CosmeticItem.type`` de la fila equipada). Los
+índices únicos parciales ``user_pet_one_equipped`` y
+``user_inventory_one_equipped_per_slot`` garantizan en la base de datos que
+nunca hay dos filas equipadas en el mismo hueco.
+
+La mascota se cambia con un único ``UPDATE ... SET is_equipped = (pk = %s)``
+sobre las filas del usuario. PostgreSQL y SQLite comprueban los índices únicos
+fila a fila, así que si la sentencia toca la fila elegida antes que la
+equipada choca con el índice aunque al final solo quede una: en ese caso se
+repite con dos UPDATE (desequipar y luego equipar). Los cosméticos usan
+siempre los dos pasos porque desequipan por ``slot`` y por tipo del item. Si
+dos peticiones del mismo usuario equipan a la vez, la segunda choca con el
+índice también en los dos pasos y recibe ``EquipConflict``.
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import BooleanField, ExpressionWrapper, Q
+
+from apps.cyberUser.models import CyberUser
+from apps.pets.models import UserPet
+
+from .models import UserInventory
+
+
+class EquipConflict(Exception):
+    """Otra petición equipó algo en el mismo hueco a la vez."""
+
+
+def _swap_pet(user_pet, single_update):
+    with transaction.atomic():
+        rows = UserPet.objects.filter(user_id=user_pet.user_id)
+        if single_update:
+            rows.filter(Q(is_equipped=True) | Q(pk=user_pet.pk)).update(
+                is_equipped=ExpressionWrapper(Q(pk=user_pet.pk), output_field=BooleanField()),
+            )
+        else:
+            rows.filter(is_equipped=True).exclude(pk=user_pet.pk).update(is_equipped=False)
+            rows.filter(pk=user_pet.pk).update(is_equipped=True)
+        CyberUser.objects.filter(user_id=user_pet.user_id).update(pet_id=user_pet.pet_id)
+
+
+def equip_pet(user_pet):
+    """Equipa ``user_pet`` y actualiza ``CyberUser.pet_id``."""
+    try:
+        _swap_pet(user_pet, single_update=True)
+    except IntegrityError:
+        # Orden de filas desfavorable (o petición concurrente): en dos pasos
+        try:
+            _swap_pet(user_pet, single_update=False)
+        except IntegrityError as exc:
+            raise EquipConflict() from exc
+    user_pet.is_equipped = True
+    return user_pet
+
+
+def equip_cosmetic(inventory):
+    """Equipa ``inventory`` en el hueco del tipo de su item (``inventory.item`` debe estar cargado).
+
+    Desequipa lo que ocupa el hueco y también lo que hoy es de ese tipo aunque
+    se equipara cuando su item tenía otro (``slot`` guardado desfasado).
+    """
+    slot = inventory.item.type
+    try:
+        with transaction.atomic():
+            UserInventory.objects.filter(
+                Q(slot=slot) | Q(item__type=slot), user_id=inventory.user_id, is_equipped=True,
+            ).exclude(pk=inventory.pk).update(is_equipped=False)
+            UserInventory.objects.filter(pk=inventory.pk).update(is_equipped=True, slot=slot)
+    except IntegrityError as exc:
+        raise EquipConflict() from exc
+    inventory.is_equipped = True
+    inventory.slot = slot
+    return inventory
@@ -0,0 +1,194 @@
+"""
+Resúmenes del ledger de CyberCreds a partir de snapshots periódicos.
+
+``credit_transaction`` crece sin límite; para no recorrerlo entero, el comando
+``snapshot_balances`` guarda cada mes los totales acumulados de cada usuario
+(``CreditBalanceSnapshot``). El resumen de un usuario es entonces su último
+snapshot más el agregado de las transacciones posteriores, y las transacciones
+ya cubiertas por un snapshot se pueden mover a ``credit_transaction_archive``.
+"""
+
+from django.db import transaction
+from django.db.models import Count, Exists, IntegerField, OuterRef, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from apps.cyberUser.models import CyberUser
+from cyberkids.metrics import ADJUSTMENT_TRANSACTION_TYPE
+
+from .models import CreditBalanceSnapshot, CreditTransaction, CreditTransactionArchive
+
+TOTALS = {
+    'balance': Coalesce(Sum('amount'), Value(0), output_field=IntegerField()),
+    'total_earned': Coalesce(Sum('amount', filter=Q(amount__gt=0)), Value(0), output_field=IntegerField()),
+    'total_spent': Coalesce(Sum('amount', filter=Q(amount__lt=0)), Value(0), output_field=IntegerField()),
+    'transaction_count': Count('transaction_id'),
+}
+
+FIELDS = tuple(TOTALS)
+
+
+def _add(snapshot, delta):
+    """Suma un agregado de TOTALS a un snapshot (o a ceros si no hay)."""
+    return {
+        field: (getattr(snapshot, field) if snapshot else 0) + (delta.get(field) or 0)
+        for field in FIELDS
+    }
+
+
+def balance_summary(user_id):
+    """Totales del ledger del usuario: último snapshot + transacciones posteriores.
+
+    ``total_spent`` se devuelve en positivo, como en ``my_balance``.
+    """
+    snapshot = CreditBalanceSnapshot.objects.filter(user_id=user_id).order_by('-period_end').first()
+    transactions = CreditTransaction.objects.filter(user_id=user_id)
+    if snapshot:
+        transactions = transactions.filter(created_at__gte=snapshot.period_end)
+    totals = _add(snapshot, transactions.aggregate(**TOTALS))
+    totals['total_spent'] = abs(totals['total_spent'])
+    return totals
+
+
+def _latest_snapshots(user_ids, until=None):
+    """{user_id: último snapshot} (con ``period_end <= until`` si se indica)."""
+    snapshots = CreditBalanceSnapshot.objects.filter(user_id__in=user_ids)
+    if until is not None:
+        snapshots = snapshots.filter(period_end__lte=until)
+    latest = {}
+    for snapshot in snapshots.order_by('user_id', '-period_end'):
+        latest.setdefault(snapshot.user_id, snapshot)
+    return latest
+
+
+def _cumulative_totals(user_ids, latest, until=None):
+    """{user_id: totales} = snapshot + agregado de las transacciones posteriores.
+
+    Los usuarios se agrupan por el ``period_end`` de su snapshot (normalmente uno
+    o dos valores), así cada grupo es un solo GROUP BY.
+    """
+    groups = {}
+    for user_id in user_ids:
+        snapshot = latest.get(user_id)
+        groups.setdefault(snapshot.period_end if snapshot else None, []).append(user_id)
+
+    totals = {user_id: _add(latest.get(user_id), {}) for user_id in user_ids}
+    for since, group in groups.items():
+        transactions = CreditTransaction.objects.filter(user_id__in=group)
+        if until is not None:
+            transactions = transactions.filter(created_at__lt=until)
+        if since is not None:
+            transactions = transactions.filter(created_at__gte=since)
+        for row in transactions.values('user_id').annotate(**TOTALS).order_by():
+            totals[row['user_id']] = _add(latest.get(row['user_id']), row)
+    return totals
+
+
+def ledger_balances(user_ids):
+    """{user_id: saldo según el ledger} para un lote de usuarios."""
+    totals = _cumulative_totals(user_ids, _latest_snapshots(user_ids))
+    return {user_id: row['balance'] for user_id, row in totals.items()}
+
+
+def take_snapshots(period_end, batch_size=1000):
+    """Crea el snapshot de ``period_end`` de cada usuario con movimientos nuevos.
+
+    Los usuarios sin transacciones desde su último snapshot no necesitan uno
+    nuevo. Es idempotente: repetir el mismo ``period_end`` no crea nada.
+    Devuelve el número de snapshots creados.
+    """
+    created = 0
+    last_id = 0
+    while True:
+        user_ids = list(
+            CyberUser.objects.filter(user_id__gt=last_id).order_by('user_id')
+            .values_list('user_id', flat=True)[:batch_size]
+        )
+        if not user_ids:
+            return created
+        last_id = user_ids[-1]
+
+        latest = _latest_snapshots(user_ids, until=period_end)
+        pending = [
+            user_id for user_id in user_ids
+            if user_id not in latest or latest[user_id].period_end != period_end
+        ]
+        snapshots = []
+        for user_id, totals in _cumulative_totals(pending, latest, until=period_end).items():
+            previous = latest.get(user_id)
+            if totals['transaction_count'] > (previous.transaction_count if previous else 0):
+                snapshots.append(CreditBalanceSnapshot(user_id=user_id, period_end=period_end, **totals))
+        CreditBalanceSnapshot.objects.bulk_create(snapshots, ignore_conflicts=True)
+        created += len(snapshots)
+
+
+def find_discrepancies(start_id, end_id, chunk_size=1000):
+    """Usuarios con ``start_id <= user_id < end_id`` cuyo ``cybercreds`` no cuadra con el ledger.
+
+    Devuelve una lista de ``(user_id, cybercreds, saldo_ledger)``. Los usuarios se
+    leen con ``iterator`` (cursor de servidor en PostgreSQL) en lotes de ``chunk_size``.
+    """
+    found = []
+    users = (
+        CyberUser.objects.filter(user_id__gte=start_id, user_id__lt=end_id).order_by('user_id')
+        .values_list('user_id', 'cybercreds').iterator(chunk_size=chunk_size)
+    )
+    batch = []
+    for row in users:
+        batch.append(row)
+        if len(batch) >= chunk_size:
+            found += _compare(batch)
+            batch = []
+    if batch:
+        found += _compare(batch)
+    return found
+
+
+def _compare(batch):
+    balances = ledger_balances([user_id for user_id, _ in batch])
+    return [
+        (user_id, cybercreds, balances[user_id])
+        for user_id, cybercreds in batch if cybercreds != balances[user_id]
+    ]
+
+
+def repair_balance(user_id):
+    """Registra una transacción de ajuste para que el ledger cuadre con ``cybercreds``.
+
+    ``cybercreds`` es lo que el usuario ve y gasta, así que no se toca; la
+    diferencia suele venir de créditos dados sin transacción. Devuelve el
+    importe del ajuste (0 si ya cuadraba).
+    """
+    with transaction.atomic():
+        cybercreds = CyberUser.objects.select_for_update().values_list('cybercreds', flat=True).get(user_id=user_id)
+        difference = cybercreds - balance_summary(user_id)['balance']
+        if difference:
+            CreditTransaction.objects.create(
+                user_id=user_id, amount=difference, transaction_type=ADJUSTMENT_TRANSACTION_TYPE,
+                description='Ajuste de conciliación del ledger', reference_type='reconciliation',
+            )
+    return difference
+
+
+def archive_transactions(before, batch_size=1000):
+    """Mueve a ``credit_transaction_archive`` las transacciones anteriores a ``before``.
+
+    Solo las que ya están cubiertas por un snapshot del usuario, para que
+    ``balance_summary`` no cambie. Devuelve el número de filas movidas.
+    """
+    covered = CreditBalanceSnapshot.objects.filter(user_id=OuterRef('user_id'), period_end__gt=OuterRef('created_at'))
+    candidates = CreditTransaction.objects.filter(Exists(covered), created_at__lt=before).order_by('transaction_id')
+    moved = 0
+    while True:
+        with transaction.atomic():
+            rows = list(candidates[:batch_size])
+            if not rows:
+                return moved
+            CreditTransactionArchive.objects.bulk_create([
+                CreditTransactionArchive(
+                    transaction_id=row.transaction_id, user_id=row.user_id, amount=row.amount,
+                    transaction_type=row.transaction_type, description=row.description,
+                    reference_id=row.reference_id, reference_type=row.reference_type, created_at=row.created_at,
+                ) for row in rows
+            ], ignore_conflicts=True)
+            CreditTransaction.objects.filter(transaction_id__in=[row.transaction_id for row in rows]).delete()
+            moved += len(rows)
@@ -0,0 +1,59 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Max, Min
+
+from apps.cyberUser.models import CyberUser
+from apps.progression.ledger import find_discrepancies, repair_balance
+
+
+def _check_range(start_id, end_id, chunk_size):
+    # Cada hilo usa su propia conexión; se cierra al terminar el rango
+    try:
+        return find_discrepancies(start_id, end_id, chunk_size)
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Comprueba que CyberUser.cybercreds coincide con el ledger (último snapshot + "
+        "CreditTransaction posteriores) para todos los usuarios. Con --workers reparte "
+        "rangos de user_id entre hilos; con --repair registra transacciones de ajuste."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Usuarios por consulta")
+        parser.add_argument("--range-size", type=int, default=50000, help="user_id por rango de trabajo")
+        parser.add_argument("--workers", type=int, default=1, help="Hilos en paralelo (uno por rango)")
+        parser.add_argument("--repair", action="store_true", help="Registrar ajustes para las diferencias")
+        parser.add_argument("--max-report", type=int, default=100, help="Diferencias a listar")
+
+    def handle(self, *args, **options):
+        bounds = CyberUser.objects.aggregate(low=Min("user_id"), high=Max("user_id"))
+        if bounds["low"] is None:
+            self.stdout.write("No hay usuarios")
+            return
+
+        step = max(1, options["range_size"])
+        ranges = [(start, start + step) for start in range(bounds["low"], bounds["high"] + 1, step)]
+        if options["workers"] > 1:
+            with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+                results = pool.map(lambda r: _check_range(r[0], r[1], options["chunk_size"]), ranges)
+                discrepancies = [row for rows in results for row in rows]
+        else:
+            discrepancies = [row for start, end in ranges for row in find_discrepancies(start, end, options["chunk_size"])]
+
+        for user_id, cybercreds, ledger in discrepancies[:options["max_report"]]:
+            self.stdout.write(f"user_id={user_id} cybercreds={cybercreds} ledger={ledger} diferencia={cybercreds - ledger}")
+        if len(discrepancies) > options["max_report"]:
+            self.stdout.write(f"... y {len(discrepancies) - options['max_report']} más")
+
+        if options["repair"]:
+            repaired = sum(1 for user_id, _, _ in discrepancies if repair_balance(user_id))
+            self.stdout.write(self.style.SUCCESS(f"{repaired} usuarios ajustados"))
+        elif discrepancies:
+            self.stdout.write(self.style.WARNING(f"{len(discrepancies)} usuarios con diferencias"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Ledger conciliado: sin diferencias"))
@@ -0,0 +1,50 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.progression.ledger import archive_transactions, take_snapshots
+
+
+def _month_start(value, months_back=0):
+    year, month = value.year, value.month - months_back
+    while month < 1:
+        month += 12
+        year -= 1
+    return datetime(year, month, 1, tzinfo=dt_timezone.utc)
+
+
+class Command(BaseCommand):
+    help = (
+        "Guarda el snapshot mensual de saldo/ganado/gastado de cada usuario con movimientos "
+        "nuevos y, con --archive-months, mueve las transacciones antiguas ya cubiertas a "
+        "credit_transaction_archive. Programar a principio de mes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--period-end", help="Fecha de corte YYYY-MM-DD (por defecto, el día 1 del mes actual)")
+        parser.add_argument("--archive-months", type=int, default=None,
+                            help="Archivar transacciones de hace más de N meses")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        if options["period_end"]:
+            try:
+                period_end = datetime.strptime(options["period_end"], "%Y-%m-%d").replace(tzinfo=dt_timezone.utc)
+            except ValueError:
+                raise CommandError("--period-end debe tener el formato YYYY-MM-DD")
+        else:
+            period_end = _month_start(now)
+        # Un corte en el futuro dejaría fuera transacciones que aún no existen
+        if period_end > now:
+            raise CommandError("--period-end no puede ser una fecha futura")
+
+        created = take_snapshots(period_end, options["batch_size"])
+        self.stdout.write(f"{created} snapshots creados a {period_end:%Y-%m-%d}")
+
+        if options["archive_months"] is not None:
+            before = min(_month_start(now, options["archive_months"]), period_end)
+            moved = archive_transactions(before, options["batch_size"])
+            self.stdout.write(f"{moved} transacciones anteriores a {before:%Y-%m-%d} archivadas")
+        self.stdout.write(self.style.SUCCESS("Ledger actualizado"))
@@ -0,0 +1,22 @@
+# Generated by Django 6.0.1 on 2026-10-19 17:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cyberUser", "0008_alter_cyberuser_avatar"),
+        ("progression", "0002_remove_cosmeticitem_preview_url_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="credittransaction",
+            index=models.Index(fields=["user", "-created_at"], name="credit_tx_user_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="userinventory",
+            index=models.Index(condition=models.Q(("is_equipped", True)), fields=["user"], name="user_inventory_equipped_idx"),
+        ),
+    ]
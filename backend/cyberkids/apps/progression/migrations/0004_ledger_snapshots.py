@@ -0,0 +1,50 @@
+# Generated by Django 6.0.1 on 2026-10-19 20:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cyberUser", "0008_alter_cyberuser_avatar"),
+        ("progression", "0003_hot_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CreditBalanceSnapshot",
+            fields=[
+                ("snapshot_id", models.AutoField(primary_key=True, serialize=False)),
+                ("period_end", models.DateTimeField()),
+                ("balance", models.IntegerField(default=0)),
+                ("total_earned", models.IntegerField(default=0)),
+                ("total_spent", models.IntegerField(default=0)),
+                ("transaction_count", models.IntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("user", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="balance_snapshots", to="cyberUser.cyberuser")),
+            ],
+            options={
+                "db_table": "credit_balance_snapshot",
+                "constraints": [models.UniqueConstraint(fields=("user", "period_end"), name="credit_snapshot_user_period_uniq")],
+            },
+        ),
+        migrations.CreateModel(
+            name="CreditTransactionArchive",
+            fields=[
+                ("transaction_id", models.IntegerField(primary_key=True, serialize=False)),
+                ("amount", models.IntegerField()),
+                ("transaction_type", models.CharField(max_length=50)),
+                ("description", models.CharField(blank=True, max_length=255, null=True)),
+                ("reference_id", models.IntegerField(blank=True, null=True)),
+                ("reference_type", models.CharField(blank=True, max_length=50, null=True)),
+                ("created_at", models.DateTimeField()),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                ("user", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="archived_transactions", to="cyberUser.cyberuser")),
+            ],
+            options={
+                "db_table": "credit_transaction_archive",
+                "indexes": [models.Index(fields=["user", "-created_at"], name="credit_tx_archive_user_idx")],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 6.0.1 on 2026-10-19 22:15
+
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+
+
+def fill_slots(apps, schema_editor):
+    """slot = tipo del item en las filas equipadas; una sola equipada (la más reciente) por usuario y tipo."""
+    UserInventory = apps.get_model("progression", "UserInventory")
+    CosmeticItem = apps.get_model("progression", "CosmeticItem")
+
+    equipped = UserInventory.objects.filter(is_equipped=True)
+    equipped.update(slot=Subquery(CosmeticItem.objects.filter(item_id=OuterRef("item_id")).values("type")[:1]))
+    newest = equipped.values("user_id", "slot").annotate(keep=Max("inventory_id"))
+    for row in list(newest):
+        equipped.filter(user_id=row["user_id"], slot=row["slot"]).exclude(inventory_id=row["keep"]).update(is_equipped=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cyberUser", "0009_cyberuser_pending_avatar"),
+        ("progression", "0004_ledger_snapshots"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userinventory",
+            name="slot",
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+        migrations.RunPython(fill_slots, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="userinventory",
+            constraint=models.UniqueConstraint(condition=models.Q(("is_equipped", True)), fields=("user", "slot"), name="user_inventory_one_equipped_per_slot"),
+        ),
+    ]
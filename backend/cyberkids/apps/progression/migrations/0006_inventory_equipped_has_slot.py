@@ -0,0 +1,25 @@
+# Generated by Django 6.0.1 on 2026-10-19 22:25
+
+from django.db import migrations, models
+
+
+def unequip_without_slot(apps, schema_editor):
+    """Filas equipadas por el serializer sin pasar por equipment.py: se desequipan."""
+    UserInventory = apps.get_model("progression", "UserInventory")
+    UserInventory.objects.filter(is_equipped=True, slot__isnull=True).update(is_equipped=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cyberUser", "0010_staged_avatar"),
+        ("progression", "0005_inventory_equip_slot"),
+    ]
+
+    operations = [
+        migrations.RunPython(unequip_without_slot, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="userinventory",
+            constraint=models.CheckConstraint(condition=models.Q(("is_equipped", False), ("slot__isnull", False), _connector="OR"), name="user_inventory_equipped_has_slot"),
+        ),
+    ]
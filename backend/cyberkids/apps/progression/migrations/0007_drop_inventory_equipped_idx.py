@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-19 22:35
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("progression", "0006_inventory_equipped_has_slot"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="userinventory",
+            name="user_inventory_equipped_idx",
+        ),
+    ]
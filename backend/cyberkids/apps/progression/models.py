@@ -41,10 +41,30 @@ class UserInventory(models.Model):
     item = models.ForeignKey(CosmeticItem, on_delete=models.CASCADE, related_name='owners')
     acquired_at = models.DateTimeField(auto_now_add=True)
     is_equipped = models.BooleanField(default=False)
+    # Hueco que ocupa al equiparse (= item.type); ver equipment.py
+    slot = models.CharField(max_length=50, null=True, blank=True)
 
     class Meta:
         db_table = 'user_inventory'
         unique_together = ['user', 'item']
+        constraints = [
+            # Un solo cosmético equipado por usuario y hueco (también sirve de índice para buscarlos)
+            models.UniqueConstraint(
+                fields=['user', 'slot'], condition=models.Q(is_equipped=True),
+                name='user_inventory_one_equipped_per_slot',
+            ),
+            # Una fila equipada siempre ocupa un hueco (si no, el índice único no la vería)
+            models.CheckConstraint(
+                condition=models.Q(is_equipped=False) | models.Q(slot__isnull=False),
+                name='user_inventory_equipped_has_slot',
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        # El hueco sale siempre del tipo del item; equipment.py lo fija igual en sus UPDATE
+        if self.is_equipped:
+            self.slot = self.item.type
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.user.username} - {self.item.name}"
@@ -62,11 +82,64 @@ class CreditTransaction(models.Model):
 
     class Meta:
         db_table = 'credit_transaction'
+        indexes = [
+            # my_transactions / my_balance: movimientos del usuario, recientes primero
+            models.Index(fields=['user', '-created_at'], name='credit_tx_user_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username}: {self.amount} ({self.transaction_type})"
 
 
+class CreditTransactionArchive(models.Model):
+    """Transacciones antiguas ya cubiertas por un ``CreditBalanceSnapshot``.
+
+    Mismas columnas que ``credit_transaction``; las mueve ``snapshot_balances --archive-months``
+    para que la tabla caliente solo guarde los movimientos recientes.
+    """
+    transaction_id = models.IntegerField(primary_key=True)
+    user = models.ForeignKey(CyberUser, on_delete=models.CASCADE, related_name='archived_transactions')
+    amount = models.IntegerField()
+    transaction_type = models.CharField(max_length=50)
+    description = models.CharField(max_length=255, null=True, blank=True)
+    reference_id = models.IntegerField(null=True, blank=True)
+    reference_type = models.CharField(max_length=50, null=True, blank=True)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'credit_transaction_archive'
+        indexes = [models.Index(fields=['user', '-created_at'], name='credit_tx_archive_user_idx')]
+
+    def __str__(self):
+        return f"{self.user.username}: {self.amount} ({self.transaction_type}, archived)"
+
+
+class CreditBalanceSnapshot(models.Model):
+    """Totales acumulados del ledger de un usuario hasta ``period_end`` (excluido).
+
+    El resumen de saldo es el último snapshot más las transacciones posteriores
+    a su ``period_end`` (ver ``apps/progression/ledger.py``).
+    """
+    snapshot_id = models.AutoField(primary_key=True)
+    user = models.ForeignKey(CyberUser, on_delete=models.CASCADE, related_name='balance_snapshots')
+    period_end = models.DateTimeField()
+    balance = models.IntegerField(default=0)
+    total_earned = models.IntegerField(default=0)
+    total_spent = models.IntegerField(default=0)
+    transaction_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'credit_balance_snapshot'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'period_end'], name='credit_snapshot_user_period_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} @ {self.period_end:%Y-%m}: {self.balance}"
+
+
 class UserProgress(models.Model):
     progress_id = models.AutoField(primary_key=True)
     user = models.OneToOneField(CyberUser, on_delete=models.CASCADE, related_name='progress')
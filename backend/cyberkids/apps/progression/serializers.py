@@ -1,14 +1,17 @@
 from rest_framework import serializers
+from rest_framework.validators import UniqueTogetherValidator
+from cyberkids.images import CloudinaryURLMixin
+
 from .models import ProgressionLevel, CosmeticItem, UserInventory, CreditTransaction, UserProgress
 
 
-class ProgressionLevelSerializer(serializers.ModelSerializer):
+class ProgressionLevelSerializer(CloudinaryURLMixin, serializers.ModelSerializer):
     class Meta:
         model = ProgressionLevel
         fields = '__all__'
 
 
-class CosmeticItemSerializer(serializers.ModelSerializer):
+class CosmeticItemSerializer(CloudinaryURLMixin, serializers.ModelSerializer):
     class Meta:
         model = CosmeticItem
         fields = '__all__'
@@ -21,6 +24,10 @@ class UserInventorySerializer(serializers.ModelSerializer):
     class Meta:
         model = UserInventory
         fields = '__all__'
+        # Se equipa solo con shop/equip-cosmetic/ (equipment.py)
+        read_only_fields = ['is_equipped', 'slot']
+        # Sin el validador del índice parcial por hueco: depende de campos de solo lectura
+        validators = [UniqueTogetherValidator(queryset=UserInventory.objects.all(), fields=['user', 'item'])]
 
 
 class CreditTransactionSerializer(serializers.ModelSerializer):
@@ -0,0 +1,99 @@
+from unittest import mock
+
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.cyberUser.models import CyberUser
+from apps.pets.models import Pet, UserPet
+from apps.progression.models import CosmeticItem, UserInventory
+
+
+class EquipTests(TestCase):
+    def setUp(self):
+        self.user = CyberUser.objects.create(username='equipo', email='e@example.com', password='x', avatar='e.jpg')
+        self.cat = Pet.objects.create(name='Gato')
+        self.dog = Pet.objects.create(name='Perro')
+        UserPet.objects.create(user=self.user, pet=self.cat, is_equipped=True)
+        UserPet.objects.create(user=self.user, pet=self.dog)
+        self.frames = [CosmeticItem.objects.create(name=f'marco{i}', type='frame', cybercreds_cost=10) for i in range(2)]
+        self.background = CosmeticItem.objects.create(name='fondo', type='background', cybercreds_cost=10)
+        for item in (*self.frames, self.background):
+            UserInventory.objects.create(user=self.user, item=item)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_equip_pet_swaps_and_updates_user(self):
+        with self.assertNumQueries(5):
+            # select de la mascota + savepoint + UPDATE de las mascotas + UPDATE del usuario + release
+            response = self.client.post('/api/progression/shop/equip-pet/', {'pet_id': self.dog.pet_id}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(UserPet.objects.filter(is_equipped=True).values_list('pet_id', flat=True)), [self.dog.pet_id])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.pet_id, self.dog.pet_id)
+
+        # De vuelta al gato: el UPDATE único llega antes a su fila y choca; se repite en dos pasos
+        response = self.client.post('/api/progression/shop/equip-pet/', {'pet_id': self.cat.pet_id}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(UserPet.objects.filter(is_equipped=True).values_list('pet_id', flat=True)), [self.cat.pet_id])
+
+        missing = self.client.post('/api/progression/shop/equip-pet/', {'pet_id': 999}, format='json')
+        self.assertEqual(missing.status_code, 404)
+
+    def test_equip_cosmetic_only_touches_its_slot(self):
+        for item in (self.frames[0], self.background, self.frames[1]):
+            response = self.client.post('/api/progression/shop/equip-cosmetic/', {'item_id': item.item_id}, format='json')
+            self.assertEqual(response.status_code, 200)
+        equipped = dict(UserInventory.objects.filter(is_equipped=True).values_list('slot', 'item_id'))
+        self.assertEqual(equipped, {'frame': self.frames[1].item_id, 'background': self.background.item_id})
+
+    def test_item_type_change_does_not_leave_two_equipped(self):
+        self.client.post('/api/progression/shop/equip-cosmetic/', {'item_id': self.frames[0].item_id}, format='json')
+        # El marco pasa a ser fondo: su fila equipada conserva slot='frame'
+        self.frames[0].type = 'background'
+        self.frames[0].save()
+
+        response = self.client.post('/api/progression/shop/equip-cosmetic/', {'item_id': self.background.item_id}, format='json')
+        self.assertEqual(response.status_code, 200)
+        equipped = UserInventory.objects.filter(is_equipped=True)
+        self.assertEqual(list(equipped.values_list('item_id', flat=True)), [self.background.item_id])
+
+    def test_database_rejects_two_equipped_in_a_slot(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            UserPet.objects.filter(user=self.user).update(is_equipped=True)
+        UserInventory.objects.filter(item=self.frames[0]).update(is_equipped=True, slot='frame')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            UserInventory.objects.filter(item=self.frames[1]).update(is_equipped=True, slot='frame')
+
+    def test_equip_fields_are_read_only_in_crud(self):
+        dog = UserPet.objects.get(pet=self.dog)
+        response = self.client.patch(f'/api/pets/user-pets/{dog.pk}/', {'is_equipped': True}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.json()['is_equipped'])
+
+        inventory = UserInventory.objects.get(item=self.frames[0])
+        response = self.client.patch(
+            f'/api/progression/inventory/{inventory.pk}/', {'is_equipped': True, 'slot': None}, format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        inventory.refresh_from_db()
+        self.assertEqual((inventory.is_equipped, inventory.slot), (False, None))
+
+    def test_equipped_row_always_has_a_slot(self):
+        inventory = UserInventory.objects.get(item=self.background)
+        inventory.is_equipped = True
+        inventory.slot = None
+        inventory.save()
+        inventory.refresh_from_db()
+        self.assertEqual(inventory.slot, 'background')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            UserInventory.objects.filter(item=self.frames[0]).update(is_equipped=True, slot=None)
+
+    def test_concurrent_equip_returns_conflict(self):
+        # Simula el choque con el índice único cuando otra petición equipa a la vez
+        with mock.patch('apps.progression.equipment.CyberUser') as user_model:
+            user_model.objects.filter.side_effect = IntegrityError
+            response = self.client.post('/api/progression/shop/equip-pet/', {'pet_id': self.dog.pet_id}, format='json')
+        self.assertEqual(response.status_code, 409)
+        # La transacción se deshace entera: sigue equipado el gato
+        self.assertEqual(list(UserPet.objects.filter(is_equipped=True).values_list('pet_id', flat=True)), [self.cat.pet_id])
@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.cyberUser.models import CyberUser
+from apps.progression.ledger import archive_transactions, balance_summary
+from apps.progression.models import CreditBalanceSnapshot, CreditTransaction, CreditTransactionArchive
+
+
+class LedgerSnapshotTests(TestCase):
+    def setUp(self):
+        self.user = CyberUser.objects.create(username='ahorro', email='a@example.com', password='x', avatar='a.jpg')
+        self.period_end = datetime(2026, 9, 1, tzinfo=dt_timezone.utc)
+        for amount, when in ((100, -60), (-30, -40), (50, -10), (20, 5)):
+            tx = CreditTransaction.objects.create(user=self.user, amount=amount, transaction_type='game')
+            CreditTransaction.objects.filter(pk=tx.pk).update(created_at=self.period_end + timedelta(days=when))
+        self.expected = {'balance': 140, 'total_earned': 170, 'total_spent': 30, 'transaction_count': 4}
+
+    def test_summary_is_snapshot_plus_delta(self):
+        self.assertEqual(balance_summary(self.user.user_id), self.expected)
+
+        call_command('snapshot_balances', '--period-end', '2026-09-01', stdout=StringIO())
+        call_command('snapshot_balances', '--period-end', '2026-09-01', stdout=StringIO())
+        snapshot = CreditBalanceSnapshot.objects.get(user=self.user)
+        self.assertEqual((snapshot.balance, snapshot.transaction_count), (120, 3))
+        self.assertEqual(balance_summary(self.user.user_id), self.expected)
+
+    def test_archive_moves_only_covered_transactions(self):
+        call_command('snapshot_balances', '--period-end', '2026-09-01', stdout=StringIO())
+        moved = archive_transactions(self.period_end - timedelta(days=20))
+
+        self.assertEqual(moved, 2)
+        self.assertEqual(CreditTransactionArchive.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(CreditTransaction.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(balance_summary(self.user.user_id), self.expected)
+
+    def test_my_balance_uses_summary(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        data = client.get('/api/progression/transactions/my_balance/').json()
+        self.assertEqual(data['total_earned'], 170)
+        self.assertEqual(data['total_spent'], 30)
+        self.assertEqual(data['transaction_count'], 4)
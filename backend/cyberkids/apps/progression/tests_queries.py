@@ -0,0 +1,66 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.cyberUser.models import CyberUser
+from apps.minigames.models import Minigame, SwipeQuestion
+from apps.pets.models import Pet, PetState
+from apps.progression.models import CosmeticItem
+from apps.simulation.models import Scenario
+from cyberkids.catalog_cache import clear_catalog_cache
+
+
+class ListingQueryCountTests(TestCase):
+    """Fija el número de consultas de los listados con relaciones anidadas.
+
+    La caché de catálogos se vacía antes de cada petición para medir la
+    construcción en frío; el número no debe crecer con el tamaño del catálogo.
+    Incluye la lectura de los sellos de versión del catálogo.
+    """
+
+    def setUp(self):
+        self.user = CyberUser.objects.create(username='shopper', email='shopper@example.com', avatar='a.jpg')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        for i in range(5):
+            pet = Pet.objects.create(name=f'pet{i}', cybercreds_cost=100 * i, is_default=(i == 0))
+            for state in ('Idle', 'Thinking', 'Success', 'Error'):
+                PetState.objects.create(pet=pet, state_name=state)
+            CosmeticItem.objects.create(name=f'item{i}', type='frame', cybercreds_cost=50)
+            Scenario.objects.create(name=f's{i}', antagonist_goal='goal', difficulty_level=i % 3 + 1)
+            minigame = Minigame.objects.create(name=f'm{i}', type='swipe')
+            for j in range(3):
+                SwipeQuestion.objects.create(minigame=minigame, notification_content='n', correct_answer='Safe')
+
+    def _assert_cold_queries(self, url, expected):
+        clear_catalog_cache()
+        with self.assertNumQueries(expected):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_shop_all(self):
+        data = self._assert_cold_queries('/api/progression/shop/all/', 4).json()
+        self.assertEqual(len(data['pets']), 4)
+        self.assertEqual(len(data['pets'][0]['states']), 4)
+        self.assertEqual(len(data['cosmetics']), 5)
+
+    def test_shop_pets(self):
+        self._assert_cold_queries('/api/progression/shop/pets/', 3)
+
+    def test_shop_cosmetics(self):
+        self._assert_cold_queries('/api/progression/shop/cosmetics/', 2)
+
+    def test_pet_shop(self):
+        self._assert_cold_queries('/api/pets/pets/shop/', 3)
+
+    def test_pet_default(self):
+        self._assert_cold_queries('/api/pets/pets/default/', 2)
+
+    def test_scenarios_by_difficulty(self):
+        data = self._assert_cold_queries('/api/simulation/scenarios/by_difficulty/', 2).json()
+        self.assertEqual(sorted(data), ['level_1', 'level_2', 'level_3'])
+
+    def test_minigames_active(self):
+        data = self._assert_cold_queries('/api/minigames/games/active/', 3).json()
+        self.assertEqual(len(data[0]['questions']), 3)
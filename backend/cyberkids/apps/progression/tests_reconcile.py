@@ -0,0 +1,51 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.cyberUser.models import CyberUser
+from apps.progression.ledger import find_discrepancies
+from apps.progression.models import CreditTransaction
+from cyberkids.metrics import REGISTRY
+
+
+class LedgerReconciliationTests(TestCase):
+    def setUp(self):
+        self.ok = CyberUser.objects.create(username='cuadra', email='c@example.com', password='x', avatar='c.jpg', cybercreds=50)
+        CreditTransaction.objects.create(user=self.ok, amount=50, transaction_type='game')
+        self.off = CyberUser.objects.create(username='descuadre', email='d@example.com', password='x', avatar='d.jpg', cybercreds=80)
+        CreditTransaction.objects.create(user=self.off, amount=30, transaction_type='game')
+
+    def test_reports_and_repairs_discrepancies(self):
+        self.assertEqual(find_discrepancies(0, 10 ** 9, chunk_size=1), [(self.off.user_id, 80, 30)])
+
+        out = StringIO()
+        call_command('reconcile_ledger', '--range-size', '1', stdout=out)
+        self.assertIn(f'user_id={self.off.user_id}', out.getvalue())
+
+        call_command('reconcile_ledger', '--repair', stdout=StringIO())
+        adjustment = CreditTransaction.objects.get(user=self.off, transaction_type='adjustment')
+        self.assertEqual(adjustment.amount, 50)
+        self.assertEqual(find_discrepancies(0, 10 ** 9), [])
+
+    def test_add_cybercreds_writes_transaction(self):
+        response = APIClient().post(f'/api/users/{self.ok.user_id}/add_cybercreds/', {'amount': 25}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['cybercreds'], 75)
+        self.assertEqual(find_discrepancies(0, 10 ** 9), [(self.off.user_id, 80, 30)])
+        self.assertTrue(CreditTransaction.objects.filter(user=self.ok, transaction_type='adjustment', amount=25).exists())
+
+    def test_adjustments_are_labelled_apart_from_minted_credits(self):
+        def series(reason):
+            key = ('cyberkids_cybercreds_total', (('direction', 'minted'), ('transaction_type', 'adjustment'), ('reason', reason)))
+            return REGISTRY.collect().get(key, 0)
+
+        before = series('adjustment')
+        with self.captureOnCommitCallbacks(execute=True):
+            APIClient().post(f'/api/users/{self.ok.user_id}/add_cybercreds/', {'amount': 25}, format='json')
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('reconcile_ledger', '--repair', stdout=StringIO())
+        # 25 del ajuste manual + 50 de la conciliación, ninguno como crédito del juego
+        self.assertEqual(series('adjustment'), before + 75)
+        self.assertEqual(series('economy'), 0)
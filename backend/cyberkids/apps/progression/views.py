@@ -13,6 +13,11 @@ from .serializers import (
 from apps.cyberUser.models import CyberUser
 from apps.pets.models import Pet, UserPet
 from apps.pets.serializers import PetSerializer, UserPetSerializer
+from cyberkids.catalog_cache import catalog_response
+from .equipment import EquipConflict, equip_cosmetic, equip_pet
+from .ledger import balance_summary
+
+EQUIP_CONFLICT = {'error': 'Se está equipando otro elemento a la vez, inténtalo de nuevo'}
 
 
 class ProgressionLevelViewSet(viewsets.ModelViewSet):
@@ -36,8 +41,10 @@ class CosmeticItemViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def shop(self, request):
         """Lista items disponibles en la tienda."""
-        items = CosmeticItem.objects.filter(is_active=True)
-        return Response(CosmeticItemSerializer(items, many=True).data)
+        def build():
+            items = CosmeticItem.objects.filter(is_active=True)
+            return CosmeticItemSerializer(items, many=True).data
+        return catalog_response(request, 'cosmetics', build, variant='shop')
 
 
 class UserInventoryViewSet(viewsets.ModelViewSet):
@@ -97,16 +104,11 @@ class UserInventoryViewSet(viewsets.ModelViewSet):
         user_id = request.data.get('user_id')
         item_id = request.data.get('item_id')
 
-        user = get_object_or_404(CyberUser, pk=user_id)
-        item = get_object_or_404(CosmeticItem, pk=item_id)
-
-        # Desequipar items del mismo tipo
-        UserInventory.objects.filter(user=user, item__type=item.type).update(is_equipped=False)
-
-        # Equipar el seleccionado
-        inventory = get_object_or_404(UserInventory, user=user, item=item)
-        inventory.is_equipped = True
-        inventory.save(update_fields=['is_equipped'])
+        inventory = get_object_or_404(UserInventory.objects.select_related('item'), user_id=user_id, item_id=item_id)
+        try:
+            equip_cosmetic(inventory)
+        except EquipConflict:
+            return Response(EQUIP_CONFLICT, status=status.HTTP_409_CONFLICT)
 
         return Response(UserInventorySerializer(inventory).data)
 
@@ -130,18 +132,19 @@ class CreditTransactionViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def my_balance(self, request):
-        """Muestra el balance y resumen de transacciones del usuario."""
+        """Muestra el balance y resumen de transacciones del usuario.
+
+        Los totales salen del último snapshot mensual más las transacciones
+        posteriores (ver apps/progression/ledger.py).
+        """
         user = request.user
-        transactions = CreditTransaction.objects.filter(user=user)
-        
-        total_earned = sum(t.amount for t in transactions if t.amount > 0)
-        total_spent = abs(sum(t.amount for t in transactions if t.amount < 0))
+        totals = balance_summary(user.user_id)
         
         return Response({
             'current_balance': user.cybercreds,
-            'total_earned': total_earned,
-            'total_spent': total_spent,
-            'transaction_count': transactions.count()
+            'total_earned': totals['total_earned'],
+            'total_spent': totals['total_spent'],
+            'transaction_count': totals['transaction_count']
         })
 
 
@@ -320,25 +323,32 @@ class ShopViewSet(viewsets.ViewSet):
     @action(detail=False, methods=['get'])
     def all(self, request):
         """Lista todos los items disponibles en la tienda (pets y cosméticos)."""
-        pets = Pet.objects.filter(is_default=False)
-        cosmetics = CosmeticItem.objects.filter(is_active=True)
-        
-        return Response({
-            'pets': PetSerializer(pets, many=True).data,
-            'cosmetics': CosmeticItemSerializer(cosmetics, many=True).data
-        })
+        def build():
+            pets = PetSerializer.setup_eager_loading(Pet.objects.filter(is_default=False))
+            cosmetics = CosmeticItem.objects.filter(is_active=True)
+            return {
+                'pets': PetSerializer(pets, many=True).data,
+                'cosmetics': CosmeticItemSerializer(cosmetics, many=True).data
+            }
+        return catalog_response(request, ('pets', 'cosmetics'), build, variant='shop_all')
 
     @action(detail=False, methods=['get'])
     def pets(self, request):
         """Lista mascotas disponibles para comprar."""
-        pets = Pet.objects.filter(is_default=False)
-        return Response(PetSerializer(pets, many=True).data)
+        def build():
+            pets = PetSerializer.setup_eager_loading(Pet.objects.filter(is_default=False))
+            return PetSerializer(pets, many=True).data
+        # Mismo contenido que /api/pets/pets/shop/, comparten la entrada de caché
+        return catalog_response(request, 'pets', build, variant='shop')
 
     @action(detail=False, methods=['get'])
     def cosmetics(self, request):
         """Lista items cosméticos disponibles para comprar."""
-        items = CosmeticItem.objects.filter(is_active=True)
-        return Response(CosmeticItemSerializer(items, many=True).data)
+        def build():
+            items = CosmeticItem.objects.filter(is_active=True)
+            return CosmeticItemSerializer(items, many=True).data
+        # Mismo contenido que /api/progression/cosmetics/shop/
+        return catalog_response(request, 'cosmetics', build, variant='shop')
 
     @action(detail=False, methods=['post'], url_path='buy-pet')
     def buy_pet(self, request):
@@ -456,20 +466,14 @@ class ShopViewSet(viewsets.ViewSet):
             return Response({'error': 'pet_id es requerido'}, status=status.HTTP_400_BAD_REQUEST)
 
         # Verificar que el usuario tiene la mascota
-        user_pet = UserPet.objects.filter(user=user, pet_id=pet_id).first()
+        user_pet = UserPet.objects.filter(user=user, pet_id=pet_id).select_related('pet').first()
         if not user_pet:
             return Response({'error': 'No tienes esta mascota'}, status=status.HTTP_404_NOT_FOUND)
 
-        # Desequipar todas las mascotas del usuario
-        UserPet.objects.filter(user=user).update(is_equipped=False)
-
-        # Equipar la seleccionada
-        user_pet.is_equipped = True
-        user_pet.save(update_fields=['is_equipped'])
-
-        # Actualizar pet_id en usuario
-        user.pet_id = pet_id
-        user.save(update_fields=['pet_id'])
+        try:
+            equip_pet(user_pet)
+        except EquipConflict:
+            return Response(EQUIP_CONFLICT, status=status.HTTP_409_CONFLICT)
 
         return Response({
             'message': f'Has equipado a {user_pet.pet.name}!',
@@ -485,21 +489,18 @@ class ShopViewSet(viewsets.ViewSet):
         if not item_id:
             return Response({'error': 'item_id es requerido'}, status=status.HTTP_400_BAD_REQUEST)
 
-        item = get_object_or_404(CosmeticItem, pk=item_id)
-
         # Verificar que el usuario tiene el item
-        inventory = UserInventory.objects.filter(user=user, item=item).first()
+        inventory = UserInventory.objects.filter(user=user, item_id=item_id).select_related('item').first()
         if not inventory:
+            get_object_or_404(CosmeticItem, pk=item_id)
             return Response({'error': 'No tienes este item'}, status=status.HTTP_404_NOT_FOUND)
 
-        # Desequipar items del mismo tipo
-        UserInventory.objects.filter(user=user, item__type=item.type).update(is_equipped=False)
-
-        # Equipar el seleccionado
-        inventory.is_equipped = True
-        inventory.save(update_fields=['is_equipped'])
+        try:
+            equip_cosmetic(inventory)
+        except EquipConflict:
+            return Response(EQUIP_CONFLICT, status=status.HTTP_409_CONFLICT)
 
         return Response({
-            'message': f'Has equipado {item.name}!',
+            'message': f'Has equipado {inventory.item.name}!',
             'inventory': UserInventorySerializer(inventory).data
         })
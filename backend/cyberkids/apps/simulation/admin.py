@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Scenario, SensitivePattern, GameSession, ChatMessage
+from .models import Scenario, SensitivePattern, GameSession, ChatMessage, ScenarioProgress, ChatTranscriptArchive
 
 
 @admin.register(Scenario)
@@ -33,3 +33,19 @@ class ChatMessageAdmin(admin.ModelAdmin):
 from django.contrib import admin
 
 # Register your models here.
+
+
+@admin.register(ScenarioProgress)
+class ScenarioProgressAdmin(admin.ModelAdmin):
+    list_display = ('progress_id', 'user', 'completed', 'updated_at')
+    search_fields = ('user__username',)
+    raw_id_fields = ('user',)
+
+
+@admin.register(ChatTranscriptArchive)
+class ChatTranscriptArchiveAdmin(admin.ModelAdmin):
+    list_display = ('archive_id', 'session', 'message_count', 'archived_at')
+    search_fields = ('session__session_id',)
+    readonly_fields = ('archived_at',)
+    raw_id_fields = ('session',)
+    exclude = ('data',)
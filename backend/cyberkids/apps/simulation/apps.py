@@ -5,3 +5,9 @@ class SimulationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.simulation'
     verbose_name = 'Social Simulation'
+
+    def ready(self):
+        from cyberkids.catalog_cache import track_catalog
+        from .models import Scenario, SensitivePattern
+        track_catalog('scenarios', Scenario)
+        track_catalog('sensitive_patterns', SensitivePattern)
@@ -0,0 +1,65 @@
+"""
+Elección del siguiente escenario en ``start_with_role`` cuando no se pide uno.
+
+La lista ordenada de escenarios activos se guarda en memoria del proceso
+(``CatalogMemo``) y se renueva cuando cambia la versión compartida del catálogo
+``scenarios`` o pasan ``CATALOG_MEMO_TTL`` segundos. El progreso del
+usuario es una sola fila (``ScenarioProgress``), así que elegir escenario
+cuesta una consulta por clave, sin listas de exclusión.
+
+La regla de elección es configurable con ``SCENARIO_PICKER`` (ruta a una
+función ``picker(scenarios, progress, user) -> scenario_id | None``), por
+ejemplo para progresiones por dificultad distintas.
+"""
+
+from collections import namedtuple
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from cyberkids.catalog_cache import CatalogMemo
+
+from .models import Scenario, ScenarioProgress
+
+ScenarioRef = namedtuple('ScenarioRef', ['scenario_id', 'difficulty_level'])
+
+DEFAULT_PICKER = 'apps.simulation.assignment.first_uncompleted'
+
+
+def _load_active_scenarios():
+    return tuple(
+        ScenarioRef(*row) for row in Scenario.objects.filter(is_active=True)
+        .order_by('difficulty_level', 'scenario_id')
+        .values_list('scenario_id', 'difficulty_level')
+    )
+
+
+_active_scenarios = CatalogMemo('scenarios', _load_active_scenarios)
+
+
+def get_active_scenarios():
+    """Escenarios activos ordenados por (difficulty_level, scenario_id)."""
+    return _active_scenarios.get()
+
+
+def first_uncompleted(scenarios, progress, user):
+    """El primero no superado en orden de dificultad; si ya superó todos, el de menor id."""
+    for ref in scenarios:
+        if not progress.is_completed(ref.scenario_id):
+            return ref.scenario_id
+    if scenarios:
+        return min(ref.scenario_id for ref in scenarios)
+    return None
+
+
+def pick_next_scenario(user):
+    """Devuelve el ``Scenario`` que le toca al usuario, o None si no hay activos."""
+    scenarios = get_active_scenarios()
+    if not scenarios:
+        return None
+    progress = ScenarioProgress.objects.filter(user_id=user.user_id).first() or ScenarioProgress(user_id=user.user_id)
+    picker = import_string(getattr(settings, 'SCENARIO_PICKER', DEFAULT_PICKER))
+    scenario_id = picker(scenarios, progress, user)
+    if scenario_id is None:
+        return None
+    return Scenario.objects.filter(scenario_id=scenario_id, is_active=True).first()
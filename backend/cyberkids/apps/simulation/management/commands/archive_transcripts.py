@@ -0,0 +1,58 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from ...models import ChatMessage, ChatTranscriptArchive, GameSession
+
+
+class Command(BaseCommand):
+    help = (
+        "Archiva los transcripts de las sesiones terminadas hace más de "
+        "SIM_TRANSCRIPT_ARCHIVE_DAYS días: los comprime en chat_transcript_archive "
+        "y borra sus mensajes de chat_message."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None,
+                            help="Antigüedad mínima en días (por defecto SIM_TRANSCRIPT_ARCHIVE_DAYS)")
+        parser.add_argument("--batch-size", type=int, default=200, help="Sesiones por transacción")
+        parser.add_argument("--dry-run", action="store_true", help="Solo contar, sin modificar")
+
+    def handle(self, *args, **options):
+        days = options["days"] if options["days"] is not None else getattr(settings, "SIM_TRANSCRIPT_ARCHIVE_DAYS", 30)
+        cutoff = timezone.now() - timedelta(days=days)
+        pending = (
+            GameSession.objects.filter(is_game_over__isnull=False, ended_at__lt=cutoff, transcript_archive__isnull=True)
+            .order_by("session_id")
+        )
+        if options["dry_run"]:
+            self.stdout.write(f"{pending.count()} sesiones por archivar (dry-run)")
+            return
+
+        sessions = messages = 0
+        last_id = 0
+        while True:
+            batch = list(pending.filter(session_id__gt=last_id).values_list("session_id", flat=True)[:options["batch_size"]])
+            if not batch:
+                break
+            last_id = batch[-1]
+            archived, moved = self._archive_batch(batch)
+            sessions += archived
+            messages += moved
+        self.stdout.write(self.style.SUCCESS(f"{sessions} sesiones archivadas, {messages} mensajes movidos"))
+
+    @transaction.atomic
+    def _archive_batch(self, session_ids):
+        by_session = {session_id: [] for session_id in session_ids}
+        for message in ChatMessage.objects.filter(session_id__in=session_ids).order_by("session_id", "sent_at", "message_id"):
+            by_session[message.session_id].append(message)
+
+        ChatTranscriptArchive.objects.bulk_create([
+            ChatTranscriptArchive(session_id=session_id, message_count=len(rows), data=ChatTranscriptArchive.pack(rows))
+            for session_id, rows in by_session.items()
+        ])
+        moved, _ = ChatMessage.objects.filter(session_id__in=session_ids).delete()
+        return len(by_session), moved
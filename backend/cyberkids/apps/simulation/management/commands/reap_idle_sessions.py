@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from cyberkids.metrics import SIMULATION_SESSIONS
+
+from ...models import GameSession
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Marca como abandonadas las sesiones en curso sin actividad (último mensaje, "
+        "o inicio si no hay mensajes) desde hace más de SIM_SESSION_IDLE_MINUTES."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--minutes", type=int, default=None,
+                            help="Minutos de inactividad (por defecto SIM_SESSION_IDLE_MINUTES)")
+        parser.add_argument("--dry-run", action="store_true", help="Solo contar, sin modificar")
+
+    def handle(self, *args, **options):
+        minutes = options["minutes"] or getattr(settings, "SIM_SESSION_IDLE_MINUTES", 60)
+        now = timezone.now()
+        cutoff = now - timedelta(minutes=minutes)
+
+        idle_ids = list(
+            GameSession.objects.filter(is_game_over__isnull=True, started_at__lt=cutoff)
+            .annotate(last_activity=Coalesce(Max("messages__sent_at"), "started_at"))
+            .filter(last_activity__lt=cutoff)
+            .values_list("session_id", flat=True)
+        )
+        if options["dry_run"]:
+            self.stdout.write(f"{len(idle_ids)} sesiones inactivas desde hace más de {minutes} min (dry-run)")
+            return
+
+        reaped = 0
+        for start in range(0, len(idle_ids), BATCH_SIZE):
+            # is_game_over__isnull otra vez: la sesión pudo terminar mientras tanto
+            reaped += GameSession.objects.filter(
+                session_id__in=idle_ids[start:start + BATCH_SIZE], is_game_over__isnull=True,
+            ).update(is_game_over=True, outcome="abandoned", game_over_reason="idle_timeout", ended_at=now)
+        if reaped:
+            SIMULATION_SESSIONS.inc(reaped, event="abandoned")
+        self.stdout.write(self.style.SUCCESS(f"{reaped} sesiones marcadas como abandonadas"))
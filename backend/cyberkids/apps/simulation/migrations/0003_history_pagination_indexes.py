@@ -0,0 +1,26 @@
+# Generated by Django 6.0.1 on 2026-10-19 17:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cyberUser", "0008_alter_cyberuser_avatar"),
+        ("simulation", "0002_gamesession_antagonist_attempts_gamesession_outcome_and_more"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="chatmessage",
+            name="chat_messag_session_389d44_idx",
+        ),
+        migrations.AddIndex(
+            model_name="chatmessage",
+            index=models.Index(fields=["session", "sent_at", "message_id"], name="chat_message_session_page_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="gamesession",
+            index=models.Index(fields=["user", "-started_at", "-session_id"], name="game_session_user_hist_idx"),
+        ),
+    ]
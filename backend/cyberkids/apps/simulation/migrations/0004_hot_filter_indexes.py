@@ -0,0 +1,26 @@
+# Generated by Django 6.0.1 on 2026-10-19 17:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cyberUser", "0008_alter_cyberuser_avatar"),
+        ("simulation", "0003_history_pagination_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="gamesession",
+            name="game_sessio_user_id_0500e0_idx",
+        ),
+        migrations.AddIndex(
+            model_name="gamesession",
+            index=models.Index(condition=models.Q(("is_game_over__isnull", True)), fields=["user", "-started_at"], name="game_session_active_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="gamesession",
+            index=models.Index(fields=["user", "outcome"], name="game_session_user_outcome_idx"),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 6.0.1 on 2026-10-19 18:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_progress(apps, schema_editor):
+    """Construye el bitset de cada usuario a partir de sus sesiones ganadas."""
+    GameSession = apps.get_model("simulation", "GameSession")
+    ScenarioProgress = apps.get_model("simulation", "ScenarioProgress")
+
+    bits_by_user = {}
+    won = (
+        GameSession.objects.filter(outcome="won", scenario__isnull=False)
+        .values_list("user_id", "scenario_id").distinct().iterator()
+    )
+    for user_id, scenario_id in won:
+        bits_by_user[user_id] = bits_by_user.get(user_id, 0) | (1 << scenario_id)
+
+    ScenarioProgress.objects.bulk_create(
+        [ScenarioProgress(user_id=user_id, completed=format(bits, "x")) for user_id, bits in bits_by_user.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cyberUser", "0008_alter_cyberuser_avatar"),
+        ("simulation", "0004_hot_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ScenarioProgress",
+            fields=[
+                ("progress_id", models.AutoField(primary_key=True, serialize=False)),
+                ("completed", models.TextField(blank=True, default="")),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("user", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name="scenario_progress", to="cyberUser.cyberuser")),
+            ],
+            options={
+                "db_table": "scenario_progress",
+            },
+        ),
+        migrations.RunPython(backfill_progress, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 6.0.1 on 2026-10-19 19:10
+
+from django.db import migrations, models
+from django.db.models import Max
+from django.utils import timezone
+
+
+def abandon_duplicate_sessions(apps, schema_editor):
+    """Deja solo la sesión en curso más reciente por (usuario, escenario); el resto, abandonadas."""
+    GameSession = apps.get_model("simulation", "GameSession")
+
+    newest = (
+        GameSession.objects.filter(is_game_over__isnull=True, scenario__isnull=False)
+        .values("user_id", "scenario_id")
+        .annotate(keep=Max("session_id"))
+    )
+    for row in newest.iterator():
+        GameSession.objects.filter(
+            user_id=row["user_id"], scenario_id=row["scenario_id"], is_game_over__isnull=True,
+        ).exclude(session_id=row["keep"]).update(
+            is_game_over=True, outcome="abandoned", game_over_reason="abandoned", ended_at=timezone.now(),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cyberUser", "0008_alter_cyberuser_avatar"),
+        ("simulation", "0005_scenario_progress"),
+    ]
+
+    operations = [
+        migrations.RunPython(abandon_duplicate_sessions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="gamesession",
+            constraint=models.UniqueConstraint(condition=models.Q(("is_game_over__isnull", True)), fields=("user", "scenario"), name="game_session_one_active_per_scenario"),
+        ),
+    ]
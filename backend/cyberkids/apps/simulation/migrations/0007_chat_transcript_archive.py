@@ -0,0 +1,27 @@
+# Generated by Django 6.0.1 on 2026-10-19 19:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("simulation", "0006_one_active_session"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChatTranscriptArchive",
+            fields=[
+                ("archive_id", models.AutoField(primary_key=True, serialize=False)),
+                ("message_count", models.IntegerField(default=0)),
+                ("data", models.BinaryField()),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                ("session", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name="transcript_archive", to="simulation.gamesession")),
+            ],
+            options={
+                "db_table": "chat_transcript_archive",
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 22:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("simulation", "0007_chat_transcript_archive"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="gamesession",
+            name="rolled_up_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
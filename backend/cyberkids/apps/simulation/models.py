@@ -6,9 +6,16 @@ Tables:
 - sensitive_pattern: Regex patterns to detect sensitive data disclosure
 - game_session: User game sessions tracking progress and status
 - chat_message: Chat messages between user and AI antagonist
+- scenario_progress: Completed scenarios per user (bitset) for scenario assignment
+- chat_transcript_archive: Compressed transcripts of old finished sessions
 """
 
+import gzip
+import json
+from collections import namedtuple
+
 from django.db import models
+from django.utils.dateparse import parse_datetime
 from apps.cyberUser.models import CyberUser, Country
 
 
@@ -69,12 +76,30 @@ class GameSession(models.Model):
 	# Esto evita invertir la semántica y hace explícito el estado "en curso".
 	is_game_over = models.BooleanField(null=True, blank=True)
 	game_over_reason = models.CharField(max_length=255, null=True, blank=True)
+	# Cuándo se sumó a scenario_win_rate (tarea de rollup o rebuild_statistics); evita contarla dos veces
+	rolled_up_at = models.DateTimeField(null=True, blank=True)
 
 	class Meta:
 		db_table = 'game_session'
+		# La FK user ya tiene su propio índice; los compuestos empiezan por user
 		indexes = [
-			models.Index(fields=['user']),
 			models.Index(fields=['started_at']),
+			# Historial paginado por cursor (my_sessions)
+			models.Index(fields=['user', '-started_at', '-session_id'], name='game_session_user_hist_idx'),
+			# Sesión activa del usuario (chat, resume_session): índice parcial, solo filas en curso
+			models.Index(
+				fields=['user', '-started_at'], condition=models.Q(is_game_over__isnull=True),
+				name='game_session_active_idx',
+			),
+			# Estadísticas y escenarios completados (outcome='won')
+			models.Index(fields=['user', 'outcome'], name='game_session_user_outcome_idx'),
+		]
+		# Una sola sesión en curso por usuario y escenario (resume_or_start)
+		constraints = [
+			models.UniqueConstraint(
+				fields=['user', 'scenario'], condition=models.Q(is_game_over__isnull=True),
+				name='game_session_one_active_per_scenario',
+			),
 		]
 
 	def __str__(self):
@@ -92,7 +117,88 @@ class ChatMessage(models.Model):
 
 	class Meta:
 		db_table = 'chat_message'
-		indexes = [models.Index(fields=['session'])]
+		# (session, sent_at, message_id) cubre también los filtros solo por sesión
+		indexes = [models.Index(fields=['session', 'sent_at', 'message_id'], name='chat_message_session_page_idx')]
 
 	def __str__(self):
 		return f"{self.role} @ {self.sent_at}: {self.content[:40]}"
+
+
+class ScenarioProgress(models.Model):
+	"""Escenarios superados por el usuario, como bitset (bit N = scenario_id N).
+
+	Se guarda en hexadecimal para que sea portable entre SQLite y PostgreSQL.
+	Evita cargar la lista de sesiones ganadas para elegir el siguiente escenario.
+	"""
+	progress_id = models.AutoField(primary_key=True)
+	user = models.OneToOneField(CyberUser, on_delete=models.CASCADE, related_name='scenario_progress')
+	completed = models.TextField(default='', blank=True)
+	updated_at = models.DateTimeField(auto_now=True)
+
+	class Meta:
+		db_table = 'scenario_progress'
+
+	def __str__(self):
+		return f"{self.user.username} - {len(self.completed_ids())} completed"
+
+	@property
+	def bits(self):
+		return int(self.completed, 16) if self.completed else 0
+
+	def is_completed(self, scenario_id):
+		return bool(self.bits >> int(scenario_id) & 1)
+
+	def completed_ids(self):
+		bits = self.bits
+		return [i for i in range(bits.bit_length()) if bits >> i & 1]
+
+	@classmethod
+	def mark_completed(cls, user_id, scenario_id):
+		"""Marca ``scenario_id`` como superado. Llamar dentro de una transacción."""
+		progress, _ = cls.objects.get_or_create(user_id=user_id)
+		progress = cls.objects.select_for_update().get(pk=progress.pk)
+		bits = progress.bits | (1 << int(scenario_id))
+		if bits != progress.bits:
+			progress.completed = format(bits, 'x')
+			progress.save(update_fields=['completed', 'updated_at'])
+		return progress
+
+
+# Mensaje leído de un transcript archivado; mismos atributos que usa session_messages
+ArchivedMessage = namedtuple('ArchivedMessage', ['message_id', 'role', 'content', 'sent_at', 'is_dangerous', 'detected_pattern_id'])
+
+
+class ChatTranscriptArchive(models.Model):
+	"""Transcript de una sesión terminada, comprimido (JSON + gzip) en una sola fila.
+
+	Lo genera el comando ``archive_transcripts``, que además borra los mensajes
+	de ``chat_message`` para que la tabla caliente y sus índices no crezcan.
+	"""
+	archive_id = models.AutoField(primary_key=True)
+	session = models.OneToOneField(GameSession, on_delete=models.CASCADE, related_name='transcript_archive')
+	message_count = models.IntegerField(default=0)
+	data = models.BinaryField()
+	archived_at = models.DateTimeField(auto_now_add=True)
+
+	class Meta:
+		db_table = 'chat_transcript_archive'
+
+	def __str__(self):
+		return f"Archive {self.session_id} ({self.message_count} messages)"
+
+	@staticmethod
+	def pack(messages):
+		"""Comprime los mensajes (ordenados por sent_at, message_id)."""
+		rows = [
+			[m.message_id, m.role, m.content, m.sent_at.isoformat(), m.is_dangerous, m.detected_pattern_id]
+			for m in messages
+		]
+		return gzip.compress(json.dumps(rows, ensure_ascii=False, separators=(',', ':')).encode(), compresslevel=6)
+
+	def messages(self):
+		"""Lista de ``ArchivedMessage`` en el orden original."""
+		rows = json.loads(gzip.decompress(bytes(self.data)).decode())
+		return [
+			ArchivedMessage(message_id, role, content, parse_datetime(sent_at), is_dangerous, pattern_id)
+			for message_id, role, content, sent_at, is_dangerous, pattern_id in rows
+		]
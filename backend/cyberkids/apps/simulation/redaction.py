@@ -0,0 +1,75 @@
+"""
+Patrones sensibles compilados y redacción de datos personales.
+
+Los ``SensitivePattern`` se leen una sola vez y se guardan compilados
+(``CatalogMemo``) hasta que cambia la versión compartida del catálogo
+``sensitive_patterns`` (se renueva en cada ``save``/``delete``, en cualquier
+proceso) o pasan ``CATALOG_MEMO_TTL`` segundos. El chat los usa para detectar revelaciones y el logging
+para ocultar esos mismos datos antes de escribir payloads.
+"""
+
+import copy
+import re
+
+from cyberkids.catalog_cache import CatalogMemo
+
+CATALOG = 'sensitive_patterns'
+
+# Siempre se redactan, aunque la tabla de patrones esté vacía
+BUILTIN_PATTERNS = (
+    ('email', re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]+')),
+    ('number', re.compile(r'(?:\+?\d[\d\s().-]{5,}\d)')),
+)
+
+
+def _compile_patterns():
+    from .models import SensitivePattern
+    compiled = []
+    for pattern in SensitivePattern.objects.all():
+        try:
+            compiled.append((pattern, re.compile(pattern.regex_pattern)))
+        except (re.error, TypeError):
+            continue
+    return tuple(compiled)
+
+
+_patterns = CatalogMemo(CATALOG, _compile_patterns)
+
+
+def get_sensitive_patterns():
+    """Lista de ``(SensitivePattern, regex compilada)``; las regex inválidas se omiten."""
+    return _patterns.get()
+
+
+def find_sensitive_pattern(text):
+    """Primer ``SensitivePattern`` que aparece en ``text`` o None."""
+    if not text:
+        return None
+    for pattern, regex in get_sensitive_patterns():
+        if regex.search(text):
+            return pattern
+    return None
+
+
+def redact_text(text):
+    if not isinstance(text, str) or not text:
+        return text
+    for pattern, regex in get_sensitive_patterns():
+        text = regex.sub(f'[REDACTED:{pattern.data_type}]', text)
+    for data_type, regex in BUILTIN_PATTERNS:
+        text = regex.sub(f'[REDACTED:{data_type}]', text)
+    return text
+
+
+def redact_payload(payload):
+    """Copia del payload del LLM con el historial redactado y sin el nombre de usuario."""
+    data = copy.deepcopy(payload) if isinstance(payload, dict) else {}
+    user_context = data.get('user_context')
+    if isinstance(user_context, dict) and user_context.get('username'):
+        user_context['username'] = '[REDACTED]'
+    for message in data.get('chat_history') or []:
+        if isinstance(message, dict):
+            message['content'] = redact_text(message.get('content'))
+    if 'reply' in data:
+        data['reply'] = redact_text(data['reply'])
+    return data
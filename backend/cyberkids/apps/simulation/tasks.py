@@ -0,0 +1,28 @@
+from django.db.models import F
+
+from apps.cyberUser.models import CyberUser
+from apps.progression.models import CreditTransaction
+from apps.tasks.runner import task
+
+from .models import GameSession
+
+
+@task('simulation.award_session_points')
+def award_session_points(session_id):
+    """Acredita los puntos de una sesión ganada y registra su CreditTransaction."""
+    session = GameSession.objects.select_related('scenario').get(session_id=session_id)
+    if not session.user_id or not session.points_earned:
+        return
+    if CreditTransaction.objects.filter(reference_type='game_session', reference_id=session_id).exists():
+        return
+
+    CyberUser.objects.filter(user_id=session.user_id).update(cybercreds=F('cybercreds') + session.points_earned)
+    scenario_name = session.scenario.name if session.scenario else (session.scenario_snapshot or {}).get('name', '')
+    CreditTransaction.objects.create(
+        user_id=session.user_id,
+        amount=session.points_earned,
+        transaction_type='game',
+        description=f'Simulación: {scenario_name}',
+        reference_id=session_id,
+        reference_type='game_session'
+    )
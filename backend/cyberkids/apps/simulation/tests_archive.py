@@ -0,0 +1,63 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.cyberUser.models import CyberUser
+from apps.simulation.models import ChatMessage, ChatTranscriptArchive, GameSession, Scenario
+
+
+class TranscriptArchiveTests(TestCase):
+    def setUp(self):
+        self.user = CyberUser.objects.create(username='archivo', email='a@example.com', password='x', avatar='a.jpg')
+        self.scenario = Scenario.objects.create(name='s', antagonist_goal='g', difficulty_level=1, is_active=True)
+        long_ago = timezone.now() - timedelta(days=90)
+        self.old = GameSession.objects.create(
+            user=self.user, scenario=self.scenario, is_game_over=False, outcome='won', ended_at=long_ago,
+        )
+        self.recent = GameSession.objects.create(
+            user=self.user, scenario=self.scenario, is_game_over=True, outcome='failed', ended_at=timezone.now(),
+        )
+        for session in (self.old, self.recent):
+            for i in range(3):
+                ChatMessage.objects.create(session=session, role='user', content=f'mensaje {i} ñ')
+        self.client = APIClient()
+
+    def test_archive_moves_old_transcripts_out_of_hot_table(self):
+        url = f'/api/simulation/session/{self.old.session_id}/messages/'
+        before = self.client.get(url).json()
+
+        call_command('archive_transcripts', '--days', '30', stdout=StringIO())
+
+        self.assertFalse(ChatMessage.objects.filter(session=self.old).exists())
+        self.assertEqual(ChatMessage.objects.filter(session=self.recent).count(), 3)
+        self.assertEqual(ChatTranscriptArchive.objects.get(session=self.old).message_count, 3)
+
+        # session_messages lee el archivo de forma transparente
+        self.assertEqual(self.client.get(url).json(), before)
+
+        # Volver a ejecutarlo no duplica archivos
+        call_command('archive_transcripts', '--days', '30', stdout=StringIO())
+        self.assertEqual(ChatTranscriptArchive.objects.count(), 1)
+
+    def test_archived_transcript_is_paged(self):
+        call_command('archive_transcripts', '--days', '30', stdout=StringIO())
+        url = f'/api/simulation/session/{self.old.session_id}/messages/'
+
+        first = self.client.get(url, {'limit': 2}).json()
+        rest = self.client.get(url, {'limit': 2, 'cursor': first['next_cursor']}).json()
+        contents = [m['content'] for m in first['messages'] + rest['messages']]
+        self.assertEqual(contents, [f'mensaje {i} ñ' for i in range(3)])
+        self.assertIsNone(rest['next_cursor'])
+
+    def test_chat_message_crud_only_lists_live_transcripts(self):
+        call_command('archive_transcripts', '--days', '30', stdout=StringIO())
+
+        data = self.client.get('/api/simulation/chat-messages/').json()
+        self.assertEqual({m['session'] for m in data['results']}, {self.recent.session_id})
+        # Lo archivado se sigue leyendo por la sesión
+        archived = self.client.get(f'/api/simulation/session/{self.old.session_id}/messages/').json()
+        self.assertEqual(len(archived['messages']), 3)
@@ -0,0 +1,65 @@
+import time
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.cyberUser.models import CyberUser
+from apps.simulation.assignment import get_active_scenarios
+from apps.simulation.models import GameSession, Scenario, ScenarioProgress
+from cyberkids.catalog_cache import clear_catalog_cache
+
+LLM_REPLY = {'reply': 'Hola', 'analysis': {}}
+
+
+def last_scenario(scenarios, progress, user):
+    return scenarios[-1].scenario_id
+
+
+class ScenarioAssignmentTests(TestCase):
+    def setUp(self):
+        clear_catalog_cache()
+        self.user = CyberUser.objects.create(username='kid', email='k@example.com', password='x', avatar='k.jpg')
+        self.hard = Scenario.objects.create(name='difícil', antagonist_goal='g', difficulty_level=3, is_active=True)
+        self.easy = Scenario.objects.create(name='fácil', antagonist_goal='g', difficulty_level=1, is_active=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _start(self):
+        with patch('apps.simulation.views._call_llm_backend', return_value=LLM_REPLY):
+            response = self.client.post('/api/simulation/session/start-role/', {}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return GameSession.objects.get(session_id=response.json()['session_id']).scenario_id
+
+    def test_next_scenario_follows_progress(self):
+        self.assertEqual(self._start(), self.easy.scenario_id)
+
+        ScenarioProgress.mark_completed(self.user.user_id, self.easy.scenario_id)
+        self.assertEqual(self._start(), self.hard.scenario_id)
+
+        # Todos superados: vuelve al de menor id
+        ScenarioProgress.mark_completed(self.user.user_id, self.hard.scenario_id)
+        self.assertEqual(self._start(), self.hard.scenario_id)
+
+    def test_progress_bitset(self):
+        progress = ScenarioProgress.mark_completed(self.user.user_id, 70)
+        ScenarioProgress.mark_completed(self.user.user_id, 3)
+        progress.refresh_from_db()
+        self.assertEqual(progress.completed_ids(), [3, 70])
+        self.assertFalse(progress.is_completed(4))
+
+    @override_settings(SCENARIO_PICKER='apps.simulation.tests_assignment.last_scenario')
+    def test_picker_is_pluggable(self):
+        self.assertEqual(self._start(), self.hard.scenario_id)
+
+    def test_active_scenarios_follow_changes(self):
+        self.assertEqual([ref.scenario_id for ref in get_active_scenarios()], [self.easy.scenario_id, self.hard.scenario_id])
+        self.easy.is_active = False
+        self.easy.save()
+        self.assertEqual([ref.scenario_id for ref in get_active_scenarios()], [self.hard.scenario_id])
+
+        # Sin señales (QuerySet.update) el cambio se ve al caducar CATALOG_MEMO_TTL
+        Scenario.objects.filter(pk=self.easy.pk).update(is_active=True)
+        self.assertEqual(len(get_active_scenarios()), 1)
+        with patch('cyberkids.catalog_cache.time.monotonic', return_value=time.monotonic() + 61):
+            self.assertEqual(len(get_active_scenarios()), 2)
@@ -0,0 +1,90 @@
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.cyberUser.models import Country
+from apps.simulation.models import Scenario
+from cyberkids import catalog_cache
+from cyberkids.catalog_cache import bump_catalog, clear_catalog_cache
+
+
+class CatalogCacheTests(TestCase):
+    def setUp(self):
+        clear_catalog_cache()
+        self.client = APIClient()
+        self.scenario = Scenario.objects.create(
+            name='Phishing', antagonist_goal='password', difficulty_level=1,
+            base_points=50, threat_type='phishing', is_active=True,
+        )
+        self.url = reverse('scenarios-active')
+
+    def test_conditional_get_returns_304_reading_only_the_version(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json()[0]['name'], 'Phishing')
+        etag = first['ETag']
+
+        with self.assertNumQueries(1):
+            second = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second['ETag'], etag)
+
+    def test_warm_cache_serves_bytes_reading_only_the_version(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(1):
+            resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.json()), 1)
+
+    def test_save_invalidates_catalog(self):
+        etag = self.client.get(self.url)['ETag']
+
+        self.scenario.name = 'Phishing v2'
+        self.scenario.save()
+
+        resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp['ETag'], etag)
+        self.assertEqual(resp.json()[0]['name'], 'Phishing v2')
+
+    def test_delete_invalidates_catalog(self):
+        self.client.get(self.url)
+        self.scenario.delete()
+        self.assertEqual(self.client.get(self.url).json(), [])
+
+    def test_last_modified_only_once_the_second_is_over(self):
+        with mock.patch('cyberkids.catalog_cache.time.time', return_value=1000.2):
+            bump_catalog('scenarios')
+            fresh = self.client.get(self.url)
+        self.assertNotIn('Last-Modified', fresh)
+
+        # Otro cambio en el mismo segundo: If-Modified-Since no basta para un 304
+        with mock.patch('cyberkids.catalog_cache.time.time', return_value=1000.7):
+            bump_catalog('scenarios')
+        with mock.patch('cyberkids.catalog_cache.time.time', return_value=1001.5):
+            settled = self.client.get(self.url)
+            since = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=settled['Last-Modified'])
+        self.assertEqual(settled['Last-Modified'], 'Thu, 01 Jan 1970 00:16:40 GMT')
+        self.assertEqual(since.status_code, 304)
+
+
+class CountryCatalogTests(TestCase):
+    def setUp(self):
+        clear_catalog_cache()
+        Country.objects.bulk_create([Country(name=f'País {i:02}', iso_code=f'P{i:02}', language='es') for i in range(25)])
+        self.client = APIClient()
+
+    def test_variant_is_the_page_only(self):
+        first = self.client.get('/api/users/countries/', {'page': 2})
+        self.assertEqual(first.json()['previous'], '/api/users/countries/')
+        self.assertIsNone(first.json()['next'])
+        for params in ({'page': '2', 'junk': 'x'}, {'page': '2', 'otro': 'y'}):
+            response = self.client.get('/api/users/countries/', params, HTTP_HOST='otro.example.com')
+            self.assertEqual(response.content, first.content)
+        self.client.get('/api/users/countries/')
+        self.assertEqual(sorted(key[1] for key in catalog_cache._entries), ['page:1', 'page:2'])
+
+        self.assertEqual(self.client.get('/api/users/countries/', {'page': 'x'}).status_code, 404)
+        self.assertEqual(self.client.get('/api/users/countries/', {'page': 9}).status_code, 404)
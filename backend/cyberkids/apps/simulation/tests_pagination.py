@@ -0,0 +1,55 @@
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.cyberUser.models import CyberUser
+from apps.simulation.models import ChatMessage, GameSession, Scenario
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.user = CyberUser.objects.create(username='paginador', email='p@example.com', password='x', avatar='p.jpg')
+        self.scenario = Scenario.objects.create(
+            name='s1', antagonist_goal='goal', difficulty_level=1, base_points=10, threat_type='test', is_active=True,
+        )
+        self.session = GameSession.objects.create(user=self.user, scenario=self.scenario)
+        for i in range(5):
+            ChatMessage.objects.create(session=self.session, role='user', content=f'm{i}')
+        # Mismo sent_at para todos: el desempate por message_id debe mantener el orden
+        ChatMessage.objects.filter(session=self.session).update(sent_at=timezone.now())
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_messages_are_paged_in_order(self):
+        url = f'/api/simulation/session/{self.session.session_id}/messages/'
+        contents, cursor = [], None
+        for _ in range(5):
+            params = {'limit': 2}
+            if cursor:
+                params['cursor'] = cursor
+            data = self.client.get(url, params).json()
+            contents += [m['content'] for m in data['messages']]
+            cursor = data['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(contents, [f'm{i}' for i in range(5)])
+
+    def test_legacy_response_is_unchanged(self):
+        data = self.client.get(f'/api/simulation/session/{self.session.session_id}/messages/').json()
+        self.assertEqual(len(data['messages']), 5)
+        self.assertNotIn('next_cursor', data)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(
+            f'/api/simulation/session/{self.session.session_id}/messages/', {'cursor': 'no-es-un-cursor'}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_my_sessions_cursor_walks_newest_first(self):
+        second = GameSession.objects.create(user=self.user, scenario=self.scenario, is_game_over=False, outcome='won')
+        url = '/api/simulation/game-sessions/my_sessions/'
+        first_page = self.client.get(url, {'limit': 1}).json()
+        self.assertEqual(first_page['results'][0]['session_id'], second.session_id)
+        last_page = self.client.get(url, {'limit': 1, 'cursor': first_page['next_cursor']}).json()
+        self.assertEqual(last_page['results'][0]['session_id'], self.session.session_id)
+        self.assertIsNone(last_page['next_cursor'])
@@ -0,0 +1,74 @@
+import io
+import json
+import logging
+import time
+from unittest import mock
+
+from django.test import TestCase
+
+from apps.simulation.models import SensitivePattern
+from apps.simulation.redaction import find_sensitive_pattern, redact_payload
+from cyberkids.log import AsyncQueueHandler, JSONFormatter
+
+
+class RedactionTests(TestCase):
+    def test_payload_history_is_redacted(self):
+        SensitivePattern.objects.create(name='dni', regex_pattern=r'\bDNI\s*\w+', data_type='dni')
+        payload = {
+            'session_id': '7',
+            'user_context': {'username': 'ana', 'country': 'Perú'},
+            'chat_history': [
+                {'role': 'user', 'content': 'mi DNI X123 y mi correo ana@example.com'},
+            ],
+        }
+        redacted = redact_payload(payload)
+        content = redacted['chat_history'][0]['content']
+        self.assertNotIn('X123', content)
+        self.assertNotIn('ana@example.com', content)
+        self.assertIn('[REDACTED:dni]', content)
+        self.assertEqual(redacted['user_context']['username'], '[REDACTED]')
+        # El payload original no se modifica
+        self.assertIn('X123', payload['chat_history'][0]['content'])
+
+    def test_pattern_cache_follows_changes(self):
+        self.assertIsNone(find_sensitive_pattern('clave ZZZ999'))
+        pattern = SensitivePattern.objects.create(name='clave', regex_pattern=r'ZZZ\d+', data_type='password')
+        self.assertEqual(find_sensitive_pattern('clave ZZZ999'), pattern)
+        with self.assertNumQueries(1):  # solo el sello de versión
+            find_sensitive_pattern('otra ZZZ1')
+        pattern.delete()
+        self.assertIsNone(find_sensitive_pattern('clave ZZZ999'))
+
+    def test_changes_without_signals_expire_with_ttl(self):
+        SensitivePattern.objects.create(name='clave', regex_pattern=r'ZZZ\d+', data_type='password')
+        self.assertIsNotNone(find_sensitive_pattern('clave ZZZ999'))
+        # QuerySet.update no renueva la versión del catálogo
+        SensitivePattern.objects.update(regex_pattern=r'YYY\d+')
+        self.assertIsNotNone(find_sensitive_pattern('clave ZZZ999'))
+
+        with self.settings(CATALOG_MEMO_TTL=60), \
+                mock.patch('cyberkids.catalog_cache.time.monotonic', return_value=time.monotonic() + 61):
+            self.assertIsNone(find_sensitive_pattern('clave ZZZ999'))
+            self.assertIsNotNone(find_sensitive_pattern('clave YYY1'))
+
+
+class AsyncLoggingTests(TestCase):
+    def test_records_are_written_as_compact_json(self):
+        stream = io.StringIO()
+        handler = AsyncQueueHandler(stream=stream)
+        handler.setFormatter(JSONFormatter())
+        logger = logging.getLogger('apps.tests.async_logging')
+        logger.addHandler(handler)
+        logger.propagate = False
+        try:
+            logger.warning('llamada lenta', extra={'fields': {'event': 'llm_call', 'elapsed_ms': 12.5}})
+        finally:
+            logger.removeHandler(handler)
+            handler.close()
+
+        line = stream.getvalue().strip()
+        self.assertEqual(len(line.splitlines()), 1)
+        record = json.loads(line)
+        self.assertEqual(record['msg'], 'llamada lenta')
+        self.assertEqual(record['event'], 'llm_call')
+        self.assertEqual(record['elapsed_ms'], 12.5)
@@ -0,0 +1,67 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.cyberUser.models import CyberUser
+from apps.simulation.models import ChatMessage, GameSession, Scenario
+from cyberkids.catalog_cache import clear_catalog_cache
+
+LLM_REPLY = {'reply': 'Hola', 'analysis': {}}
+
+
+class ResumeOrStartTests(TestCase):
+    def setUp(self):
+        clear_catalog_cache()
+        self.user = CyberUser.objects.create(username='kid', email='k@example.com', password='x', avatar='k.jpg')
+        self.scenario = Scenario.objects.create(name='s', antagonist_goal='g', difficulty_level=1, is_active=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _post(self, url, data=None):
+        with patch('apps.simulation.views._call_llm_backend', return_value=LLM_REPLY):
+            return self.client.post(url, data or {}, format='json')
+
+    def test_resume_or_start_reuses_active_session(self):
+        first = self._post('/api/simulation/session/resume-or-start/').json()
+        self.assertFalse(first['resumed'])
+
+        second = self._post('/api/simulation/session/resume-or-start/', {'scenario_id': self.scenario.scenario_id}).json()
+        self.assertTrue(second['resumed'])
+        self.assertEqual(second['session_id'], first['session_id'])
+        self.assertEqual([m['content'] for m in second['messages']], ['Hola'])
+        self.assertEqual(GameSession.objects.filter(user=self.user).count(), 1)
+
+    def test_start_role_abandons_previous_active_session(self):
+        first = self._post('/api/simulation/session/start-role/').json()
+        second = self._post('/api/simulation/session/start-role/').json()
+        self.assertNotEqual(first['session_id'], second['session_id'])
+
+        old = GameSession.objects.get(session_id=first['session_id'])
+        self.assertEqual(old.outcome, 'abandoned')
+        self.assertTrue(old.is_game_over)
+
+    def test_only_one_active_session_per_scenario(self):
+        GameSession.objects.create(user=self.user, scenario=self.scenario)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            GameSession.objects.create(user=self.user, scenario=self.scenario)
+
+    def test_reaper_abandons_idle_sessions(self):
+        long_ago = timezone.now() - timedelta(hours=3)
+        idle = GameSession.objects.create(user=self.user, scenario=self.scenario)
+        other = Scenario.objects.create(name='t', antagonist_goal='g', difficulty_level=2, is_active=True)
+        busy = GameSession.objects.create(user=self.user, scenario=other)
+        GameSession.objects.filter(pk__in=[idle.pk, busy.pk]).update(started_at=long_ago)
+        ChatMessage.objects.create(session=busy, role='user', content='sigo aquí')
+
+        call_command('reap_idle_sessions', '--minutes', '60', stdout=StringIO())
+
+        idle.refresh_from_db()
+        busy.refresh_from_db()
+        self.assertEqual(idle.game_over_reason, 'idle_timeout')
+        self.assertIsNone(busy.is_game_over)
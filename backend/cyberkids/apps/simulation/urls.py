@@ -12,5 +12,6 @@ urlpatterns = [
     path('chat/', views.chat, name='simulation-chat'),
     path('session/start-role/', views.start_with_role, name='simulation-start-with-role'),
     path('session/resume/', views.resume_session, name='simulation-resume-session'),
+    path('session/resume-or-start/', views.resume_or_start, name='simulation-resume-or-start'),
     path('session/<int:session_id>/messages/', views.session_messages, name='simulation-session-messages'),
 ]
@@ -10,10 +10,18 @@ from rest_framework import viewsets
 import logging
 import re
 import json
+import random
 import requests
+import time
 from django.utils import timezone
+from django.db import IntegrityError
 import os
 from apps.cyberUser.models import CyberUser
+from cyberkids.metrics import CHAT_TURNS, LLM_ERRORS, LLM_REQUEST_SECONDS, SIMULATION_SESSIONS
+from apps.tasks.runner import enqueue
+from cyberkids import pagination
+from cyberkids.timing import span
+from apps.simulation.redaction import find_sensitive_pattern, redact_payload, redact_text
 
 
 def _extract_json_from_text(text):
@@ -42,6 +50,17 @@ def get_display_text(obj):
 # URL del backend LLM externo
 LLM_API_BASE_URL = "https://cyber-dojo-llm-api.vercel.app"
 
+
+def _log_llm_payload(event, data, session_id=None):
+    """Loguea (redactado) una fracción LLM_PAYLOAD_LOG_SAMPLE_RATE de los payloads del LLM."""
+    rate = getattr(settings, 'LLM_PAYLOAD_LOG_SAMPLE_RATE', 0.0)
+    if rate <= 0 or (rate < 1 and random.random() >= rate) or not logger.isEnabledFor(logging.INFO):
+        return
+    fields = {'event': event, 'payload': redact_payload(data)}
+    if session_id is not None:
+        fields['session_id'] = session_id
+    logger.info('LLM payload', extra={'fields': fields})
+
 def _call_llm_backend(payload: dict) -> dict:
     """Llama al backend LLM externo en Vercel.
     
@@ -74,27 +93,41 @@ def _call_llm_backend(payload: dict) -> dict:
             }
     """
     url = f"{LLM_API_BASE_URL.rstrip('/')}/api/simulation-chat"
+    fields = {
+        'event': 'llm_call',
+        'session_id': payload.get('session_id'),
+        'history_len': len(payload.get('chat_history') or []),
+    }
+    _log_llm_payload('llm_request', payload)
     
-    logger.info(f"🔵 Llamando al backend LLM: {url}")
-    logger.info(f"🔵 Payload: {json.dumps(payload, indent=2, ensure_ascii=False)}")
-    
+    started = time.perf_counter()
     try:
-        response = requests.post(url, json=payload, timeout=30)
-        logger.info(f"🔵 Status code: {response.status_code}")
-        logger.info(f"🔵 Response text: {response.text[:500]}")
+        with span('llm'):
+            try:
+                response = requests.post(url, json=payload, timeout=30)
+            finally:
+                elapsed = time.perf_counter() - started
+                LLM_REQUEST_SECONDS.observe(elapsed)
+                fields['elapsed_ms'] = round(elapsed * 1000, 1)
+        fields['status'] = response.status_code
         
         response.raise_for_status()
         data = response.json()
-        logger.info(f"✅ Backend LLM respondió exitosamente")
+        logger.info('LLM backend ok', extra={'fields': fields})
+        _log_llm_payload('llm_response', data, session_id=fields['session_id'])
         return data
     except requests.exceptions.Timeout as e:
-        logger.error(f"❌ Timeout al llamar al backend LLM: {e}")
+        LLM_ERRORS.inc(reason='timeout')
+        logger.error('LLM backend timeout', extra={'fields': {**fields, 'error': str(e)}})
     except requests.exceptions.ConnectionError as e:
-        logger.error(f"❌ Error de conexión al backend LLM: {e}")
+        LLM_ERRORS.inc(reason='connection')
+        logger.error('LLM backend connection error', extra={'fields': {**fields, 'error': str(e)}})
     except requests.exceptions.HTTPError as e:
-        logger.error(f"❌ Error HTTP del backend LLM: {e} - Response: {response.text[:500]}")
+        LLM_ERRORS.inc(reason='http')
+        logger.error('LLM backend HTTP error', extra={'fields': {**fields, 'body': redact_text(response.text[:200])}})
     except Exception as e:
-        logger.exception(f"❌ Error inesperado al llamar al backend LLM: {e}")
+        LLM_ERRORS.inc(reason='unexpected')
+        logger.exception('LLM backend unexpected error', extra={'fields': fields})
     
     # Fallback response
     return {
@@ -109,75 +142,85 @@ def _call_llm_backend(payload: dict) -> dict:
     }
 
 
-@csrf_exempt
-@api_view(['POST'])
-@permission_classes([IsAuthenticated])
-def start_with_role(request):
-    """Crea una nueva GameSession y devuelve el primer mensaje del antagonista usando el backend LLM externo.
-    
-    Request body (JSON):
-        - scenario_id (int, opcional): ID del escenario específico a usar
-    
-    Si no se especifica scenario_id, se asigna automáticamente el siguiente no completado.
-    """
+def _authenticated_cyberuser(request):
+    """CyberUser de la petición (request.user ya lo es con JWTCustomAuthentication)."""
     from apps.cyberUser.models import CyberUser
-    user = None
     if hasattr(request, 'user') and getattr(request.user, 'is_authenticated', False):
         if isinstance(request.user, CyberUser):
-            user = request.user
-        else:
-            try:
-                user_pk = getattr(request.user, 'user_id', None) or getattr(request.user, 'pk', None)
-                if user_pk:
-                    user = CyberUser.objects.get(pk=user_pk)
-            except Exception:
-                user = None
-    if not user:
-        return JsonResponse({'error': 'authentication_required'}, status=401)
-    
-    from apps.simulation.models import Scenario, GameSession, ChatMessage
-    
-    data = request.data if isinstance(request.data, dict) else {}
-    scenario_id = data.get('scenario_id')
-    
+            return request.user
+        try:
+            user_pk = getattr(request.user, 'user_id', None) or getattr(request.user, 'pk', None)
+            if user_pk:
+                return CyberUser.objects.get(pk=user_pk)
+        except Exception:
+            return None
+    return None
+
+
+def _resolve_scenario(user, scenario_id):
+    """Devuelve ``(scenario, error_response)``: el pedido o el siguiente que le toca al usuario."""
+    from apps.simulation.models import Scenario
+
     scenario = None
-    
     if scenario_id:
         try:
             scenario = Scenario.objects.get(scenario_id=int(scenario_id), is_active=True)
         except Scenario.DoesNotExist:
-            return JsonResponse({'error': 'scenario_not_found', 'message': f'Escenario {scenario_id} no existe o no está activo'}, status=404)
+            return None, JsonResponse({'error': 'scenario_not_found', 'message': f'Escenario {scenario_id} no existe o no está activo'}, status=404)
         except Exception as e:
-            return JsonResponse({'error': 'invalid_scenario_id', 'message': str(e)}, status=400)
+            return None, JsonResponse({'error': 'invalid_scenario_id', 'message': str(e)}, status=400)
     else:
-        try:
-            completed_ids = list(GameSession.objects.filter(user=user, outcome='won').values_list('scenario_id', flat=True))
-        except Exception:
-            completed_ids = []
-        scenario = Scenario.objects.filter(is_active=True).exclude(scenario_id__in=completed_ids).order_by('difficulty_level', 'scenario_id').first()
+        # Siguiente escenario según el progreso del usuario (apps/simulation/assignment.py)
+        scenario = pick_next_scenario(user)
         if not scenario:
             scenario = Scenario.objects.filter(is_active=True).order_by('scenario_id').first()
-    
+
     if not scenario:
-        return JsonResponse({'error': 'no_active_scenario'}, status=404)
-    
-    from django.db import transaction
-    try:
-        with transaction.atomic():
-            session = GameSession.objects.create(user=user, scenario=scenario)
-            session.scenario_snapshot = {
-                'id': scenario.scenario_id,
-                'name': scenario.name,
-                'description': scenario.description,
-                'antagonist_goal': scenario.antagonist_goal,
-                'difficulty': scenario.difficulty_level,
-                'base_points': scenario.base_points,
-            }
-            session.antagonist_attempts = 0
-            session.save()
-    except Exception:
-        return JsonResponse({'error': 'failed_to_create_session'}, status=500)
-    
+        return None, JsonResponse({'error': 'no_active_scenario'}, status=404)
+    return scenario, None
+
+
+def _create_session(user, scenario):
+    """Crea la GameSession con su snapshot. Llamar dentro de una transacción.
+
+    Solo puede haber una sesión en curso por usuario y escenario (constraint
+    ``game_session_one_active_per_scenario``); si hay otra, lanza IntegrityError.
+    """
+    from apps.simulation.models import GameSession
+
+    session = GameSession.objects.create(
+        user=user,
+        scenario=scenario,
+        antagonist_attempts=0,
+        scenario_snapshot={
+            'id': scenario.scenario_id,
+            'name': scenario.name,
+            'description': scenario.description,
+            'antagonist_goal': scenario.antagonist_goal,
+            'difficulty': scenario.difficulty_level,
+            'base_points': scenario.base_points,
+        },
+    )
+    transaction.on_commit(lambda: SIMULATION_SESSIONS.inc(event='started'))
+    return session
+
+
+def _abandon_active_sessions(user, scenario):
+    """Marca como abandonadas las sesiones en curso del usuario en ``scenario``."""
+    from apps.simulation.models import GameSession
+
+    count = GameSession.objects.filter(user=user, scenario=scenario, is_game_over__isnull=True).update(
+        is_game_over=True, outcome='abandoned', game_over_reason='restarted', ended_at=timezone.now(),
+    )
+    if count:
+        transaction.on_commit(lambda: SIMULATION_SESSIONS.inc(count, event='abandoned'))
+    return count
+
+
+def _initial_message(session, user, scenario):
+    """Pide al backend LLM el primer mensaje del antagonista y lo guarda."""
+    from apps.simulation.models import ChatMessage
+
     # Preparar payload para el backend LLM externo
     max_attempts = getattr(__import__('django.conf').conf.settings, 'SIM_MAX_ATTEMPTS', 3)
     
@@ -197,13 +240,8 @@ def start_with_role(request):
         "chat_history": []
     }
     
-    logger.info(f"📤 Payload enviado a start_with_role:")
-    logger.info(json.dumps(payload, indent=2, ensure_ascii=False))
-    
     try:
         llm_response = _call_llm_backend(payload)
-        logger.info(f"📥 Respuesta recibida de LLM backend:")
-        logger.info(json.dumps(llm_response, indent=2, ensure_ascii=False))
         initial_message = llm_response.get('reply', '¡Hola! ¿Cómo estás?')
     except Exception as e:
         logger.exception(f"Error al obtener mensaje inicial del LLM: {e}")
@@ -213,7 +251,118 @@ def start_with_role(request):
         ChatMessage.objects.create(session=session, role='antagonist', content=initial_message)
     except Exception:
         pass
+    return initial_message
+
+
+@csrf_exempt
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def start_with_role(request):
+    """Crea una nueva GameSession y devuelve el primer mensaje del antagonista usando el backend LLM externo.
+    
+    Request body (JSON):
+        - scenario_id (int, opcional): ID del escenario específico a usar
+    
+    Si no se especifica scenario_id, se asigna automáticamente el siguiente no completado.
+    Si el usuario ya tenía una sesión en curso en ese escenario, se marca como abandonada.
+    """
+    user = _authenticated_cyberuser(request)
+    if not user:
+        return JsonResponse({'error': 'authentication_required'}, status=401)
+    
+    data = request.data if isinstance(request.data, dict) else {}
+    scenario, error = _resolve_scenario(user, data.get('scenario_id'))
+    if error:
+        return error
     
+    try:
+        with transaction.atomic():
+            _abandon_active_sessions(user, scenario)
+            session = _create_session(user, scenario)
+    except IntegrityError:
+        # Otra petición abrió una sesión en este escenario al mismo tiempo
+        return JsonResponse({'error': 'session_already_active'}, status=409)
+    except Exception:
+        return JsonResponse({'error': 'failed_to_create_session'}, status=500)
+    
+    initial_message = _initial_message(session, user, scenario)
+    
+    return JsonResponse({
+        'session_id': session.session_id,
+        'initial_message': initial_message,
+        'resumed': False
+    })
+
+
+def _resume_payload(session, messages=None):
+    """Respuesta de reanudación: la sesión en curso y sus mensajes (todos si no se pasan)."""
+    from apps.simulation.models import ChatMessage
+
+    if messages is None:
+        messages = ChatMessage.objects.filter(session=session).order_by(*MESSAGE_ORDERING)
+    return {
+        'session_id': session.session_id,
+        'scenario_id': session.scenario_id,
+        'antagonist_attempts': session.antagonist_attempts or 0,
+        'messages': [
+            {
+                'role': m.role,
+                'content': m.content,
+                'sent_at': m.sent_at.isoformat()
+            } for m in messages
+        ],
+        'has_active_session': True,
+        'resumed': True
+    }
+
+
+@csrf_exempt
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def resume_or_start(request):
+    """Devuelve la sesión en curso del usuario o, si no tiene, crea una.
+    
+    Request body (JSON):
+        - scenario_id (int, opcional): reanudar/empezar ese escenario. Sin él se
+          reanuda la sesión en curso más reciente o se asigna el siguiente escenario.
+    
+    Respuesta: la de ``session/resume/`` (``resumed: true``) o la de
+    ``session/start-role/`` (``resumed: false``).
+    """
+    from apps.simulation.models import GameSession
+
+    user = _authenticated_cyberuser(request)
+    if not user:
+        return JsonResponse({'error': 'authentication_required'}, status=401)
+
+    data = request.data if isinstance(request.data, dict) else {}
+    scenario_id = data.get('scenario_id')
+    active = GameSession.objects.filter(user=user, is_game_over__isnull=True)
+    if scenario_id:
+        try:
+            active = active.filter(scenario_id=int(scenario_id))
+        except (ValueError, TypeError):
+            return JsonResponse({'error': 'invalid_scenario_id'}, status=400)
+
+    session = active.order_by('-started_at').first()
+    if session:
+        return JsonResponse(_resume_payload(session))
+
+    scenario, error = _resolve_scenario(user, scenario_id)
+    if error:
+        return error
+
+    try:
+        with transaction.atomic():
+            session = _create_session(user, scenario)
+    except IntegrityError:
+        # Otra petición la creó a la vez: reanudar esa
+        session = GameSession.objects.filter(user=user, scenario=scenario, is_game_over__isnull=True).first()
+        if session is None:
+            return JsonResponse({'error': 'failed_to_create_session'}, status=500)
+        return JsonResponse(_resume_payload(session))
+
+    initial_message = _initial_message(session, user, scenario)
     return JsonResponse({
         'session_id': session.session_id,
         'initial_message': initial_message,
@@ -225,6 +374,10 @@ def start_with_role(request):
 
 logger = logging.getLogger(__name__)
 
+# Orden de paginación por cursor; coincide con los índices compuestos de models.py
+MESSAGE_ORDERING = ('sent_at', 'message_id')
+SESSION_ORDERING = ('-started_at', '-session_id')
+
 # Configuración de negocio: umbral de intentos del antagonista
 MAX_ATTEMPTS = getattr(__import__('django.conf').conf.settings, 'SIM_MAX_ATTEMPTS', 3)
 # NOTE: Keyword/dictionary heuristics removed intentionally. Detection of
@@ -237,7 +390,8 @@ MAX_ATTEMPTS = getattr(__import__('django.conf').conf.settings, 'SIM_MAX_ATTEMPT
 
 
 # TODO: Implement viewsets for Scenario, SensitivePattern, GameSession, ChatMessage
-from apps.simulation.models import GameSession, ChatMessage
+from apps.simulation.models import GameSession, ChatMessage, ScenarioProgress
+from apps.simulation.assignment import pick_next_scenario
 from django.db import transaction
 
 from .serializers import GameSessionSerializer, ChatMessageSerializer
@@ -372,20 +526,14 @@ def chat(request):
     disclosure = has_disclosure or force_end_session
     
     # Verificar patrones sensibles en el mensaje del usuario (detección local adicional)
-    from apps.simulation.models import SensitivePattern
     if user_msg and user_msg.content:
-        patterns = SensitivePattern.objects.all()
-        for p in patterns:
-            try:
-                if re.search(p.regex_pattern, user_msg.content):
-                    disclosure = True
-                    disclosure_reason = disclosure_reason or f"Matched sensitive pattern: {p.name}"
-                    user_msg.is_dangerous = True
-                    user_msg.detected_pattern = p
-                    user_msg.save(update_fields=['is_dangerous', 'detected_pattern'])
-                    break
-            except Exception:
-                continue
+        p = find_sensitive_pattern(user_msg.content)
+        if p is not None:
+            disclosure = True
+            disclosure_reason = disclosure_reason or f"Matched sensitive pattern: {p.name}"
+            user_msg.is_dangerous = True
+            user_msg.detected_pattern = p
+            user_msg.save(update_fields=['is_dangerous', 'detected_pattern'])
 
     # Lógica de cierre de sesión
     if disclosure:
@@ -402,6 +550,9 @@ def chat(request):
                     s.game_over_reason = disclosure_reason or 'sensitive_data'
                     s.ended_at = timezone.now()
                     s.save(update_fields=['is_game_over', 'outcome', 'game_over_reason', 'ended_at'])
+                    transaction.on_commit(lambda: SIMULATION_SESSIONS.inc(event='failed'))
+                    enqueue('onboarding.rollup_game_session', {'session_id': s.session_id},
+                            idempotency_key=f'game_session:{s.session_id}:rollup')
                 # Asegurar que la respuesta use el estado persistido
                 session = s
         except Exception:
@@ -430,13 +581,7 @@ def chat(request):
                         else:
                             points = int((s.scenario_snapshot or {}).get('base_points', 0) or 0)
 
-                        if s.user and not s.points_awarded:
-                            try:
-                                u = s.user
-                                u.cybercreds = (u.cybercreds or 0) + int(points)
-                                u.save(update_fields=['cybercreds'])
-                            except Exception:
-                                logger.exception(f'Failed to award points to user for session {s.session_id}')
+                        award = bool(s.user_id and not s.points_awarded and points)
 
                         s.points_earned = int(points)
                         s.points_awarded = True
@@ -445,6 +590,15 @@ def chat(request):
                         s.game_over_reason = 'antagonist_exhausted_no_disclosure'
                         s.ended_at = timezone.now()
                         s.save(update_fields=['points_earned', 'points_awarded', 'is_game_over', 'outcome', 'game_over_reason', 'ended_at'])
+                        transaction.on_commit(lambda: SIMULATION_SESSIONS.inc(event='won'))
+                        if s.user_id and s.scenario_id:
+                            ScenarioProgress.mark_completed(s.user_id, s.scenario_id)
+                        enqueue('onboarding.rollup_game_session', {'session_id': s.session_id},
+                                idempotency_key=f'game_session:{s.session_id}:rollup')
+                        if award:
+                            # Los cybercreds y su CreditTransaction se escriben en segundo plano
+                            enqueue('simulation.award_session_points', {'session_id': s.session_id},
+                                    idempotency_key=f'game_session:{s.session_id}:award')
                     # Asegurar que la respuesta use el estado persistido
                     session = s
             except Exception:
@@ -456,6 +610,8 @@ def chat(request):
     except Exception:
         pass
 
+    CHAT_TURNS.inc(outcome=session.outcome or 'in_progress')
+
     # Preparar respuesta
     resp = {
         'reply': reply_text,
@@ -532,12 +688,32 @@ def create_session(request):
 def session_messages(request, session_id: int):
     """Return messages and metadata for a given GameSession ordered by time."""
     try:
-        session = GameSession.objects.get(session_id=int(session_id))
+        session = GameSession.objects.select_related('scenario', 'transcript_archive').get(session_id=int(session_id))
     except GameSession.DoesNotExist:
         return JsonResponse({'error': 'session_not_found'}, status=404)
 
+    # Las sesiones terminadas antiguas tienen el transcript archivado (archive_transcripts)
+    archive = getattr(session, 'transcript_archive', None)
+    next_cursor = None
+    if archive is not None:
+        messages = archive.messages()
+        if pagination.is_requested(request):
+            try:
+                messages, next_cursor = pagination.paginate_list(messages, request, MESSAGE_ORDERING)
+            except pagination.InvalidCursor as e:
+                return JsonResponse({'error': str(e)}, status=400)
+    else:
+        messages = ChatMessage.objects.filter(session=session)
+        if pagination.is_requested(request):
+            try:
+                messages, next_cursor = pagination.paginate(messages, request, MESSAGE_ORDERING)
+            except pagination.InvalidCursor as e:
+                return JsonResponse({'error': str(e)}, status=400)
+        else:
+            messages = messages.order_by(*MESSAGE_ORDERING)
+
     msgs = []
-    for m in ChatMessage.objects.filter(session=session).order_by('sent_at'):
+    for m in messages:
         msgs.append({
             'id': m.message_id,
             'role': m.role,
@@ -546,9 +722,9 @@ def session_messages(request, session_id: int):
             'is_dangerous': m.is_dangerous,
         })
 
-    return JsonResponse({
+    data = {
         'session_id': session.session_id,
-        'user_id': session.user_id if session.user else None,
+        'user_id': session.user_id,
         'scenario': session.scenario.name if session.scenario else None,
         'is_game_over': session.is_game_over,
         'outcome': session.outcome,
@@ -557,7 +733,10 @@ def session_messages(request, session_id: int):
         'points_awarded': session.points_awarded,
         'points_earned': session.points_earned,
         'messages': msgs,
-    })
+    }
+    if pagination.is_requested(request):
+        data['next_cursor'] = next_cursor
+    return JsonResponse(data)
 
 
 
@@ -603,30 +782,27 @@ def resume_session(request):
     if not session:
         return JsonResponse({'error': 'no_active_session', 'has_active_session': False}, status=404)
     
-    # Obtener todos los mensajes de la sesión
-    messages = ChatMessage.objects.filter(session=session).order_by('sent_at')
+    # Mensajes de la sesión: todos, o una página si se envía limit/cursor
+    messages = ChatMessage.objects.filter(session=session)
+    next_cursor = None
+    if pagination.is_requested(request):
+        try:
+            messages, next_cursor = pagination.paginate(messages, request, MESSAGE_ORDERING)
+        except pagination.InvalidCursor as e:
+            return JsonResponse({'error': str(e)}, status=400)
+    else:
+        messages = messages.order_by(*MESSAGE_ORDERING)
 
-    messages_data = [
-        {
-            'role': m.role,
-            'content': m.content,
-            'sent_at': m.sent_at.isoformat()
-        } for m in messages
-    ]
-    
-    return JsonResponse({
-        'session_id': session.session_id,
-        'scenario_id': session.scenario_id,
-        'antagonist_attempts': session.antagonist_attempts or 0,
-        'messages': messages_data,
-        'has_active_session': True,
-        'resumed': True
-    })
+    data = _resume_payload(session, messages)
+    if pagination.is_requested(request):
+        data['next_cursor'] = next_cursor
+    return JsonResponse(data)
 
 
 from .models import Scenario
 from .serializers import ScenarioSerializer
 from rest_framework.permissions import IsAdminUser
+from cyberkids.catalog_cache import catalog_response
 
 
 class ScenarioViewSet(viewsets.ModelViewSet):
@@ -652,20 +828,22 @@ class ScenarioViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def active(self, request):
         """Lista todos los escenarios activos."""
-        scenarios = Scenario.objects.filter(is_active=True).order_by('difficulty_level')
-        return Response(ScenarioSerializer(scenarios, many=True).data)
+        def build():
+            scenarios = Scenario.objects.filter(is_active=True).order_by('difficulty_level')
+            return ScenarioSerializer(scenarios, many=True).data
+        return catalog_response(request, 'scenarios', build, variant='active')
 
     @action(detail=False, methods=['get'])
     def by_difficulty(self, request):
         """Lista escenarios agrupados por dificultad."""
-        scenarios = Scenario.objects.filter(is_active=True).order_by('difficulty_level')
-        result = {}
-        for s in scenarios:
-            level = f"level_{s.difficulty_level}"
-            if level not in result:
-                result[level] = []
-            result[level].append(ScenarioSerializer(s).data)
-        return Response(result)
+        def build():
+            scenarios = Scenario.objects.filter(is_active=True).order_by('difficulty_level')
+            # Un único ListSerializer para todo el listado; luego se agrupa en memoria
+            result = {}
+            for item in ScenarioSerializer(scenarios, many=True).data:
+                result.setdefault(f"level_{item['difficulty_level']}", []).append(item)
+            return result
+        return catalog_response(request, 'scenarios', build, variant='by_difficulty')
 
 
 class GameSessionViewSet(viewsets.ModelViewSet):
@@ -682,11 +860,24 @@ class GameSessionViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def my_sessions(self, request):
-        """Lista las sesiones del usuario autenticado."""
+        """Lista las sesiones del usuario autenticado.
+
+        Con ``limit``/``cursor`` devuelve ``{'results': [...], 'next_cursor': ...}``.
+        """
         if not request.user.is_authenticated:
             return Response({'error': 'Autenticación requerida'}, status=401)
         
-        sessions = GameSession.objects.filter(user=request.user).order_by('-started_at')
+        sessions = GameSession.objects.filter(user=request.user)
+        if pagination.is_requested(request):
+            try:
+                page, next_cursor = pagination.paginate(sessions, request, SESSION_ORDERING)
+            except pagination.InvalidCursor as e:
+                return Response({'error': str(e)}, status=400)
+            return Response({
+                'results': GameSessionSerializer(page, many=True).data,
+                'next_cursor': next_cursor,
+            })
+        sessions = sessions.order_by(*SESSION_ORDERING)
         return Response(GameSessionSerializer(sessions, many=True).data)
 
     @action(detail=False, methods=['get'])
@@ -737,6 +928,12 @@ class GameSessionViewSet(viewsets.ModelViewSet):
 
 
 class ChatMessageViewSet(viewsets.ModelViewSet):
+    """CRUD de ``chat_message``: solo cubre los transcripts vivos.
+
+    Los mensajes que ``archive_transcripts`` pasó a ``chat_transcript_archive``
+    ya no están en la tabla y no aparecen aquí. El transcript completo de una
+    sesión, archivada o no, se lee con ``session/<id>/messages/``.
+    """
     queryset = ChatMessage.objects.all().order_by('sent_at')
     serializer_class = ChatMessageSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -0,0 +1 @@
+# Tasks App - trabajo en segundo plano (créditos, estadísticas, riesgo)
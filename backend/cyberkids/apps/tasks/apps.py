@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class TasksConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.tasks'
+    verbose_name = 'Background Tasks'
+
+    def ready(self):
+        # Registra los handlers definidos en el módulo tasks.py de cada app
+        from django.utils.module_loading import autodiscover_modules
+        autodiscover_modules('tasks')
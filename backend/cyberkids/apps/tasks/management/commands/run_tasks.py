@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.tasks.runner import run_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker de la cola de tareas: ejecuta las tareas pendientes (créditos, "
+        "transacciones, estadísticas...) con reintentos. Se pueden lanzar varios "
+        "workers a la vez en PostgreSQL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50, help="Tareas tomadas por vuelta")
+        parser.add_argument("--poll-interval", type=float, default=1.0,
+                            help="Segundos de espera cuando la cola está vacía")
+        parser.add_argument("--once", action="store_true", help="Procesar lo pendiente y salir")
+
+    def handle(self, *args, **options):
+        total_done = total_failed = 0
+        try:
+            while True:
+                done, failed = run_pending(options["batch_size"])
+                total_done += done
+                total_failed += failed
+                if done or failed:
+                    self.stdout.write(f"{done} tareas ejecutadas, {failed} con error")
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"Total: {total_done} ejecutadas, {total_failed} con error"))
@@ -0,0 +1,41 @@
+from django.db import models
+from django.utils import timezone
+
+
+class BackgroundTask(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    task_id = models.AutoField(primary_key=True)
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    # Evita encolar dos veces el mismo trabajo (p.ej. premiar dos veces una sesión)
+    idempotency_key = models.CharField(max_length=200, unique=True, null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'background_task'
+        indexes = [
+            # Cola de trabajo: solo las pendientes, en orden de ejecución
+            models.Index(
+                fields=['run_after', 'task_id'], condition=models.Q(status='pending'),
+                name='background_task_pending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.task_id} ({self.status})"
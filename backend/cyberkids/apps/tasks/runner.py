@@ -0,0 +1,140 @@
+"""
+Cola de tareas en base de datos para el trabajo que no afecta a la respuesta
+(acreditar cybercreds, escribir transacciones, estadísticas, riesgo...).
+
+Cada app declara sus handlers en su módulo ``tasks.py`` con ``@task('nombre')``
+y los encola con ``enqueue('nombre', {...})``. La fila de la tarea se escribe
+en la misma transacción que la petición, así que si la petición hace rollback
+la tarea tampoco existe. El comando ``run_tasks`` las ejecuta con reintentos
+y backoff exponencial. Con ``TASKS_ALWAYS_EAGER`` (solo en los tests por
+defecto) se ejecutan en el momento, salvo las que llevan ``delay``: esas se
+quedan siempre pendientes para el worker.
+
+Los handlers deben ser idempotentes: una tarea puede reintentarse después de
+haber hecho parte del trabajo si el worker muere a mitad.
+"""
+
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from .models import BackgroundTask
+
+logger = logging.getLogger(__name__)
+
+REGISTRY = {}
+
+
+def task(name, max_attempts=5):
+    """Registra ``func(**payload)`` como handler de las tareas ``name``."""
+    def decorator(func):
+        REGISTRY[name] = (func, max_attempts)
+        return func
+    return decorator
+
+
+def enqueue(name, payload=None, idempotency_key=None, delay=0):
+    """Encola una tarea y la devuelve.
+
+    Si ya existe una con la misma ``idempotency_key`` no se crea otra y se
+    devuelve la existente. Una tarea con ``delay`` nunca se ejecuta en el
+    momento, aunque ``TASKS_ALWAYS_EAGER`` esté activo.
+    """
+    if name not in REGISTRY:
+        raise KeyError(f'Tarea no registrada: {name}')
+    _, max_attempts = REGISTRY[name]
+    fields = {
+        'name': name,
+        'payload': payload or {},
+        'max_attempts': max_attempts,
+        'run_after': timezone.now() + timedelta(seconds=delay),
+    }
+    if idempotency_key:
+        try:
+            with transaction.atomic():
+                bg_task = BackgroundTask.objects.create(idempotency_key=idempotency_key, **fields)
+        except IntegrityError:
+            return BackgroundTask.objects.get(idempotency_key=idempotency_key)
+    else:
+        bg_task = BackgroundTask.objects.create(**fields)
+
+    if getattr(settings, 'TASKS_ALWAYS_EAGER', False) and delay <= 0:
+        run_task(bg_task)
+    return bg_task
+
+
+def _backoff(attempts):
+    base = getattr(settings, 'TASKS_RETRY_BASE_SECONDS', 5)
+    return min(base * 2 ** (attempts - 1), 3600)
+
+
+def run_task(bg_task):
+    """Ejecuta una tarea y guarda su nuevo estado. Devuelve True si terminó bien."""
+    handler = REGISTRY.get(bg_task.name)
+    bg_task.attempts += 1
+    try:
+        if handler is None:
+            raise LookupError(f'Tarea no registrada: {bg_task.name}')
+        with transaction.atomic():
+            handler[0](**bg_task.payload)
+    except Exception:
+        bg_task.last_error = traceback.format_exc(limit=5)
+        if bg_task.attempts >= bg_task.max_attempts:
+            bg_task.status = BackgroundTask.STATUS_FAILED
+            logger.error('Task failed permanently', extra={'fields': {
+                'task_id': bg_task.task_id, 'task': bg_task.name, 'attempts': bg_task.attempts,
+            }})
+        else:
+            bg_task.status = BackgroundTask.STATUS_PENDING
+            bg_task.run_after = timezone.now() + timedelta(seconds=_backoff(bg_task.attempts))
+            logger.warning('Task failed, will retry', extra={'fields': {
+                'task_id': bg_task.task_id, 'task': bg_task.name, 'attempts': bg_task.attempts,
+            }})
+        ok = False
+    else:
+        bg_task.status = BackgroundTask.STATUS_DONE
+        bg_task.last_error = None
+        ok = True
+    bg_task.save(update_fields=['status', 'attempts', 'run_after', 'last_error', 'updated_at'])
+    return ok
+
+
+def claim(limit=50):
+    """Marca como ``running`` y devuelve hasta ``limit`` tareas listas para ejecutarse.
+
+    En PostgreSQL usa ``SKIP LOCKED`` para que varios workers no tomen las
+    mismas filas. Las tareas que llevan demasiado en ``running`` (worker
+    caído) vuelven a la cola.
+    """
+    now = timezone.now()
+    timeout = getattr(settings, 'TASKS_RUNNING_TIMEOUT', 600)
+    BackgroundTask.objects.filter(
+        status=BackgroundTask.STATUS_RUNNING, updated_at__lt=now - timedelta(seconds=timeout),
+    ).update(status=BackgroundTask.STATUS_PENDING)
+
+    with transaction.atomic():
+        queryset = BackgroundTask.objects.filter(
+            status=BackgroundTask.STATUS_PENDING, run_after__lte=now,
+        ).order_by('run_after', 'task_id')
+        if connection.features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+        tasks = list(queryset[:limit])
+        BackgroundTask.objects.filter(pk__in=[t.task_id for t in tasks]).update(
+            status=BackgroundTask.STATUS_RUNNING, updated_at=now,
+        )
+    return tasks
+
+
+def run_pending(limit=50):
+    """Ejecuta un lote de tareas pendientes. Devuelve ``(ejecutadas, fallidas)``."""
+    done = failed = 0
+    for bg_task in claim(limit):
+        if run_task(bg_task):
+            done += 1
+        else:
+            failed += 1
+    return done, failed
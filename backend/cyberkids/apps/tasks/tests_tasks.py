@@ -0,0 +1,68 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.cyberUser.models import CyberUser
+from apps.progression.models import CreditTransaction
+from apps.simulation.models import GameSession, Scenario
+from apps.tasks.models import BackgroundTask
+from apps.tasks.runner import enqueue, run_pending, task
+
+calls = []
+
+
+@task('tests.flaky', max_attempts=2)
+def flaky(value):
+    calls.append(value)
+    raise RuntimeError('falla siempre')
+
+
+@override_settings(TASKS_ALWAYS_EAGER=False)
+class TaskRunnerTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_idempotency_key_enqueues_once(self):
+        first = enqueue('tests.flaky', {'value': 1}, idempotency_key='k1')
+        second = enqueue('tests.flaky', {'value': 2}, idempotency_key='k1')
+        self.assertEqual(first.task_id, second.task_id)
+        self.assertEqual(BackgroundTask.objects.count(), 1)
+
+    def test_failed_task_is_retried_with_backoff_then_marked_failed(self):
+        bg_task = enqueue('tests.flaky', {'value': 1})
+        self.assertEqual(run_pending(), (0, 1))
+        bg_task.refresh_from_db()
+        self.assertEqual(bg_task.status, BackgroundTask.STATUS_PENDING)
+        self.assertGreater(bg_task.run_after, timezone.now())
+        self.assertIn('falla siempre', bg_task.last_error)
+
+        # Aún no toca reintentar
+        self.assertEqual(run_pending(), (0, 0))
+        later = timezone.now() + timedelta(hours=2)
+        with patch('apps.tasks.runner.timezone.now', return_value=later):
+            self.assertEqual(run_pending(), (0, 1))
+        bg_task.refresh_from_db()
+        self.assertEqual(bg_task.status, BackgroundTask.STATUS_FAILED)
+        self.assertEqual(calls, [1, 1])
+
+    @override_settings(TASKS_ALWAYS_EAGER=True)
+    def test_delayed_task_is_never_run_inline(self):
+        bg_task = enqueue('tests.flaky', {'value': 1}, delay=60)
+        self.assertEqual(calls, [])
+        bg_task.refresh_from_db()
+        self.assertEqual((bg_task.status, bg_task.attempts), (BackgroundTask.STATUS_PENDING, 0))
+
+    @override_settings(TASKS_ALWAYS_EAGER=True)
+    def test_award_session_points_is_idempotent(self):
+        user = CyberUser.objects.create(username='ganador', email='g@example.com', password='x', avatar='g.jpg')
+        scenario = Scenario.objects.create(name='s', antagonist_goal='g', difficulty_level=1, base_points=30, is_active=True)
+        session = GameSession.objects.create(user=user, scenario=scenario, points_earned=30, outcome='won')
+
+        enqueue('simulation.award_session_points', {'session_id': session.session_id})
+        enqueue('simulation.award_session_points', {'session_id': session.session_id})
+
+        user.refresh_from_db()
+        self.assertEqual(user.cybercreds, 30)
+        self.assertEqual(CreditTransaction.objects.filter(reference_type='game_session').count(), 1)
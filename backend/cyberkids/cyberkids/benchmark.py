@@ -0,0 +1,431 @@
+"""
+Banco de pruebas de rendimiento de la API.
+
+``seed_dataset`` crea un conjunto de datos realista que cubre las seis apps
+(usuarios, sesiones de simulación con sus mensajes, minijuegos, tienda,
+transacciones, onboarding...) usando ``bulk_create``. ``run_endpoints`` recorre
+los endpoints públicos de ``ENDPOINTS`` con un usuario autenticado por JWT y
+mide, para cada uno, el número de consultas SQL y el tiempo de respuesta,
+comparándolos con su presupuesto.
+
+Lo usan el comando ``benchmark_api`` (dataset grande, SQLite o PostgreSQL) y
+``apps/cyberUser/tests_benchmark.py`` (dataset pequeño, solo consultas).
+"""
+
+import random
+import statistics
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, models, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+from cyberkids.catalog_cache import clear_catalog_cache, get_catalog_versions, tracked_catalogs
+
+DEFAULT_SCALE = {
+    'users': 2000,
+    'sessions_per_user': 3,
+    'messages_per_session': 8,
+    'transactions_per_user': 5,
+    'minigame_sessions_per_user': 2,
+    'responses_per_minigame_session': 5,
+    # El usuario medido tiene un historial largo para destapar consultas N+1
+    'bench_user_sessions': 60,
+}
+
+SMALL_SCALE = {
+    'users': 20,
+    'sessions_per_user': 3,
+    'messages_per_session': 6,
+    'transactions_per_user': 4,
+    'minigame_sessions_per_user': 2,
+    'responses_per_minigame_session': 3,
+    'bench_user_sessions': 25,
+}
+
+# Presupuesto de tiempo por defecto (ms) cuando el endpoint no define uno propio
+DEFAULT_TIME_BUDGET_MS = 300
+
+LLM_STUB_RESPONSE = {
+    'reply': 'Hola, ¿me cuentas algo de ti?',
+    'analysis': {
+        'has_disclosure': False,
+        'disclosure_reason': '',
+        'is_attack_attempt': False,
+        'is_user_evasion': False,
+        'force_end_session': False,
+    },
+}
+
+# (nombre, método, ruta, cuerpo, máximo de consultas[, máximo de ms])
+# Las rutas admiten los marcadores que devuelve ``seed_dataset``.
+ENDPOINTS = [
+    # cyberUser
+    ('users.me', 'GET', '/api/users/auth/me/', None, 1),
+    ('users.dashboard', 'GET', '/api/users/auth/dashboard/', None, 15),
+    ('users.preferences', 'GET', '/api/users/auth/me/preferences/', None, 2),
+    ('users.countries', 'GET', '/api/users/countries/', None, 4),
+    # simulation
+    ('simulation.scenarios', 'GET', '/api/simulation/scenarios/', None, 3),
+    ('simulation.scenarios_active', 'GET', '/api/simulation/scenarios/active/', None, 3),
+    ('simulation.scenarios_by_difficulty', 'GET', '/api/simulation/scenarios/by_difficulty/', None, 3),
+    ('simulation.my_sessions', 'GET', '/api/simulation/game-sessions/my_sessions/', None, 2),
+    ('simulation.my_sessions_page', 'GET', '/api/simulation/game-sessions/my_sessions/?limit=20', None, 2),
+    ('simulation.my_stats', 'GET', '/api/simulation/game-sessions/my_stats/', None, 6),
+    ('simulation.history', 'GET', '/api/simulation/game-sessions/history/', None, 22),
+    ('simulation.resume', 'GET', '/api/simulation/session/resume/', None, 3),
+    ('simulation.resume_or_start', 'POST', '/api/simulation/session/resume-or-start/', {}, 4),
+    ('simulation.session_messages', 'GET', '/api/simulation/session/{session_id}/messages/', None, 5),
+    ('simulation.session_messages_page', 'GET', '/api/simulation/session/{session_id}/messages/?limit=20', None, 5),
+    ('simulation.start_with_role', 'POST', '/api/simulation/session/start-role/', {}, 11, 500),
+    ('simulation.chat', 'POST', '/api/simulation/chat/', {'message': 'hola, ¿quién eres?'}, 10, 500),
+    # pets
+    ('pets.list', 'GET', '/api/pets/pets/', None, 4),
+    ('pets.shop', 'GET', '/api/pets/pets/shop/', None, 4),
+    ('pets.default', 'GET', '/api/pets/pets/default/', None, 3),
+    ('pets.equipped', 'GET', '/api/pets/user-pets/equipped/{user_id}/', None, 2),
+    ('pets.bundle', 'GET', '/api/pets/user-pets/my-bundle/', None, 5),
+    # minigames
+    ('minigames.active', 'GET', '/api/minigames/games/active/', None, 4),
+    ('minigames.questions', 'GET', '/api/minigames/games/{minigame_id}/questions/', None, 3),
+    ('minigames.my_sessions', 'GET', '/api/minigames/sessions/my_sessions/', None, 3),
+    ('minigames.my_sessions_page', 'GET', '/api/minigames/sessions/my_sessions/?limit=20', None, 3),
+    ('minigames.sessions', 'GET', '/api/minigames/sessions/?user_id={user_id}', None, 4),
+    ('minigames.history', 'GET', '/api/minigames/sessions/history/', None, 2),
+    ('minigames.my_stats', 'GET', '/api/minigames/sessions/my_stats/', None, 2),
+    # progression
+    ('progression.levels', 'GET', '/api/progression/levels/', None, 3),
+    ('progression.cosmetics_shop', 'GET', '/api/progression/cosmetics/shop/', None, 3),
+    ('progression.shop_all', 'GET', '/api/progression/shop/all/', None, 5),
+    ('progression.my_purchases', 'GET', '/api/progression/shop/my-purchases/', None, 3),
+    ('progression.my_transactions', 'GET', '/api/progression/transactions/my_transactions/', None, 2),
+    ('progression.my_balance', 'GET', '/api/progression/transactions/my_balance/', None, 3),
+    ('progression.my_progress', 'GET', '/api/progression/progress/my_progress/', None, 3),
+    ('progression.leaderboard', 'GET', '/api/progression/progress/leaderboard/', None, 2),
+    ('progression.leaderboard_cybercreds', 'GET', '/api/progression/progress/leaderboard_cybercreds/', None, 2),
+    ('progression.my_rank', 'GET', '/api/progression/progress/my_rank/', None, 6),
+    # onboarding
+    ('onboarding.questions_active', 'GET', '/api/onboarding/questions/active/', None, 4),
+    ('onboarding.my_responses', 'GET', '/api/onboarding/responses/my-responses/', None, 2),
+    ('onboarding.my_status', 'GET', '/api/onboarding/responses/my-status/', None, 3),
+    ('onboarding.calculate_my_risk', 'POST', '/api/onboarding/responses/calculate-my-risk/', {}, 10),
+]
+
+
+def _spread(rng, now, days):
+    return now - timedelta(days=rng.uniform(0, days), seconds=rng.randint(0, 86400))
+
+
+@transaction.atomic
+def seed_dataset(scale=None, seed=42):
+    """Crea el dataset de benchmark y devuelve el contexto para formatear las rutas."""
+    from apps.cyberUser.models import Country, CyberUser, Preferences, RiskLevel
+    from apps.minigames.models import Minigame, MinigameSession, SwipeQuestion, SwipeResponse
+    from apps.onboarding.models import AnswerOption, OnboardingQuestion, OnboardingResponse, UserStatistic
+    from apps.pets.models import Pet, PetState, UserPet
+    from apps.progression.models import CosmeticItem, CreditTransaction, ProgressionLevel, UserInventory, UserProgress
+    from apps.simulation.models import ChatMessage, GameSession, Scenario, ScenarioProgress, SensitivePattern
+
+    scale = {**DEFAULT_SCALE, **(scale or {})}
+    rng = random.Random(seed)
+    now = timezone.now()
+    batch = 1000
+
+    # Catálogos
+    countries = Country.objects.bulk_create([
+        Country(name=f'País {i}', iso_code=f'C{i}', language='es') for i in range(10)
+    ])
+    for name, multiplier in (('Low', 1.0), ('Medium', 1.5), ('High', 2.0)):
+        RiskLevel.objects.create(name=name, description=name, ai_difficult=1, points_multiplier=multiplier)
+    scenarios = Scenario.objects.bulk_create([
+        Scenario(name=f'Escenario {i}', description='Escenario de benchmark', antagonist_goal='número de teléfono',
+                 difficulty_level=i % 4 + 1, base_points=50 + 25 * i, threat_type='social_engineering')
+        for i in range(6)
+    ])
+    SensitivePattern.objects.bulk_create([
+        SensitivePattern(name='Teléfono', regex_pattern=r'\b\d{9}\b', data_type='phone', severity=3),
+        SensitivePattern(name='Email', regex_pattern=r'[\w.+-]+@[\w-]+\.[\w.]+', data_type='email', severity=2),
+        SensitivePattern(name='Contraseña', regex_pattern=r'(?i)contraseña\s*:?\s*\S+', data_type='password', severity=3),
+    ])
+    pets = Pet.objects.bulk_create([
+        Pet(name=f'Mascota {i}', base_sprite=f'pets/sprites/pet{i}.png', cybercreds_cost=100 * i, is_default=(i == 0))
+        for i in range(6)
+    ])
+    PetState.objects.bulk_create([
+        PetState(pet=pet, state_name=state, svg=f'pets/states/{pet.pet_id}_{state}.svg', duration_ms=500)
+        for pet in pets for state in ('Idle', 'Thinking', 'Success', 'Error')
+    ])
+    cosmetics = CosmeticItem.objects.bulk_create([
+        CosmeticItem(name=f'Cosmético {i}', type=('frame', 'background', 'audio')[i % 3],
+                     image=f'cosmetic_items/item{i}.png', cybercreds_cost=40 * (i + 1))
+        for i in range(12)
+    ])
+    levels = ProgressionLevel.objects.bulk_create([
+        ProgressionLevel(level_number=i + 1, name=f'Nivel {i + 1}', required_xp=i * 100, cybercreds_reward=10 * i)
+        for i in range(10)
+    ])
+    minigames = Minigame.objects.bulk_create([
+        Minigame(name=f'Minijuego {i}', type='swipe', base_points=10) for i in range(3)
+    ])
+    swipe_questions = SwipeQuestion.objects.bulk_create([
+        SwipeQuestion(minigame=minigame, notification_content=f'Notificación {j}',
+                      correct_answer=('Safe', 'Dangerous')[j % 2], difficulty_level=j % 3 + 1)
+        for minigame in minigames for j in range(30)
+    ])
+    questions = OnboardingQuestion.objects.bulk_create([
+        OnboardingQuestion(content=f'Pregunta {i}', response_type='multiple_choice', risk_weight=i % 3 + 1,
+                           display_order=i)
+        for i in range(10)
+    ])
+    options = AnswerOption.objects.bulk_create([
+        AnswerOption(question=question, content=f'Opción {j}', risk_value=j + 1, display_order=j)
+        for question in questions for j in range(4)
+    ])
+    options_by_question = {}
+    for option in options:
+        options_by_question.setdefault(option.question_id, []).append(option)
+
+    # Usuarios
+    password = make_password('benchmark')
+    preferences = Preferences.objects.bulk_create([Preferences() for _ in range(scale['users'])], batch_size=batch)
+    # CyberUser redefine ``pk`` como propiedad de solo lectura y bulk_create
+    # necesita asignarla, así que los usuarios se insertan uno a uno.
+    users = []
+    for i, prefs in enumerate(preferences):
+        user = CyberUser(username=f'user{i}', email=f'user{i}@bench.local', password=password,
+                         avatar='avatars/default', cybercreds=rng.randint(0, 2000), preferences=prefs,
+                         country=rng.choice(countries))
+        user.save()
+        users.append(user)
+
+    UserPet.objects.bulk_create([
+        UserPet(user=user, pet=pet, is_equipped=(pet.is_default))
+        for user in users for pet in pets[:2]
+    ], batch_size=batch)
+    UserInventory.objects.bulk_create([
+        UserInventory(user=user, item=item) for user in users for item in rng.sample(cosmetics, 2)
+    ], batch_size=batch)
+    UserProgress.objects.bulk_create([
+        UserProgress(user=user, current_level=rng.choice(levels), current_xp=rng.randint(0, 1000),
+                     games_played=rng.randint(0, 50), games_won=rng.randint(0, 20))
+        for user in users
+    ], batch_size=batch)
+
+    # Simulación
+    sessions = []
+    for user in users:
+        count = scale['bench_user_sessions'] if user is users[0] else scale['sessions_per_user']
+        for k in range(count):
+            finished = k < count - 1
+            outcome = rng.choice(('won', 'failed')) if finished else None
+            scenario = rng.choice(scenarios)
+            sessions.append(GameSession(
+                user=user, scenario=scenario, outcome=outcome,
+                is_game_over=None if not finished else outcome == 'failed',
+                points_earned=scenario.base_points if outcome == 'won' else 0,
+                points_awarded=outcome == 'won', antagonist_attempts=rng.randint(0, 3),
+                scenario_snapshot={'id': scenario.scenario_id, 'antagonist_goal': scenario.antagonist_goal,
+                                   'difficulty': scenario.difficulty_level, 'base_points': scenario.base_points},
+            ))
+    sessions = GameSession.objects.bulk_create(sessions, batch_size=batch)
+    for session in sessions:
+        session.started_at = _spread(rng, now, 180)
+        session.ended_at = session.started_at + timedelta(minutes=5) if session.outcome else None
+    GameSession.objects.bulk_update(sessions, ['started_at', 'ended_at'], batch_size=batch)
+
+    completed = {}
+    for session in sessions:
+        if session.outcome == 'won':
+            completed[session.user_id] = completed.get(session.user_id, 0) | (1 << session.scenario_id)
+    ScenarioProgress.objects.bulk_create(
+        [ScenarioProgress(user_id=user_id, completed=format(bits, 'x')) for user_id, bits in completed.items()],
+        batch_size=batch,
+    )
+
+    messages, sent_at = [], []
+    for session in sessions:
+        for m in range(scale['messages_per_session']):
+            messages.append(ChatMessage(
+                session=session, role=('antagonist', 'user')[m % 2],
+                content=f'Mensaje {m} de la sesión {session.session_id}',
+            ))
+            sent_at.append(session.started_at + timedelta(seconds=20 * m))
+    # auto_now_add pisa las fechas en bulk_create; se corrigen después
+    messages = ChatMessage.objects.bulk_create(messages, batch_size=batch)
+    for message, when in zip(messages, sent_at):
+        message.sent_at = when
+    ChatMessage.objects.bulk_update(messages, ['sent_at'], batch_size=batch)
+
+    # Minijuegos
+    mg_sessions = MinigameSession.objects.bulk_create([
+        MinigameSession(user=user, minigame=rng.choice(minigames), points_earned=rng.randint(0, 100),
+                        correct_answers=rng.randint(0, 10), incorrect_answers=rng.randint(0, 10),
+                        time_spent_sec=rng.randint(30, 300))
+        for user in users for _ in range(scale['minigame_sessions_per_user'])
+    ], batch_size=batch)
+    for mg_session in mg_sessions:
+        mg_session.played_at = _spread(rng, now, 180)
+    MinigameSession.objects.bulk_update(mg_sessions, ['played_at'], batch_size=batch)
+    questions_by_minigame = {}
+    for question in swipe_questions:
+        questions_by_minigame.setdefault(question.minigame_id, []).append(question)
+    SwipeResponse.objects.bulk_create([
+        SwipeResponse(minigame_session=mg_session, question=question, user_answer='Safe',
+                      is_correct=question.correct_answer == 'Safe', response_time_ms=rng.randint(300, 4000))
+        for mg_session in mg_sessions
+        for question in rng.sample(questions_by_minigame[mg_session.minigame_id],
+                                   scale['responses_per_minigame_session'])
+    ], batch_size=batch)
+
+    # Economía
+    transactions = CreditTransaction.objects.bulk_create([
+        CreditTransaction(user=user, amount=rng.choice((50, 75, 100, -40, -80)),
+                          transaction_type=rng.choice(('game', 'minigame', 'purchase', 'bonus')),
+                          description='Transacción de benchmark')
+        for user in users for _ in range(scale['transactions_per_user'])
+    ], batch_size=batch)
+    for tx in transactions:
+        tx.created_at = _spread(rng, now, 365)
+    CreditTransaction.objects.bulk_update(transactions, ['created_at'], batch_size=batch)
+
+    # Onboarding
+    OnboardingResponse.objects.bulk_create([
+        OnboardingResponse(user=user, question=question, option=rng.choice(options_by_question[question.question_id]))
+        for user in users for question in questions
+    ], batch_size=batch)
+    UserStatistic.objects.bulk_create([
+        UserStatistic(user=user, metric='onboarding_risk_score', value=rng.uniform(0, 100)) for user in users
+    ], batch_size=batch)
+
+    bench_user = users[0]
+    bench_session = next(s for s in sessions if s.user_id == bench_user.user_id)
+    return {
+        'user': bench_user,
+        'user_id': bench_user.user_id,
+        'session_id': bench_session.session_id,
+        'minigame_id': minigames[0].minigame_id,
+        'pet_id': pets[1].pet_id,
+    }
+
+
+def run_endpoints(context, repeat=3, endpoints=None):
+    """Llama a cada endpoint ``repeat`` veces y devuelve una fila de resultados por endpoint.
+
+    Las consultas y el estado son los de la peor llamada (un error en
+    cualquier repetición cuenta) y el tiempo es la mediana de las llamadas. Los sellos de
+    versión se crean antes, como en un despliegue que ya está en marcha.
+    """
+    from apps.cyberUser.views import generate_tokens_for_cyberuser
+
+    token = generate_tokens_for_cyberuser(context['user'])['access']
+    client = Client(raise_request_exception=False, HTTP_AUTHORIZATION=f'Bearer {token}')
+    clear_catalog_cache()
+    get_catalog_versions(tracked_catalogs())
+
+    results = []
+    # Los presupuestos son los del proceso web con el worker desplegado (tareas en cola)
+    with patch('apps.simulation.views._call_llm_backend', return_value=LLM_STUB_RESPONSE), \
+            override_settings(TASKS_ALWAYS_EAGER=False):
+        for endpoint in endpoints or ENDPOINTS:
+            name, method, path, data, max_queries = endpoint[:5]
+            max_ms = endpoint[5] if len(endpoint) > 5 else DEFAULT_TIME_BUDGET_MS
+            url = path.format(**context)
+            timings, queries, status = [], 0, 0
+            for _ in range(repeat):
+                with CaptureQueriesContext(connection) as ctx:
+                    start = time.perf_counter()
+                    if method == 'GET':
+                        response = client.get(url)
+                    else:
+                        response = client.post(url, data or {}, content_type='application/json')
+                    timings.append((time.perf_counter() - start) * 1000)
+                queries = max(queries, len(ctx.captured_queries))
+                status = max(status, response.status_code)
+            elapsed = statistics.median(timings)
+            results.append({
+                'name': name,
+                'url': url,
+                'status': status,
+                'queries': queries,
+                'max_queries': max_queries,
+                'ms': elapsed,
+                'max_ms': max_ms,
+                'queries_ok': queries <= max_queries,
+                'time_ok': elapsed <= max_ms,
+                'status_ok': status < 400,
+            })
+    return results
+
+
+def _hot_queries(context):
+    """Filtros calientes y los índices que los sirven: (nombre, queryset, [(modelo, índice)])."""
+    from apps.minigames.models import MinigameSession
+    from apps.pets.models import UserPet
+    from apps.progression.models import CreditTransaction, UserInventory
+    from apps.simulation.models import ChatMessage, GameSession
+
+    user_id = context['user_id']
+    return [
+        ('sesión activa (chat, resume)',
+         GameSession.objects.filter(user_id=user_id, is_game_over__isnull=True).order_by('-started_at')[:1],
+         [(GameSession, 'game_session_active_idx')]),
+        ('escenarios ganados',
+         GameSession.objects.filter(user_id=user_id, outcome='won').values('scenario_id'),
+         [(GameSession, 'game_session_user_outcome_idx')]),
+        ('mensajes de una sesión',
+         ChatMessage.objects.filter(session_id=context['session_id']).order_by('sent_at', 'message_id')[:50],
+         [(ChatMessage, 'chat_message_session_page_idx')]),
+        ('transacciones recientes',
+         CreditTransaction.objects.filter(user_id=user_id).order_by('-created_at')[:50],
+         [(CreditTransaction, 'credit_tx_user_created_idx')]),
+        ('sesiones de minijuego recientes',
+         MinigameSession.objects.filter(user_id=user_id).order_by('-played_at', '-minigame_session_id')[:20],
+         [(MinigameSession, 'minigame_session_user_hist_idx')]),
+        ('mascota equipada',
+         UserPet.objects.filter(user_id=user_id, is_equipped=True),
+         [(UserPet, 'user_pet_one_equipped')]),
+        ('cosméticos equipados',
+         UserInventory.objects.filter(user_id=user_id, is_equipped=True),
+         [(UserInventory, 'user_inventory_one_equipped_per_slot')]),
+    ]
+
+
+def explain_hot_queries(context):
+    """Plan de cada filtro caliente con y sin sus índices compuestos/parciales.
+
+    Borra temporalmente los índices (solo tiene sentido en la base de pruebas
+    que crea ``benchmark_api``) y los vuelve a crear al terminar. Devuelve una
+    lista de ``(nombre, plan_con_índices, plan_sin_índices)``.
+    """
+    queries = _hot_queries(context)
+    after = [queryset.explain() for _, queryset, _ in queries]
+
+    # Índices o restricciones únicas parciales (también crean un índice)
+    indexes = []
+    for _, _, used in queries:
+        for model, index_name in used:
+            index = next(i for i in (*model._meta.indexes, *model._meta.constraints) if i.name == index_name)
+            indexes.append((model, index))
+
+    with connection.schema_editor() as editor:
+        for model, index in indexes:
+            if isinstance(index, models.Index):
+                editor.remove_index(model, index)
+            else:
+                editor.remove_constraint(model, index)
+    try:
+        before = [queryset.explain() for _, queryset, _ in queries]
+    finally:
+        with connection.schema_editor() as editor:
+            for model, index in indexes:
+                if isinstance(index, models.Index):
+                    editor.add_index(model, index)
+                else:
+                    editor.add_constraint(model, index)
+
+    return [(name, plan_after, plan_before)
+            for (name, _, _), plan_after, plan_before in zip(queries, after, before)]
@@ -0,0 +1,182 @@
+"""
+Caché de catálogos de solo lectura (minijuegos, escenarios, tienda, mascotas,
+preguntas de onboarding y países).
+
+Cada catálogo tiene un sello de versión guardado en el caché de Django
+(``CACHES``, compartido entre la web y el worker), que se renueva en cada
+``save``/``delete`` de los modelos registrados con ``track_catalog``. Las
+respuestas se guardan ya serializadas (bytes JSON) en memoria del proceso,
+junto con su ETag, y se invalidan solas cuando cambia la versión. Las
+peticiones condicionales (If-None-Match / If-Modified-Since) reciben un 304
+con una sola lectura del caché (la de los sellos).
+
+El ETag es la validación fiable. ``Last-Modified`` tiene resolución de un
+segundo, así que solo se envía cuando el sello tiene al menos un segundo: si
+no, otro cambio en ese mismo segundo daría un 304 viejo a quien solo manda
+If-Modified-Since.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.renderers import JSONRenderer
+
+from cyberkids.timing import span
+
+VERSION_KEY = 'catalog:version:{}'
+
+_entries = OrderedDict()
+_tracked = set()
+_lock = threading.Lock()
+_renderer = JSONRenderer()
+
+
+def _max_entries():
+    return getattr(settings, 'CATALOG_CACHE_MAX_ENTRIES', 256)
+
+
+def get_catalog_versions(names):
+    """Devuelve los sellos de versión (timestamps) de ``names`` con una sola lectura del caché.
+
+    Los sellos que aún no existen se crean con ``add`` para que, si otro
+    proceso se adelanta, todos acaben usando el mismo.
+    """
+    keys = [VERSION_KEY.format(name) for name in names]
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        now = time.time()
+        for key in missing:
+            cache.add(key, now, None)
+        found.update(cache.get_many(missing))
+    return tuple(found[key] for key in keys)
+
+
+def get_catalog_version(name):
+    """Devuelve el sello de versión (timestamp) del catálogo, creándolo si no existe."""
+    return get_catalog_versions((name,))[0]
+
+
+def bump_catalog(name):
+    """Invalida el catálogo asignándole una versión nueva."""
+    cache.set(VERSION_KEY.format(name), time.time(), None)
+
+
+def tracked_catalogs():
+    """Nombres de los catálogos registrados con ``track_catalog``."""
+    return tuple(sorted(_tracked))
+
+
+def clear_catalog_cache():
+    """Vacía las respuestas guardadas en memoria de este proceso."""
+    with _lock:
+        _entries.clear()
+
+
+class CatalogMemo:
+    """Valor derivado de un catálogo (p.ej. regex compiladas) guardado en memoria del proceso.
+
+    Se recalcula con ``load()`` cuando cambia la versión compartida del
+    catálogo y, en cualquier caso, pasados ``CATALOG_MEMO_TTL`` segundos: así
+    los cambios que no disparan señales (``QuerySet.update``, SQL a mano) se
+    ven como mucho con ese retraso.
+    """
+
+    def __init__(self, catalog, load):
+        self.catalog = catalog
+        self.load = load
+        self._lock = threading.Lock()
+        self._cached = (None, 0.0, None)
+
+    def get(self):
+        version = get_catalog_version(self.catalog)
+        cached_version, loaded_at, value = self._cached
+        ttl = getattr(settings, 'CATALOG_MEMO_TTL', 60)
+        if cached_version == version and time.monotonic() - loaded_at < ttl:
+            return value
+
+        value = self.load()
+        with self._lock:
+            self._cached = (version, time.monotonic(), value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._cached = (None, 0.0, None)
+
+
+def track_catalog(name, *models):
+    """Renueva la versión de ``name`` cada vez que se guarda o borra uno de ``models``.
+
+    Se invalida en el momento y otra vez al confirmar la transacción, para que
+    una lectura concurrente previa al commit no deje datos viejos en caché.
+    """
+    def _invalidate(sender, **kwargs):
+        bump_catalog(name)
+        transaction.on_commit(lambda: bump_catalog(name))
+
+    _tracked.add(name)
+    for model in models:
+        uid = f'catalog:{name}:{model._meta.label}'
+        post_save.connect(_invalidate, sender=model, weak=False, dispatch_uid=f'{uid}:save')
+        post_delete.connect(_invalidate, sender=model, weak=False, dispatch_uid=f'{uid}:delete')
+
+
+def _render(build):
+    with span('serialization'):
+        body = _renderer.render(build())
+    etag = '"{}"'.format(hashlib.md5(body).hexdigest())
+    return body, etag
+
+
+def catalog_response(request, catalogs, build, variant=''):
+    """Respuesta JSON cacheada para un catálogo.
+
+    Args:
+        request: petición actual (para las cabeceras condicionales).
+        catalogs: nombre del catálogo o tupla de nombres de los que depende la respuesta.
+        build: función sin argumentos que devuelve los datos a serializar.
+        variant: distingue respuestas distintas del mismo catálogo (filtros, página...).
+    """
+    if isinstance(catalogs, str):
+        catalogs = (catalogs,)
+    versions = get_catalog_versions(catalogs)
+    key = (catalogs, variant)
+
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and entry[0] == versions:
+            _entries.move_to_end(key)
+        else:
+            entry = None
+
+    if entry is None:
+        body, etag = _render(build)
+        entry = (versions, body, etag)
+        with _lock:
+            _entries[key] = entry
+            _entries.move_to_end(key)
+            while len(_entries) > _max_entries():
+                _entries.popitem(last=False)
+
+    _, body, etag = entry
+    last_modified = int(max(versions))
+    if time.time() < last_modified + 1:
+        # Aún puede haber otro cambio con el mismo segundo: solo vale el ETag
+        last_modified = None
+
+    response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'no-cache'
+    return get_conditional_response(request, etag=etag, last_modified=last_modified, response=response)
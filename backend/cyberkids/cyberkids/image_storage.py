@@ -0,0 +1,107 @@
+"""
+Subida de imágenes y generación de variantes detrás de una interfaz mínima.
+
+``get_image_storage()`` devuelve el backend de ``IMAGE_STORAGE``:
+
+- ``CloudinaryImageStorage`` (producción): sube con la API de Cloudinary y pide
+  las variantes de ``PRESETS`` como transformaciones *eager*, para que ya
+  estén generadas la primera vez que alguien las descarga.
+- ``LocalImageStorage``: sustituto en disco (``IMAGE_LOCAL_ROOT``) para
+  desarrollo y tests sin red; las variantes se generan con Pillow.
+
+Ambos devuelven al subir el valor que se guarda en el ``CloudinaryField``
+(``image/upload/v<versión>/<public_id>.<formato>``), así que ``image_url`` y
+los serializers funcionan igual con cualquiera de los dos.
+"""
+
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from cyberkids.images import PRESETS, parse_resource
+from cyberkids.timing import span
+
+
+class CloudinaryImageStorage:
+    def upload(self, file, folder):
+        from cloudinary import uploader
+
+        with span('cloudinary'):
+            resource = uploader.upload_resource(file, folder=folder, resource_type='image')
+        return resource.get_prep_value()
+
+    def generate_variants(self, value, presets=None):
+        """Pide a Cloudinary las variantes de ``presets``; devuelve sus nombres."""
+        from cloudinary import uploader
+
+        presets = presets or PRESETS
+        resource = parse_resource(value)
+        with span('cloudinary'):
+            uploader.explicit(
+                resource.public_id, type=resource.type, resource_type=resource.resource_type,
+                eager=list(presets.values()), eager_async=True,
+            )
+        return list(presets)
+
+
+class LocalImageStorage:
+    """Guarda originales y variantes en disco; no usa la red."""
+
+    def __init__(self, root=None):
+        self.root = Path(root or settings.IMAGE_LOCAL_ROOT)
+
+    def path(self, value, preset=None):
+        resource = parse_resource(value)
+        name = f'{resource.public_id}.{resource.format}' if resource.format else resource.public_id
+        return self.root / 'variants' / preset / name if preset else self.root / name
+
+    def upload(self, file, folder):
+        name = getattr(file, 'name', '') or ''
+        extension = Path(name).suffix.lstrip('.').lower() or 'png'
+        value = f'image/upload/v{int(time.time())}/{folder.strip("/")}/{uuid.uuid4().hex}.{extension}'
+        target = self.path(value)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if hasattr(file, 'seek'):
+            file.seek(0)
+        with open(target, 'wb') as out:
+            chunks = file.chunks() if hasattr(file, 'chunks') else [file.read()]
+            for chunk in chunks:
+                out.write(chunk)
+        return value
+
+    def generate_variants(self, value, presets=None):
+        """Redimensiona el original a cada preset; devuelve los generados.
+
+        No genera ninguno si falta el original o Pillow no sabe leerlo (SVG, por ejemplo).
+        """
+        presets = presets or PRESETS
+        source = self.path(value)
+        if not source.exists():
+            return []
+        try:
+            image = Image.open(source)
+        except UnidentifiedImageError:
+            return []
+        generated = []
+        with image:
+            for name, transformation in presets.items():
+                width = transformation.get('width') or image.width
+                height = transformation.get('height') or image.height
+                if transformation.get('crop') == 'fill':
+                    variant = ImageOps.fit(image, (width, height))
+                else:
+                    variant = image.copy()
+                    variant.thumbnail((width, height))
+                target = self.path(value, name)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                variant.save(target, format=image.format)
+                generated.append(name)
+        return generated
+
+
+def get_image_storage():
+    return import_string(getattr(settings, 'IMAGE_STORAGE', 'cyberkids.image_storage.CloudinaryImageStorage'))()
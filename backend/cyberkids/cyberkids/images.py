@@ -0,0 +1,187 @@
+"""
+URLs de Cloudinary memoizadas para los serializers.
+
+Construir la URL de un ``CloudinaryField`` (formato, versión, firma) se repite
+idéntico en cada serialización: listados de tienda y mascotas, ranking,
+emisión de tokens... ``image_url`` guarda el resultado en memoria del proceso,
+en un LRU acotado por ``CLOUDINARY_URL_CACHE_MAX_ENTRIES`` con clave
+``(recurso, transformación)``. Una URL nunca cambia para la misma clave: al
+subir otra imagen cambian la versión o el public_id, así que no hace falta
+invalidar.
+
+``CloudinaryImageField`` es el campo de DRF que la usa; los ModelSerializer con
+``CloudinaryURLMixin`` lo aplican solos a todos sus ``CloudinaryField`` y añaden
+al lado ``<campo>_variants`` con las URLs de los presets de ``PRESETS``
+(thumbnail, card, full), para que el frontend no descargue el original a
+tamaño completo. ``generate_image_variants`` las genera por adelantado. Los
+campos de ``NON_RASTER_FIELDS`` (SVG y animaciones) no tienen variantes.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+
+import cloudinary
+from cloudinary import CloudinaryResource
+from cloudinary.models import CLOUDINARY_FIELD_DB_RE, CloudinaryField
+from django.conf import settings
+from rest_framework import serializers
+
+from cyberkids.timing import span
+
+# https://res.cloudinary.com/<cloud>/<resource_type>/<type>/v<versión>/<public_id>.<formato>
+DELIVERY_URL_RE = re.compile(
+    r'^https?://res\.cloudinary\.com/(?P<cloud_name>[^/]+)/(?P<resource_type>image|raw|video)/'
+    r'(?P<type>upload|private|authenticated)/v(?P<version>\d+)/(?P<path>[^?#]+)$'
+)
+
+# Transformaciones con nombre (parámetros de Cloudinary)
+PRESETS = {
+    'thumbnail': {'width': 128, 'height': 128, 'crop': 'fill', 'quality': 'auto', 'fetch_format': 'auto'},
+    'card': {'width': 480, 'crop': 'limit', 'quality': 'auto', 'fetch_format': 'auto'},
+    'full': {'width': 1280, 'crop': 'limit', 'quality': 'auto', 'fetch_format': 'auto'},
+}
+
+# Campos que guardan SVG o animaciones: los presets son para imágenes rasterizadas
+NON_RASTER_FIELDS = frozenset({'pets.PetState.svg', 'pets.PetState.animation_url'})
+
+_urls = OrderedDict()
+_lock = threading.Lock()
+
+
+def _max_entries():
+    return getattr(settings, 'CLOUDINARY_URL_CACHE_MAX_ENTRIES', 4096)
+
+
+def is_raster_field(model_field):
+    """True si ``model_field`` (un CloudinaryField) admite los presets de ``PRESETS``."""
+    return f'{model_field.model._meta.label}.{model_field.name}' not in NON_RASTER_FIELDS
+
+
+def clear_image_url_cache():
+    """Vacía las URLs guardadas en memoria de este proceso."""
+    with _lock:
+        _urls.clear()
+
+
+def parse_resource(value):
+    """CloudinaryResource a partir del valor del campo (recurso o texto de la BD)."""
+    if isinstance(value, CloudinaryResource):
+        return value
+    match = re.match(CLOUDINARY_FIELD_DB_RE, str(value))
+    return CloudinaryResource(
+        type=match.group('type') or 'upload', resource_type=match.group('resource_type') or 'image',
+        version=match.group('version'), public_id=match.group('public_id'), format=match.group('format'),
+    )
+
+
+def image_url(value, **transformation):
+    """URL https de ``value`` (valor de un CloudinaryField) con ``transformation``, o None si está vacío.
+
+    Los valores que ya son URLs absolutas se devuelven tal cual.
+    """
+    if not value:
+        return None
+    if isinstance(value, str) and value.startswith(('http://', 'https://')):
+        return value
+    resource = parse_resource(value)
+    key = (
+        resource.resource_type, resource.type, resource.version, resource.public_id, resource.format,
+        tuple(sorted(transformation.items())),
+    )
+    with _lock:
+        url = _urls.get(key)
+        if url is not None:
+            _urls.move_to_end(key)
+            return url
+
+    with span('cloudinary'):
+        url = resource.build_url(secure=True, **transformation)
+    with _lock:
+        _urls[key] = url
+        while len(_urls) > _max_entries():
+            _urls.popitem(last=False)
+    return url
+
+
+def parse_delivery_url(url):
+    """Valor de ``CloudinaryField`` para una URL de entrega de Cloudinary, o None si no lo es.
+
+    Solo acepta URLs del ``cloud_name`` configurado, con versión y sin
+    transformaciones (se guardaría la imagen transformada como original).
+    """
+    match = DELIVERY_URL_RE.match(url)
+    if match is None:
+        return None
+    cloud_name = cloudinary.config().cloud_name
+    if cloud_name and match.group('cloud_name') != cloud_name:
+        return None
+    return '{resource_type}/{type}/v{version}/{path}'.format(**match.groupdict())
+
+
+def image_variants(value):
+    """``{preset: URL}`` de ``value`` para cada preset de ``PRESETS``, o None si está vacío."""
+    if not value:
+        return None
+    return {name: image_url(value, **transformation) for name, transformation in PRESETS.items()}
+
+
+class CloudinaryImageField(serializers.Field):
+    """Devuelve la URL (cacheada) de la imagen.
+
+    Al escribir acepta un fichero (lo sube ``CloudinaryField``), el valor
+    guardado (``image/upload/v1/...``) o una URL de entrega de Cloudinary, que
+    se convierte a ese valor. Cualquier otra URL absoluta se rechaza.
+    """
+
+    default_error_messages = {
+        'invalid_url': 'Solo se aceptan URLs de Cloudinary con versión y sin transformaciones.',
+    }
+
+    def __init__(self, transformation=None, **kwargs):
+        self.transformation = transformation or {}
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return image_url(value, **self.transformation)
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) and data.startswith(('http://', 'https://')):
+            value = parse_delivery_url(data)
+            if value is None:
+                self.fail('invalid_url')
+            return value
+        return data
+
+
+class CloudinaryVariantsField(serializers.Field):
+    """Solo lectura: ``{preset: URL}`` de la imagen."""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return image_variants(value)
+
+
+class CloudinaryURLMixin:
+    """Para ModelSerializer: los CloudinaryField se serializan con ``CloudinaryImageField``
+    y cada uno rasterizado tiene al lado ``<campo>_variants``.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        for model_field in self.Meta.model._meta.get_fields():
+            if isinstance(model_field, CloudinaryField) and model_field.name in fields \
+                    and is_raster_field(model_field):
+                fields.setdefault(f'{model_field.name}_variants', CloudinaryVariantsField(source=model_field.name))
+        return fields
+
+    def build_standard_field(self, field_name, model_field):
+        if isinstance(model_field, CloudinaryField):
+            return CloudinaryImageField, {
+                'required': not model_field.blank,
+                'allow_null': model_field.null,
+            }
+        return super().build_standard_field(field_name, model_field)
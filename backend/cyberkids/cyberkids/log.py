@@ -0,0 +1,81 @@
+"""
+Logging estructurado y asíncrono.
+
+``AsyncQueueHandler`` formatea el registro en el hilo que loguea (JSON compacto,
+barato) y deja la escritura en un ``QueueListener`` en segundo plano, así el
+disco o stdout nunca bloquean una petición. Si la cola se llena, los registros
+se descartan en lugar de frenar al llamante.
+
+Los campos estructurados se pasan con ``extra={'fields': {...}}``.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+
+class JSONFormatter(logging.Formatter):
+    """Una línea JSON por registro: ts, level, logger, msg y los ``fields`` extra."""
+
+    def format(self, record):
+        data = {
+            'ts': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        fields = getattr(record, 'fields', None)
+        if isinstance(fields, dict):
+            data.update(fields)
+        if record.exc_info:
+            data['exc'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=str)
+
+
+class AsyncQueueHandler(QueueHandler):
+    """QueueHandler que escribe en ``stream`` (stderr por defecto) desde un hilo propio."""
+
+    def __init__(self, stream=None, maxsize=10000):
+        super().__init__(queue.Queue(maxsize=maxsize))
+        self.target = logging.StreamHandler(stream or sys.stderr)
+        self.dropped = 0
+        self._listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_listener(self):
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            # Tras un fork el hilo del padre no existe en el hijo: se arranca otro
+            self._listener = QueueListener(self.queue, self.target, respect_handler_level=False)
+            self._listener.start()
+            self._pid = os.getpid()
+            atexit.register(self._stop_listener)
+
+    def _stop_listener(self):
+        listener = self._listener
+        if listener is not None and self._pid == os.getpid() and listener._thread is not None:
+            listener.stop()
+        self._pid = None
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def emit(self, record):
+        self._ensure_listener()
+        super().emit(record)
+
+    def close(self):
+        self._stop_listener()
+        super().close()
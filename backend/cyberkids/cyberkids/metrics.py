@@ -0,0 +1,306 @@
+"""
+Registro de métricas en proceso con salida en formato de texto de Prometheus.
+
+Cada proceso acumula sus contadores e histogramas en memoria. Con
+``METRICS_MULTIPROC_DIR`` configurado (varios workers de gunicorn), cada
+proceso vuelca periódicamente sus valores a un fichero JSON propio en ese
+directorio y el endpoint ``/metrics`` suma los ficheros de todos los procesos.
+Los ficheros de procesos que ya no existen (workers reiniciados) se acumulan en
+``dead_processes.json`` y se borran, para que los contadores no retrocedan sin
+que el directorio crezca con cada reinicio. El directorio es local a la
+máquina (los pid se comprueban con ``os.kill``) y debe vaciarse al arrancar
+cada despliegue. Un proceso que deja de recibir peticiones vuelca lo último con
+un temporizador, sin esperar a terminar. El modo multiproceso solo funciona en
+Unix: ``fcntl`` se importa al usarlo para que el proyecto arranque en Windows.
+
+Sin ``METRICS_TOKEN`` el endpoint solo responde con ``DEBUG`` activo.
+"""
+
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.http import HttpResponse
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+DEAD_PROCESSES_FILE = 'dead_processes.json'
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self._values = {}
+        self._reset_process()
+
+    def _reset_process(self):
+        self._pid = os.getpid()
+        self._file_id = f'{self._pid}_{int(time.time() * 1000)}'
+        self._values = {}
+        self._last_flush = 0.0
+        # Los hilos no sobreviven al fork: el temporizador es de cada proceso
+        self._timer = None
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def add(self, key, amount):
+        with self._lock:
+            if os.getpid() != self._pid:
+                # Proceso hijo tras un fork (gunicorn --preload): empieza de cero
+                self._reset_process()
+            self._values[key] = self._values.get(key, 0.0) + amount
+        self._maybe_flush()
+
+    # --- multiproceso ---
+
+    def _directory(self):
+        return getattr(settings, 'METRICS_MULTIPROC_DIR', None)
+
+    def _maybe_flush(self):
+        if not self._directory():
+            return
+        interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 5.0)
+        wait = interval - (time.monotonic() - self._last_flush)
+        if wait <= 0:
+            self.flush()
+            return
+        with self._lock:
+            if self._timer is None:
+                # Si no llegan más incrementos, el temporizador publica estos
+                self._timer = threading.Timer(wait, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        directory = self._directory()
+        if not directory:
+            return
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            snapshot = dict(self._values)
+            self._last_flush = time.monotonic()
+            path = os.path.join(directory, f'metrics_{self._file_id}.json')
+        os.makedirs(directory, exist_ok=True)
+        _write_values(path, snapshot)
+
+    def collect(self):
+        """Devuelve {(nombre, labels): valor} sumando todos los procesos."""
+        directory = self._directory()
+        if not directory:
+            with self._lock:
+                return dict(self._values)
+        import fcntl
+
+        self.flush()
+        # Un solo proceso a la vez lee y compacta, para no contar dos veces un fichero
+        with open(os.path.join(directory, 'metrics.lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            dead_path = os.path.join(directory, DEAD_PROCESSES_FILE)
+            alive, dead_files = [], []
+            for path in glob.glob(os.path.join(directory, 'metrics_*.json')):
+                (alive if _pid_alive(_file_pid(path)) else dead_files).append(path)
+
+            dead = _read_values(dead_path)
+            for path in dead_files:
+                _add_values(dead, _read_values(path))
+            if dead_files:
+                _write_values(dead_path, dead)
+                for path in dead_files:
+                    os.remove(path)
+
+            totals = dict(dead)
+            for path in alive:
+                _add_values(totals, _read_values(path))
+        return totals
+
+    def render(self):
+        values = self.collect()
+        by_name = {}
+        for (series, labels), value in values.items():
+            by_name.setdefault(series, []).append((labels, value))
+
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for series in metric.series_names():
+                for labels, value in sorted(by_name.get(series, []), key=_bucket_sort_key):
+                    lines.append(f'{series}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def _read_values(path):
+    try:
+        with open(path) as fh:
+            entries = json.load(fh)
+    except (OSError, ValueError):
+        return {}
+    return {(key[0], tuple(tuple(pair) for pair in key[1])): value for key, value in entries}
+
+
+def _add_values(totals, values):
+    for key, value in values.items():
+        totals[key] = totals.get(key, 0.0) + value
+
+
+def _write_values(path, values):
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w') as fh:
+        json.dump([[[name, [list(pair) for pair in labels]], value] for (name, labels), value in values.items()], fh)
+    os.replace(tmp, path)
+
+
+def _file_pid(path):
+    """pid del proceso que escribió ``metrics_<pid>_<ms>.json``."""
+    try:
+        return int(os.path.basename(path).split('_')[1])
+    except (IndexError, ValueError):
+        return None
+
+
+def _pid_alive(pid):
+    if pid is None:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Existe, aunque sea de otro usuario
+        return True
+    return True
+
+
+def _bucket_sort_key(item):
+    labels = dict(item[0])
+    le = labels.pop('le', None)
+    le_value = float('inf') if le == '+Inf' else float(le) if le is not None else 0.0
+    return (sorted(labels.items()), le_value)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    parts = []
+    for name, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{name}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+def _format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.registry = registry or REGISTRY
+        self.registry.register(self)
+
+    def _labels(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name} espera las etiquetas {self.labelnames}, recibió {tuple(labels)}')
+        return tuple((name, str(labels[name])) for name in self.labelnames)
+
+    def series_names(self):
+        return [self.name]
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError('Los contadores solo pueden aumentar')
+        self.registry.add((self.name, self._labels(labels)), amount)
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def series_names(self):
+        return [f'{self.name}_bucket', f'{self.name}_sum', f'{self.name}_count']
+
+    def observe(self, value, **labels):
+        labels = self._labels(labels)
+        for bound in self.buckets:
+            if value <= bound:
+                self.registry.add((f'{self.name}_bucket', labels + (('le', repr(bound)),)), 1)
+        self.registry.add((f'{self.name}_bucket', labels + (('le', '+Inf'),)), 1)
+        self.registry.add((f'{self.name}_sum', labels), value)
+        self.registry.add((f'{self.name}_count', labels), 1)
+
+
+REGISTRY = Registry()
+atexit.register(REGISTRY.flush)
+
+
+def metrics_view(request):
+    """Endpoint de scrape. Exige ``Authorization: Bearer <METRICS_TOKEN>``.
+
+    Sin token configurado solo responde en desarrollo (``DEBUG``); en producción da 404.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponse(status=404)
+    elif request.META.get('HTTP_AUTHORIZATION', '') != f'Bearer {token}':
+        return HttpResponse(status=401)
+    return HttpResponse(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+
+# --- Métricas de la aplicación ---
+
+LLM_REQUEST_SECONDS = Histogram(
+    'cyberkids_llm_request_seconds', 'Latencia de las llamadas al backend LLM (_call_llm_backend)',
+)
+LLM_ERRORS = Counter(
+    'cyberkids_llm_errors_total', 'Errores al llamar al backend LLM por motivo', ['reason'],
+)
+CHAT_TURNS = Counter(
+    'cyberkids_chat_turns_total', 'Turnos de chat procesados por estado de la sesión tras el turno', ['outcome'],
+)
+SIMULATION_SESSIONS = Counter(
+    'cyberkids_simulation_sessions_total', 'Sesiones de simulación iniciadas, ganadas o falladas', ['event'],
+)
+CYBERCREDS = Counter(
+    'cyberkids_cybercreds_total',
+    'Cybercreds emitidos (minted) y gastados (spent) por tipo de transacción; '
+    'reason="adjustment" separa los ajustes manuales y de conciliación del juego (reason="economy")',
+    ['direction', 'transaction_type', 'reason'],
+)
+AUTH_FAILURES = Counter(
+    'cyberkids_auth_failures_total', 'Fallos de autenticación por motivo', ['reason'],
+)
+
+
+# transaction_type de los ajustes (add_cybercreds y reconcile_ledger --repair)
+ADJUSTMENT_TRANSACTION_TYPE = 'adjustment'
+
+
+def record_cybercreds(amount, transaction_type):
+    reason = 'adjustment' if transaction_type == ADJUSTMENT_TRANSACTION_TYPE else 'economy'
+    if amount > 0:
+        CYBERCREDS.inc(amount, direction='minted', transaction_type=transaction_type, reason=reason)
+    elif amount < 0:
+        CYBERCREDS.inc(-amount, direction='spent', transaction_type=transaction_type, reason=reason)
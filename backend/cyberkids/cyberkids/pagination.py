@@ -0,0 +1,126 @@
+"""
+Paginación por cursor (keyset) para historiales que crecen sin límite.
+
+En lugar de OFFSET, cada página filtra por la clave de orden del último
+elemento visto, por ejemplo ``(sent_at, message_id) > (t, id)``. Con un índice
+compuesto sobre esas columnas, la página 1000 cuesta lo mismo que la primera.
+
+El cursor es opaco para el cliente: base64 de la clave del último elemento.
+La paginación es opcional; solo se activa si la petición trae ``limit`` o
+``cursor``, así las respuestas antiguas no cambian.
+"""
+
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def is_requested(request):
+    params = getattr(request, 'query_params', None) or request.GET
+    return 'limit' in params or 'cursor' in params
+
+
+def _encode(values):
+    raw = json.dumps([v.isoformat() if hasattr(v, 'isoformat') else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def _decode(cursor, count):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, TypeError):
+        raise InvalidCursor('invalid_cursor')
+    if not isinstance(values, list) or len(values) != count:
+        raise InvalidCursor('invalid_cursor')
+    return values
+
+
+def _after(ordering, values):
+    """Q que selecciona las filas posteriores a ``values`` según ``ordering``."""
+    condition = Q()
+    equal = Q()
+    for field, value in zip(ordering, values):
+        name = field.lstrip('-')
+        if isinstance(value, str) and name.endswith('_at'):
+            value = parse_datetime(value)
+            if value is None:
+                raise InvalidCursor('invalid_cursor')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        condition |= equal & Q(**{f'{name}__{lookup}': value})
+        equal &= Q(**{name: value})
+    return condition
+
+
+def _limit(params, default_limit):
+    try:
+        limit = int(params.get('limit', default_limit))
+    except (TypeError, ValueError):
+        raise InvalidCursor('invalid_limit')
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def _page(items, limit, ordering):
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = _encode([getattr(last, field.lstrip('-')) for field in ordering])
+    return items, next_cursor
+
+
+def paginate(queryset, request, ordering, default_limit=DEFAULT_LIMIT):
+    """Devuelve ``(items, next_cursor)`` de la página pedida.
+
+    ``ordering`` es una tupla de campos que identifica cada fila de forma única,
+    por ejemplo ``('sent_at', 'message_id')`` o ``('-started_at', '-session_id')``.
+    ``next_cursor`` es None en la última página. Lanza ``InvalidCursor``.
+    """
+    params = getattr(request, 'query_params', None) or request.GET
+    limit = _limit(params, default_limit)
+
+    queryset = queryset.order_by(*ordering)
+    cursor = params.get('cursor')
+    if cursor:
+        queryset = queryset.filter(_after(ordering, _decode(cursor, len(ordering))))
+
+    return _page(list(queryset[:limit + 1]), limit, ordering)
+
+
+def _is_after(item, ordering, values):
+    for field, value in zip(ordering, values):
+        name = field.lstrip('-')
+        current = getattr(item, name)
+        if isinstance(value, str) and name.endswith('_at'):
+            value = parse_datetime(value)
+            if value is None:
+                raise InvalidCursor('invalid_cursor')
+        if current != value:
+            return current < value if field.startswith('-') else current > value
+    return False
+
+
+def paginate_list(items, request, ordering, default_limit=DEFAULT_LIMIT):
+    """Como ``paginate`` pero sobre una lista ya ordenada según ``ordering``.
+
+    Sirve para datos que no están en una tabla (transcripts archivados); los
+    cursores son intercambiables con los de ``paginate``.
+    """
+    params = getattr(request, 'query_params', None) or request.GET
+    limit = _limit(params, default_limit)
+
+    cursor = params.get('cursor')
+    if cursor:
+        values = _decode(cursor, len(ordering))
+        items = [item for item in items if _is_after(item, ordering, values)]
+
+    return _page(list(items[:limit + 1]), limit, ordering)
@@ -4,6 +4,7 @@ from pathlib import Path
 import dj_database_url
 from dotenv import load_dotenv
 import os
+import sys
 
 import cloudinary
 
@@ -41,12 +42,14 @@ INSTALLED_APPS = [
     'apps.minigames',          # Gamified Events
     'apps.progression',        # Progression and Economy
     'apps.onboarding',         # Initial Risk Identification
+    'apps.tasks',              # Background task queue
 
     'cloudinary',
     'cloudinary_storage',
 ]
 
 MIDDLEWARE = [
+    'cyberkids.timing.ServerTimingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -89,7 +92,8 @@ if DATABASE_URL:
         "default": dj_database_url.parse(
             DATABASE_URL,
             conn_max_age=600,
-            ssl_require=True,
+            # DATABASE_SSL_REQUIRE=false permite usar un PostgreSQL local (p.ej. para benchmark_api)
+            ssl_require=os.environ.get("DATABASE_SSL_REQUIRE", "true").lower() != "false",
         )
     }
 else:
@@ -156,8 +160,103 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    'DEFAULT_RENDERER_CLASSES': [
+        'cyberkids.timing.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+# Fracción de peticiones medidas por ServerTimingMiddleware (0 = desactivado)
+SERVER_TIMING_SAMPLE_RATE = float(os.environ.get("SERVER_TIMING_SAMPLE_RATE", "0.05"))
+
+# Métricas Prometheus (/metrics). Con varios workers de gunicorn hay que
+# definir METRICS_MULTIPROC_DIR (vaciado en cada despliegue) para sumar todos.
+# Con DEBUG=False /metrics exige METRICS_TOKEN (sin él responde 404).
+METRICS_MULTIPROC_DIR = os.environ.get("METRICS_MULTIPROC_DIR") or None
+METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", "5"))
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN") or None
+
+# Fracción de payloads del LLM (ya redactados) que se escriben en el log
+LLM_PAYLOAD_LOG_SAMPLE_RATE = float(os.environ.get("LLM_PAYLOAD_LOG_SAMPLE_RATE", "0.01"))
+
+# Logs en JSON compacto escritos desde un hilo aparte (cyberkids/log.py)
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {
+            '()': 'cyberkids.log.JSONFormatter',
+        },
+    },
+    'handlers': {
+        'async': {
+            'class': 'cyberkids.log.AsyncQueueHandler',
+            'formatter': 'json',
+        },
+    },
+    'loggers': {
+        'apps': {
+            'handlers': ['async'],
+            'level': os.environ.get("APP_LOG_LEVEL", "INFO"),
+            'propagate': False,
+        },
+        'cyberkids': {
+            'handlers': ['async'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
 }
 
+# Regla para elegir el siguiente escenario en start_with_role (apps/simulation/assignment.py)
+SCENARIO_PICKER = 'apps.simulation.assignment.first_uncompleted'
+
+# Minutos sin mensajes tras los que "reap_idle_sessions" da por abandonada una sesión
+SIM_SESSION_IDLE_MINUTES = int(os.getenv('SIM_SESSION_IDLE_MINUTES', '60'))
+
+# Días tras el fin de una sesión para que "archive_transcripts" comprima y saque sus mensajes de chat_message
+SIM_TRANSCRIPT_ARCHIVE_DAYS = int(os.getenv('SIM_TRANSCRIPT_ARCHIVE_DAYS', '30'))
+
+# Cola de tareas (apps/tasks): el worker es "python manage.py run_tasks" (proceso "worker" del Procfile).
+# Por defecto quedan en cola fuera de la petición; solo "manage.py test" las ejecuta
+# en el momento (TASKS_ALWAYS_EAGER=true lo fuerza, p. ej. en local sin worker).
+TESTING = sys.argv[1:2] == ["test"]
+TASKS_ALWAYS_EAGER = os.environ.get("TASKS_ALWAYS_EAGER", str(TESTING)).lower() == "true"
+TASKS_RETRY_BASE_SECONDS = 5
+TASKS_RUNNING_TIMEOUT = 600
+
+# Caché compartido entre procesos (web y worker). Guarda los sellos de versión de
+# los catálogos (cyberkids/catalog_cache.py); la tabla se crea con
+# "python manage.py createcachetable" (proceso "release" del Procfile).
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "cyberkids_cache",
+    }
+}
+
+# Respuestas de catálogos guardadas en memoria por proceso (cyberkids/catalog_cache.py)
+CATALOG_CACHE_MAX_ENTRIES = 256
+# Segundos máximos que un CatalogMemo (patrones sensibles, escenarios activos) se
+# reutiliza sin recalcular aunque no cambie la versión del catálogo
+CATALOG_MEMO_TTL = 60
+
+# URLs de Cloudinary memoizadas por proceso (cyberkids/images.py)
+CLOUDINARY_URL_CACHE_MAX_ENTRIES = 4096
+
+# Backend de subida de imágenes y variantes (cyberkids/image_storage.py).
+# "cyberkids.image_storage.LocalImageStorage" guarda en IMAGE_LOCAL_ROOT, sin red.
+IMAGE_STORAGE = os.getenv('IMAGE_STORAGE', 'cyberkids.image_storage.CloudinaryImageStorage')
+IMAGE_LOCAL_ROOT = os.getenv('IMAGE_LOCAL_ROOT', os.path.join(BASE_DIR, 'media', 'images'))
+
+# Avatares subidos en PATCH auth/me/update/: en la petición solo se validan (tamaño, formato y
+# píxeles, sin decodificar), quedan en la tabla staged_avatar y la tarea "users.publish_avatar"
+# los reduce y los sube (apps/cyberUser/avatars.py).
+AVATAR_MAX_UPLOAD_MB = 5
+AVATAR_MAX_PIXELS = 25_000_000
+AVATAR_MAX_DIMENSION = 512
+AVATAR_PENDING_URL = "https://res.cloudinary.com/dsvynqyq5/image/upload/v1768140305/3dcd4af5bc9e06d36305984730ab7888_o3eeob.jpg"
+
 # JWT Configuration
 from datetime import timedelta
 SIMPLE_JWT = {
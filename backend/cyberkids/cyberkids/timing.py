@@ -0,0 +1,146 @@
+"""
+Reparto del tiempo de cada petición entre base de datos, backend LLM,
+serialización, Cloudinary y el resto ("other").
+
+``ServerTimingMiddleware`` abre un ``RequestTimer`` por petición muestreada;
+las consultas SQL se miden con ``connection.execute_wrapper`` y el resto de
+buckets con ``span('<bucket>')`` en los puntos calientes del código; la
+serialización incluye ``Serializer.data`` (``to_representation``) y el render
+JSON. Los spans
+anidados descuentan el tiempo de sus hijos, así que cada milisegundo cuenta en
+un único bucket. El resultado se devuelve en la cabecera ``Server-Timing`` y
+en un registro estructurado del logger ``cyberkids.timing``.
+"""
+
+import contextvars
+import logging
+import random
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.renderers import JSONRenderer
+from rest_framework.serializers import BaseSerializer
+
+logger = logging.getLogger('cyberkids.timing')
+
+BUCKETS = ('db', 'llm', 'serialization', 'cloudinary')
+
+_current = contextvars.ContextVar('request_timer', default=None)
+_serializers_instrumented = False
+
+
+class RequestTimer:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.durations = defaultdict(float)
+        self.counts = defaultdict(int)
+        self._children = []
+
+    def total(self):
+        return time.perf_counter() - self.start
+
+
+@contextmanager
+def span(bucket):
+    """Atribuye el tiempo del bloque a ``bucket`` si la petición actual se está midiendo."""
+    timer = _current.get()
+    if timer is None:
+        yield
+        return
+    timer._children.append(0.0)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        children = timer._children.pop()
+        timer.durations[bucket] += elapsed - children
+        timer.counts[bucket] += 1
+        if timer._children:
+            timer._children[-1] += elapsed
+
+
+def _db_wrapper(execute, sql, params, many, context):
+    with span('db'):
+        return execute(sql, params, many, context)
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """JSONRenderer que cuenta el render como tiempo de serialización."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with span('serialization'):
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+def instrument_serializers():
+    """Cuenta el cálculo de ``.data`` de todos los serializers de DRF como serialización.
+
+    ``Serializer.data`` y ``ListSerializer.data`` pasan por ``BaseSerializer.data``,
+    que es donde se llama a ``to_representation``; basta con envolverla una vez.
+    """
+    global _serializers_instrumented
+    if _serializers_instrumented:
+        return
+    original = BaseSerializer.data.fget
+
+    def data(self):
+        with span('serialization'):
+            return original(self)
+
+    BaseSerializer.data = property(data)
+    _serializers_instrumented = True
+
+
+def _sample_rate():
+    return getattr(settings, 'SERVER_TIMING_SAMPLE_RATE', 1.0)
+
+
+class ServerTimingMiddleware:
+    """Mide una fracción ``SERVER_TIMING_SAMPLE_RATE`` de las peticiones."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        instrument_serializers()
+
+    def __call__(self, request):
+        rate = _sample_rate()
+        if rate <= 0 or (rate < 1 and random.random() >= rate):
+            return self.get_response(request)
+
+        timer = RequestTimer()
+        token = _current.set(timer)
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(_db_wrapper))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        total = timer.total()
+        other = max(total - sum(timer.durations.values()), 0.0)
+
+        metrics = []
+        for bucket in BUCKETS:
+            if bucket in timer.durations:
+                metrics.append(f'{bucket};dur={timer.durations[bucket] * 1000:.1f};desc="{timer.counts[bucket]}"')
+        metrics.append(f'other;dur={other * 1000:.1f}')
+        metrics.append(f'total;dur={total * 1000:.1f}')
+        response['Server-Timing'] = ', '.join(metrics)
+
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 1),
+            'other_ms': round(other * 1000, 1),
+        }
+        for bucket in BUCKETS:
+            record[f'{bucket}_ms'] = round(timer.durations.get(bucket, 0.0) * 1000, 1)
+            record[f'{bucket}_count'] = timer.counts.get(bucket, 0)
+        logger.info('%s %s', request.method, request.path, extra={'fields': record})
+        return response
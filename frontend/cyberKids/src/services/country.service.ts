@@ -44,7 +44,7 @@ class CountryServiceClass {
         }
 
         if (data.next) {
-          url = data.next.startsWith('http') ? data.next : `${API_BASE_URL}${data.next}`;
+          url = new URL(data.next, new URL(url, window.location.origin)).toString();
         } else {
           url = null;
         }